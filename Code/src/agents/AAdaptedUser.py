@@ -1,7 +1,5 @@
 from Model.Code.src.agents.User import User
 import logging
-import random
-import numpy as np
 
 
 class AAdaptedUser(User):
@@ -11,6 +9,9 @@ class AAdaptedUser(User):
         User (class): Base class for a user in the model.
     """
 
+    __slots__ = ("last_price_to_rent",)
+    strategy = "A-ADAPTED"
+
     def __init__(self, unique_id, model, user_size):
         """Initializes an AAdaptedUser agent.
 
@@ -30,16 +31,13 @@ class AAdaptedUser(User):
         self.max_a = 1
 
         # Generate initial LOB's for VET and VTHO
-        _init_VTHO_LOB = self.model.economy.LOB_VTHO.iloc[self.random.randint(
-            0, 99), :]
-        _init_VET_LOB = self.model.economy.LOB_VET.iloc[self.random.randint(
-            0, 99), :]
+        _init_VTHO_LOB_ID = self.draws.initial_VTHO_LOB_ID
+        _init_VET_LOB_ID = self.draws.initial_VET_LOB_ID
 
-        # Initialize the buy-to-rent array
-        _initial_buy_cost = self.estimate_buy_cost(_init_VET_LOB)
-        _initial_rent_cost = self.estimate_rent_cost(_init_VTHO_LOB)
-        _initial_price_to_rent = _initial_buy_cost / _initial_rent_cost
-        self.price_to_rents = [_initial_price_to_rent, ]
+        # Initialize the buy-to-rent ratio of the previous day
+        _initial_buy_cost = self.estimate_buy_cost(_init_VET_LOB_ID)
+        _initial_rent_cost = self.estimate_rent_cost(_init_VTHO_LOB_ID)
+        self.last_price_to_rent = _initial_buy_cost / _initial_rent_cost
 
         logging.debug(f"Initialized a STRATEGY-A user with ID {unique_id}")
 
@@ -48,7 +46,7 @@ class AAdaptedUser(User):
         """
 
         # Get current buy to rent ratio
-        _price_to_rent = self.price_to_rents[-1]
+        _price_to_rent = self.last_price_to_rent
 
         # Keep adding mean fluctuation ratio to numerator
         _n = 1 + (_price_to_rent - (_price_to_rent % self.max_a))
@@ -80,32 +78,30 @@ class AAdaptedUser(User):
         # Buy when
         return (self.total_FIAT_spent_rent + _estimated_cost_of_renting) >= self.y * _estimated_cost_of_buying
 
-    def decide_to_buy(self, VTHO_LOB, VET_LOB):
+    def decide_to_buy(self, VTHO_LOB_ID, VET_LOB_ID):
         """Decides whether or not it is time to buy.
 
         Args:
-            VTHO_LOB (List): LOB of the VTHO/USDT pair.
-            VET_LOB (List): LOB of the VET/USDT pair.
+            VTHO_LOB_ID (int): Index of the LOB snapshot of the VTHO/USDT pair.
+            VET_LOB_ID (int): Index of the LOB snapshot of the VET/USDT pair.
 
         Returns:
             Boolean: TRUE when the user needs to buy. False otherwise.
         """
 
         # Estimate the cost of renting and buying based on the LOB's
-        _estimated_cost_of_renting = self.estimate_rent_cost(VTHO_LOB)
-        _estimated_cost_of_buying = self.estimate_buy_cost(VET_LOB)
+        _estimated_cost_of_renting = self.estimate_rent_cost(VTHO_LOB_ID)
+        _estimated_cost_of_buying = self.estimate_buy_cost(VET_LOB_ID)
 
         # Update the user's buy-to-rent ratio
         self.buy_to_rent = _estimated_cost_of_buying / _estimated_cost_of_renting
 
-        # Update the price-to-rent array
-        self.price_to_rents.append(self.buy_to_rent)
-
         # Determine the fluctuation ratio based on this and the previous day
-        if self.price_to_rents[-1] >= self.price_to_rents[-2]:
-            _alpha = self.price_to_rents[-1] / self.price_to_rents[-2]
+        if self.buy_to_rent >= self.last_price_to_rent:
+            _alpha = self.buy_to_rent / self.last_price_to_rent
         else:
-            _alpha = self.price_to_rents[-2] / self.price_to_rents[-1]
+            _alpha = self.last_price_to_rent / self.buy_to_rent
+        self.last_price_to_rent = self.buy_to_rent
 
         # Update the maximum fluctuation ratio if needed
         if _alpha > self.max_a:
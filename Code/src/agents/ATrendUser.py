@@ -1,7 +1,6 @@
 from Model.Code.src.agents.User import User
+from Model.Code.src.agents.RollingStatistics import RollingStatistics
 import logging
-import random
-import numpy as np
 
 
 class ATrendUser(User):
@@ -11,6 +10,9 @@ class ATrendUser(User):
         User (class): Base class for a user in the model.
     """
 
+    __slots__ = ("statistics",)
+    strategy = "A-TREND"
+
     def __init__(self, unique_id, model, user_size):
         """Initializes an A-TREND user.
 
@@ -23,23 +25,19 @@ class ATrendUser(User):
         # Initialize the parent User class
         super().__init__(unique_id, model, user_size)
 
-        # Initialize b, y, and the fluctuation ratios
+        # Initialize b and y
         self.b = 1
         self.y = 1
-        self.alphas = [1, ]
-        self.alpha_weights = [0.9**i for i in range(99, -1, -1)]
 
         # Generate initial LOB's for VET and VTHO
-        _init_VTHO_LOB = self.model.economy.LOB_VTHO.iloc[random.randint(
-            0, 99), :]
-        _init_VET_LOB = self.model.economy.LOB_VET.iloc[random.randint(
-            0, 99), :]
-
-        # Initialize the price-to-rent array
-        _initial_buy_cost = self.estimate_buy_cost(_init_VET_LOB)
-        _initial_rent_cost = self.estimate_rent_cost(_init_VTHO_LOB)
+        _init_VTHO_LOB_ID = self.draws.initial_VTHO_LOB_ID
+        _init_VET_LOB_ID = self.draws.initial_VET_LOB_ID
+
+        # Initialize the rolling statistics of the price-to-rent ratios and the fluctuation ratios
+        _initial_buy_cost = self.estimate_buy_cost(_init_VET_LOB_ID)
+        _initial_rent_cost = self.estimate_rent_cost(_init_VTHO_LOB_ID)
         _initial_price_to_rent = _initial_buy_cost / _initial_rent_cost
-        self.price_to_rents = [_initial_price_to_rent, ]
+        self.statistics = RollingStatistics(_initial_price_to_rent)
 
         logging.debug(f"Initialized a STRATEGY-A user with ID {unique_id}")
 
@@ -51,13 +49,10 @@ class ATrendUser(User):
         self.update_b_value()
 
         # Get current buy to rent ratio
-        _price_to_rent = self.price_to_rents[-1]
+        _price_to_rent = self.statistics.last_price_to_rent
 
-        # Calculate the weighted mean fluctuation ratio
-        _a_length = len(self.alphas) if len(
-            self.alphas) < 100 else 100  # effect is negligable after 100
-        _mean_alpha = np.average(
-            self.alphas[-_a_length:], weights=self.alpha_weights[-_a_length:])
+        # Calculate the weighted mean fluctuation ratio (effect is negligable after 100)
+        _mean_alpha = self.statistics.mean_alpha()
         self.weighted_a = _mean_alpha
 
         # Keep adding mean fluctuation ratio to numerator
@@ -77,10 +72,9 @@ class ATrendUser(User):
         """
         _slope_strength = 10
 
-        # Fit a linear regression to the buy-to-rent ratios
-        if len(self.price_to_rents) > 50:
-            slope, intercept = np.polyfit(
-                np.arange(50), self.price_to_rents[-50:], 1)
+        # Fit a linear regression to the last 50 buy-to-rent ratios
+        if self.statistics.num_price_to_rents > 50:
+            slope = self.statistics.slope()
             if slope > 0:
                 self.b = (_slope_strength*slope + 1)
             elif slope < 0:
@@ -105,33 +99,26 @@ class ATrendUser(User):
         # Buy when
         return (self.total_FIAT_spent_rent + _estimated_cost_of_renting) >= self.y * _estimated_cost_of_buying
 
-    def decide_to_buy(self, VTHO_LOB, VET_LOB):
+    def decide_to_buy(self, VTHO_LOB_ID, VET_LOB_ID):
         """Decides whether or not it is time to buy.
 
         Args:
-            VTHO_LOB (List): LOB of the VTHO/USDT pair.
-            VET_LOB (List): LOB of the VET/USDT pair.
+            VTHO_LOB_ID (int): Index of the LOB snapshot of the VTHO/USDT pair.
+            VET_LOB_ID (int): Index of the LOB snapshot of the VET/USDT pair.
 
         Returns:
             Boolean: TRUE when the user needs to buy. False otherwise.
         """
 
         # Estimate the cost of renting and buying based on the LOB's
-        _estimated_cost_of_renting = self.estimate_rent_cost(VTHO_LOB)
-        _estimated_cost_of_buying = self.estimate_buy_cost(VET_LOB)
+        _estimated_cost_of_renting = self.estimate_rent_cost(VTHO_LOB_ID)
+        _estimated_cost_of_buying = self.estimate_buy_cost(VET_LOB_ID)
 
         # Update the user's buy-to-rent ratio
         self.buy_to_rent = _estimated_cost_of_buying / _estimated_cost_of_renting
 
-        # Update the price-to-rent array
-        self.price_to_rents.append(self.buy_to_rent)
-
-        # Update alpha
-        if self.price_to_rents[-1] >= self.price_to_rents[-2]:
-            _alpha = self.price_to_rents[-1] / self.price_to_rents[-2]
-        else:
-            _alpha = self.price_to_rents[-2] / self.price_to_rents[-1]
-        self.alphas.append(_alpha)
+        # Update the price-to-rent ratios and alphas
+        self.statistics.add(self.buy_to_rent)
 
         # Update the current y
         self.update_y_value()
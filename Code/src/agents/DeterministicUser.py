@@ -9,6 +9,9 @@ class DeterministicUser(User):
         User (class): Base class for a user in the model.
     """
 
+    __slots__ = ()
+    strategy = "DET"
+
     def __init__(self, unique_id, model, user_size):
         """Initializes a DeterministicUser agent.
 
@@ -23,20 +26,20 @@ class DeterministicUser(User):
 
         logging.debug(f"Initialized a DETERMINISTIC user with ID {unique_id}")
 
-    def decide_to_buy(self, VTHO_LOB, VET_LOB):
+    def decide_to_buy(self, VTHO_LOB_ID, VET_LOB_ID):
         """Decides whether or not it is time to buy.
 
         Args:
-            VTHO_LOB (List): LOB of the VTHO/USDT pair.
-            VET_LOB (List): LOB of the VET/USDT pair.
+            VTHO_LOB_ID (int): Index of the LOB snapshot of the VTHO/USDT pair.
+            VET_LOB_ID (int): Index of the LOB snapshot of the VET/USDT pair.
 
         Returns:
             Boolean: TRUE when the user needs to buy. False otherwise.
         """
 
         # Estimate the cost of buying and renting
-        _estimated_cost_of_renting = self.estimate_rent_cost(VTHO_LOB)
-        _estimated_cost_of_buying = self.estimate_buy_cost(VET_LOB)
+        _estimated_cost_of_renting = self.estimate_rent_cost(VTHO_LOB_ID)
+        _estimated_cost_of_buying = self.estimate_buy_cost(VET_LOB_ID)
 
         # Update the user's buy-to-rent ratio
         self.buy_to_rent = _estimated_cost_of_buying / _estimated_cost_of_renting
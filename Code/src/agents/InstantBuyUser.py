@@ -9,6 +9,9 @@ class InstantBuyUser(User):
         User (class): Base class for a user in the model.
     """
 
+    __slots__ = ()
+    strategy = "INSTANT-BUY"
+
     def __init__(self, unique_id, model, user_size):
         """Initializes a InstantBuyUser agent.
 
@@ -23,12 +26,12 @@ class InstantBuyUser(User):
 
         logging.debug(f"Initialized a INSTANT BUY user with ID {unique_id}")
 
-    def decide_to_buy(self, VTHO_LOB, VET_LOB):
+    def decide_to_buy(self, VTHO_LOB_ID, VET_LOB_ID):
         """Decides whether or not it is time to buy.
 
         Args:
-            VTHO_LOB (List): LOB of the VTHO/USDT pair.
-            VET_LOB (List): LOB of the VET/USDT pair.
+            VTHO_LOB_ID (int): Index of the LOB snapshot of the VTHO/USDT pair.
+            VET_LOB_ID (int): Index of the LOB snapshot of the VET/USDT pair.
 
         Returns:
             Boolean: TRUE when the user needs to buy. False otherwise.
@@ -3,7 +3,6 @@ from Model.Code.src.agents.User import User
 from scipy.stats import rv_discrete, rv_continuous
 import numpy as np
 import logging
-from random import randint
 
 
 class RandomUser(User):
@@ -13,6 +12,9 @@ class RandomUser(User):
         User (class): Base class for a user in the model.
     """
 
+    __slots__ = ("day_of_buying",)
+    strategy = "RANDOM"
+
     def __init__(self, unique_id, model, user_size):
         """Initializes a RandomizedUser agent.
 
@@ -26,16 +28,16 @@ class RandomUser(User):
         super().__init__(unique_id, model, user_size)
 
         # Determine when to buy by selecting a random day in the range [0,simulation_length]
-        self.day_of_buying = randint(0, self.model.simulation_length)
+        self.day_of_buying = self.draws.day_of_buying
 
         logging.debug(f"Initialized a RANDOM user with ID {unique_id}")
 
-    def decide_to_buy(self, VTHO_LOB, VET_LOB):
+    def decide_to_buy(self, VTHO_LOB_ID, VET_LOB_ID):
         """Decides whether or not it is time to buy.
 
         Args:
-            VTHO_LOB (List): LOB of the VTHO/USDT pair.
-            VET_LOB (List): LOB of the VET/USDT pair.
+            VTHO_LOB_ID (int): Index of the LOB snapshot of the VTHO/USDT pair.
+            VET_LOB_ID (int): Index of the LOB snapshot of the VET/USDT pair.
 
         Returns:
             Boolean: TRUE when the user needs to buy. False otherwise.
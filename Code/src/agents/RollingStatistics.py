@@ -0,0 +1,139 @@
+from Model.Code.src.population.DecisionKernels import ALPHA_WINDOW, TREND_WINDOW
+import numpy as np
+
+
+class RollingStatistics:
+    """Rolling statistics of the price-to-rent ratios of a user, updated in constant time and memory per day.
+
+    The last price-to-rent ratios and fluctuation ratios (alphas) are kept in fixed-size ring buffers. The running sums
+    that give the slope of a linear regression over the last ratios and the exponentially weighted mean of the last alphas
+    are updated with every new ratio. They are recomputed from the buffers once per full turn of a buffer, so that rounding
+    errors do not accumulate.
+    """
+
+    def __init__(self, initial_price_to_rent, trend_window=TREND_WINDOW, alpha_window=ALPHA_WINDOW, alpha_decay=0.9):
+        """Initializes the statistics with the first price-to-rent ratio and an alpha of 1.
+
+        Args:
+            initial_price_to_rent (float): The price-to-rent ratio of the first day.
+            trend_window (int): Number of price-to-rent ratios used for the regression.
+            alpha_window (int): Number of alphas used for the weighted mean.
+            alpha_decay (float): Weight of an alpha relative to the alpha of the next day.
+        """
+
+        self.trend_window = trend_window
+        self.alpha_window = alpha_window
+        self.alpha_decay = alpha_decay
+        self.num_price_to_rents = 0
+        self.num_alphas = 0
+
+        # Price-to-rent ratios, their sum and their position-weighted sum (the oldest ratio has position 0)
+        self.price_to_rents = np.zeros(trend_window)
+        self._sum = 0.0
+        self._weighted_sum = 0.0
+        self._x_mean = (trend_window - 1) / 2
+        self._sxx = np.sum((np.arange(trend_window) - self._x_mean) ** 2)
+
+        # Alphas and their exponentially weighted sum (the most recent alpha has weight 1)
+        self.alphas = np.zeros(alpha_window)
+        self._alpha_weights = alpha_decay ** np.arange(alpha_window)
+        self._alpha_weight_sums = np.cumsum(self._alpha_weights)
+        self._weighted_alpha_sum = 0.0
+
+        self.last_price_to_rent = initial_price_to_rent
+        self._add_price_to_rent(initial_price_to_rent)
+        self._add_alpha(1)
+
+    def add(self, price_to_rent):
+        """Adds the price-to-rent ratio of a new day and the fluctuation ratio with respect to the previous day.
+
+        Args:
+            price_to_rent (float): The price-to-rent ratio of the new day.
+
+        Returns:
+            float: The fluctuation ratio (alpha).
+        """
+
+        if price_to_rent >= self.last_price_to_rent:
+            _alpha = price_to_rent / self.last_price_to_rent
+        else:
+            _alpha = self.last_price_to_rent / price_to_rent
+        self.last_price_to_rent = price_to_rent
+
+        self._add_price_to_rent(price_to_rent)
+        self._add_alpha(_alpha)
+        return _alpha
+
+    def _add_price_to_rent(self, price_to_rent):
+        """Adds a price-to-rent ratio to its ring buffer and updates the sums of the regression."""
+
+        _slot = self.num_price_to_rents % self.trend_window
+        self.num_price_to_rents += 1
+
+        if self.num_price_to_rents <= self.trend_window:
+            # The buffer is not yet full, the ratio gets the next position
+            self._weighted_sum += (self.num_price_to_rents - 1) * price_to_rent
+            self._sum += price_to_rent
+        else:
+            # Every ratio moves one position back and the oldest ratio is replaced
+            _oldest = self.price_to_rents[_slot]
+            self._weighted_sum += -(self._sum - _oldest) + (self.trend_window - 1) * price_to_rent
+            self._sum += price_to_rent - _oldest
+        self.price_to_rents[_slot] = price_to_rent
+
+        if _slot == self.trend_window - 1:
+            _ordered = self.window(self.price_to_rents, self.num_price_to_rents)
+            self._sum = np.sum(_ordered)
+            self._weighted_sum = np.arange(len(_ordered)) @ _ordered
+
+    def _add_alpha(self, alpha):
+        """Adds an alpha to its ring buffer and updates the weighted sum."""
+
+        _slot = self.num_alphas % self.alpha_window
+        _oldest = self.alphas[_slot] if self.num_alphas >= self.alpha_window else 0
+        self.num_alphas += 1
+
+        self._weighted_alpha_sum = self.alpha_decay * self._weighted_alpha_sum + alpha - \
+            (self.alpha_decay ** self.alpha_window) * _oldest
+        self.alphas[_slot] = alpha
+
+        if _slot == self.alpha_window - 1:
+            _ordered = self.window(self.alphas, self.num_alphas)
+            self._weighted_alpha_sum = self._alpha_weights[:len(_ordered)] @ _ordered[::-1]
+
+    @staticmethod
+    def window(buffer, num_values):
+        """Orders the values in a ring buffer from the oldest to the most recent value.
+
+        Args:
+            buffer (ndarray): The ring buffer.
+            num_values (int): Number of values that have been added to the buffer.
+
+        Returns:
+            ndarray: The values that are in the buffer.
+        """
+
+        if num_values <= len(buffer):
+            return buffer[:num_values]
+        _start = num_values % len(buffer)
+        return np.concatenate([buffer[_start:], buffer[:_start]])
+
+    def slope(self):
+        """Determines the slope of a linear regression over the last price-to-rent ratios.
+
+        Returns:
+            float: The slope, or None when the buffer is not yet full.
+        """
+
+        if self.num_price_to_rents < self.trend_window:
+            return None
+        return (self._weighted_sum - self._x_mean * self._sum) / self._sxx
+
+    def mean_alpha(self):
+        """Determines the exponentially weighted mean of the last alphas.
+
+        Returns:
+            float: The weighted mean alpha.
+        """
+
+        return self._weighted_alpha_sum / self._alpha_weight_sums[min(self.num_alphas, self.alpha_window) - 1]
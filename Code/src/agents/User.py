@@ -1,15 +1,28 @@
+from time import perf_counter
 from mesa import Agent
 # from random import randint
-import logging
+from Model.Code.src.population.UserPopulation import RENTING, BOUGHT, STATE_NAMES
+import Model.Code.src.tracing.EventTracer as tracing
 
 
 class User(Agent):
     """An agent that acts as a user of the network.
 
+    The state is stored as one of the integer codes RENTING and BOUGHT, and every attribute has a fixed type and a slot.
+    A shadow user is a price taker: their orders do not move the prices and do not change the circulating supplies.
+
     Args:
         Agent (class): Base class for Mesa agents.
     """
 
+    __slots__ = ("active", "state", "rent_until_spent", "bought_at_day", "CR", "VET", "VTHO", "total_VTHO_bought",
+                 "total_VET_bought", "total_FIAT_spent_rent", "total_FIAT_spent_buying", "max_days", "optimal",
+                 "weighted_a", "max_a", "y", "b", "buy_to_rent", "VTHO_LOB_ID", "VET_LOB_ID", "user_size", "VET_needed",
+                 "is_first_step", "initial_buy_price", "potential_FIAT_spent_rent", "draws", "shadow")
+
+    # Name of the strategy of the user, as in the model parameters
+    strategy = None
+
     def __init__(self, unique_id, model, user_size):
         """Initializes a User!
 
@@ -22,31 +35,36 @@ class User(Agent):
         # Initialize an agent
         super().__init__(unique_id, model)
 
+        # Draw all random numbers of the user at once
+        self.draws = self.model.streams.user_draws(unique_id)
+
         self.active = True
-        self.state = "RENTING"
+        self.shadow = False
+        self.state = RENTING
 
-        self.rent_until_spent = 0
+        self.rent_until_spent = 0.0
         self.bought_at_day = 0
-        self.CR = 0
+        self.CR = 0.0
 
-        self.VET = 0
-        self.VTHO = 0
-        self.total_VTHO_bought = 0
-        self.total_VET_bought = 0
+        self.VET = 0.0
+        self.VTHO = 0.0
+        self.total_VTHO_bought = 0.0
+        self.total_VET_bought = 0.0
 
-        self.total_FIAT_spent_rent = 0
-        self.total_FIAT_spent_buying = 0
+        self.total_FIAT_spent_rent = 0.0
+        self.total_FIAT_spent_buying = 0.0
 
         self.max_days = self.set_max_days()
-        self.optimal = 0
-        self.alphas = []
-        self.weighted_a = 1
-        self.max_a = 1
-        self.y = 0
-        self.b = 0
+        self.optimal = 0.0
+        self.weighted_a = 1.0
+        self.max_a = 1.0
+        self.y = 0.0
+        self.b = 0.0
+        self.buy_to_rent = 0.0
 
-        self.VTHO_LOB_ID = []
-        self.VET_LOB_ID = []
+        # LOB snapshots of the last renting day, -1 before the first day
+        self.VTHO_LOB_ID = -1
+        self.VET_LOB_ID = -1
 
         # Determine the VET needed to generate required daily VTHO
         self.user_size = user_size
@@ -54,8 +72,14 @@ class User(Agent):
 
         # Metrics for eventual CR calculation
         self.is_first_step = True
-        self.initial_buy_price = 0
-        self.potential_FIAT_spent_rent = 0
+        self.initial_buy_price = 0.0
+        self.potential_FIAT_spent_rent = 0.0
+
+    @property
+    def state_name(self):
+        """The name of the state of the user, either `RENTING' or `BOUGHT'."""
+
+        return STATE_NAMES[self.state]
 
     def step(self):
         """Step function of the user. Defines all the actions that the user makes in one step/day.
@@ -65,14 +89,14 @@ class User(Agent):
 
             if self.model.experiment_setting in ["OG-SKI-RENTAL"]:
                 # Different functions for the OG problem, for speed
-                if self.state == "BOUGHT":
+                if self.state == BOUGHT:
                     self.OG_bought_step()
-                elif self.state == "RENTING":
+                elif self.state == RENTING:
                     self.OG_renting_step()
             else:
-                if self.state == "BOUGHT":
+                if self.state == BOUGHT:
                     self.bought_step()
-                elif self.state == "RENTING":
+                elif self.state == RENTING:
                     self.renting_step()
 
             # Handle usage trend?
@@ -105,16 +129,18 @@ class User(Agent):
             # Determine the achieved CR
             self.set_CR()
 
-            # Set user to inactive
+            # Set user to inactive and remove them from the schedule
             self.active = False
+            self.model.deactivate_user(self)
 
-            logging.warning(
-                f"User {self.unique_id} [{self.state}] has reached their max. number of active days on day {self.model.schedule.steps}.")
+            if tracing.tracer is not None:
+                tracing.tracer.deactivation(self.model.schedule.steps, self.unique_id, self.state == BOUGHT, self.CR,
+                                            self.total_FIAT_spent_rent, self.total_FIAT_spent_buying)
 
     def set_max_days(self):
         """Plays the adversary. Randomly chooses a last day for the user from a uniform distribution with range [1,simulation_length]
         """
-        return self.random.randint(1, self.model.simulation_length)
+        return self.draws.max_days
         # return 3649
 
     def set_CR(self):
@@ -128,8 +154,6 @@ class User(Agent):
         self.CR = (self.total_FIAT_spent_rent +
                    self.total_FIAT_spent_buying) / optimal
         self.optimal = optimal
-        logging.warning(
-            f"User {self.unique_id} became inactive and achieved CR: {self.CR}")
 
     def OG_bought_step(self):
         """Handles the actions of users in the OG settings that have already bought VET.
@@ -150,8 +174,15 @@ class User(Agent):
             self.initial_buy_price = self.VET_needed * self.model.economy.VET_price
             self.is_first_step = False
 
-        # Check whether to buy at this point in time
-        if self.OG_decide_to_buy():
+        # Check whether to buy at this point in time (timed when the model is profiled)
+        if self.model.profiler is None:
+            _buy = self.OG_decide_to_buy()
+        else:
+            _start = perf_counter()
+            _buy = self.OG_decide_to_buy()
+            self.model.profiler.add(f"{type(self).__name__}.OG_decide_to_buy", perf_counter() - _start)
+
+        if _buy:
 
             # Log the would-be rent cost
             self.potential_FIAT_spent_rent += self.model.economy.VTHO_price * self.user_size
@@ -178,9 +209,8 @@ class User(Agent):
         self.VTHO += self.user_size
 
         # Log the would-be rent costs for the CR calculation
-        _VTHO_LOB = self.model.economy.LOB_VTHO.iloc[self.random.randint(
-            0, 99), :]
-        self.potential_FIAT_spent_rent += self.estimate_rent_cost(_VTHO_LOB)
+        _, _VTHO_LOB_ID = self.draws.LOB_IDs(self.model.schedule.steps)
+        self.potential_FIAT_spent_rent += self.estimate_rent_cost(_VTHO_LOB_ID)
 
         # Make the daily transactions
         self.make_transactions()
@@ -190,29 +220,32 @@ class User(Agent):
         """
 
         # Generate random VET and VTHO LOB's to act as the current state of the exchange
-        rando_VET = self.random.randint(0, 99)
-        rando_VTHO = self.random.randint(0, 99)
-        _VET_LOB = self.model.economy.LOB_VET.iloc[rando_VET, :]
-        _VTHO_LOB = self.model.economy.LOB_VTHO.iloc[rando_VTHO, :]
+        rando_VET, rando_VTHO = self.draws.LOB_IDs(self.model.schedule.steps)
 
-        logging.warning(f"User selected VTHO LOB {rando_VTHO}")
         self.VTHO_LOB_ID = rando_VTHO
         self.VET_LOB_ID = rando_VET
 
         if self.is_first_step:
             # Determine the initial buy price (used for calculating the optimal performance and CR)
-            self.initial_buy_price = self.estimate_buy_cost(_VET_LOB)
+            self.initial_buy_price = self.estimate_buy_cost(rando_VET)
             self.is_first_step = False
 
-        # Check whether to buy at this point in time
-        if self.decide_to_buy(_VTHO_LOB, _VET_LOB):
+        # Check whether to buy at this point in time (timed when the model is profiled)
+        if self.model.profiler is None:
+            _buy = self.decide_to_buy(rando_VTHO, rando_VET)
+        else:
+            _start = perf_counter()
+            _buy = self.decide_to_buy(rando_VTHO, rando_VET)
+            self.model.profiler.add(f"{type(self).__name__}.decide_to_buy", perf_counter() - _start)
+
+        if _buy:
 
             # Log the would-be rent costs for the CR calculation
             self.potential_FIAT_spent_rent += self.estimate_rent_cost(
-                _VTHO_LOB)
+                rando_VTHO)
 
             # Buy the required amount of VET
-            self.buy_VET(_VET_LOB)
+            self.buy_VET(rando_VET)
 
             # Log the day of buying
             self.bought_at_day = self.model.schedule.steps
@@ -220,7 +253,7 @@ class User(Agent):
         # This else is controversial since you could say that the buyer needs to wait a full day before benefitting from the bought VET.
         # However, it is only a small assumption and this maps better to the original Ski Rental Problem.
         else:
-            self.buy_VTHO(_VTHO_LOB)
+            self.buy_VTHO(rando_VTHO)
 
         # Add the generated/bought VTHO
         self.VTHO += self.user_size
@@ -236,31 +269,22 @@ class User(Agent):
         self.VTHO -= self.user_size
 
         # Destroy 70% of the spent VTHO
-        self.model.economy.decrease_circulating_VTHO(0.7 * self.user_size)
+        if not self.shadow:
+            self.model.economy.decrease_circulating_VTHO(0.7 * self.user_size)
 
-        logging.debug(
-            f"User {self.unique_id} [{self.state}] made their transactions.")
-
-    def estimate_rent_cost(self, LOB):
+    def estimate_rent_cost(self, LOB_ID):
         """Estimates the cost of renting for this day based on the given LOB
 
         Args:
-            LOB (List): Limit order book of the VTHO/USDT pair.
+            LOB_ID (int): Index of the snapshot of the limit order book of the VTHO/USDT pair.
 
         Returns:
             float: The estimated cost in FIAT of renting on this day.
         """
 
-        # Select only the asks
-        _LOB_orders = LOB[50:]
-
-        # Calculate how much to buy/sell and how many ticks it would move the price
-        _relative_order_size = self.user_size / self.model.economy.liquidity_VTHO
-        _tick_change = _LOB_orders.cumsum().searchsorted(_relative_order_size)
-
-        # Calculate how much to buy from the last of the i orders
-        _amount_from_last_order = self.user_size - \
-            sum([_LOB_orders[i]*self.model.economy.liquidity_VTHO for i in range(_tick_change)])
+        # Calculate how many ticks the order would move the price and how much to buy from the last of the asks
+        _tick_change, _filled, _filled_ticks, _amount_from_last_order = self.model.economy.VTHO_quotes.fill(
+            LOB_ID, self.user_size, self.model.economy.liquidity_VTHO)
 
         # Calulate how much you would pay for the amount that you need from the last ask
         _price_paid_last_order = _amount_from_last_order * \
@@ -268,31 +292,24 @@ class User(Agent):
              (_tick_change * self.model.economy.VTHO_LOB_tick_size))
 
         # Calculate total price that you would pay if you rent today
-        _estimated_cost_of_renting = sum([_LOB_orders[i]*self.model.economy.liquidity_VTHO*(self.model.economy.VTHO_price + (
-            i * self.model.economy.VTHO_LOB_tick_size)) for i in range(_tick_change)]) + _price_paid_last_order
+        _estimated_cost_of_renting = (self.model.economy.VTHO_price * _filled) + \
+            (self.model.economy.VTHO_LOB_tick_size * _filled_ticks) + _price_paid_last_order
 
         return _estimated_cost_of_renting
 
-    def estimate_buy_cost(self, LOB):
+    def estimate_buy_cost(self, LOB_ID):
         """Estimates the cost of buying on this day based on the given LOB
 
         Args:
-            LOB (List): Limit order book of the VET/USDT pair.
+            LOB_ID (int): Index of the snapshot of the limit order book of the VET/USDT pair.
 
         Returns:
             float: The estimated cost in FIAT of buying today.
         """
 
-        # Select only the asks
-        _LOB_orders = LOB[50:]
-
-        # Calculate how much to buy/sell and the effect on price
-        _relative_order_size = self.VET_needed / self.model.economy.liquidity_VET
-        _tick_change = _LOB_orders.cumsum().searchsorted(_relative_order_size)
-
-        # Calculate how much to buy from the last of the i orders
-        _amount_from_last_order = self.VET_needed - \
-            sum([_LOB_orders[i]*self.model.economy.liquidity_VET for i in range(_tick_change)])
+        # Calculate how many ticks the order would move the price and how much to buy from the last of the asks
+        _tick_change, _filled, _filled_ticks, _amount_from_last_order = self.model.economy.VET_quotes.fill(
+            LOB_ID, self.VET_needed, self.model.economy.liquidity_VET)
 
         # Calulate how much you would pay for the amount that you need from the last ask
         _price_paid_last_order = _amount_from_last_order * \
@@ -300,8 +317,8 @@ class User(Agent):
              (_tick_change * self.model.economy.VET_LOB_tick_size))
 
         # Calculate total price that you would pay if you buy today
-        _estimated_cost_of_buying = sum([_LOB_orders[i]*self.model.economy.liquidity_VET*(self.model.economy.VET_price + (
-            i * self.model.economy.VET_LOB_tick_size)) for i in range(_tick_change)]) + _price_paid_last_order
+        _estimated_cost_of_buying = (self.model.economy.VET_price * _filled) + \
+            (self.model.economy.VET_LOB_tick_size * _filled_ticks) + _price_paid_last_order
 
         return _estimated_cost_of_buying
 
@@ -310,7 +327,7 @@ class User(Agent):
         """
 
         # Update the user's state
-        self.state = "BOUGHT"
+        self.model.set_user_state(self, BOUGHT)
 
         # Buy the required VET
         _price_paid = self.model.economy.VET_price * self.VET_needed
@@ -328,43 +345,46 @@ class User(Agent):
         # Update the user's buy expenses
         self.update_rent_expenses(self.user_size, _price_paid)
 
-    def buy_VET(self, LOB):
+    def buy_VET(self, LOB_ID):
         """Buys VET and updates the state of the user accordingly.
+
+        Args:
+            LOB_ID (int): Index of the VET LOB snapshot to buy from.
         """
 
         # Update the user's state
-        self.state = "BOUGHT"
+        self.model.set_user_state(self, BOUGHT)
 
         # Buy the required VET
         _price_paid = self.model.economy.VET_order(
-            self.VET_needed, LOB, order_type="BUY")
+            self.VET_needed, LOB_ID, order_type="BUY", influence_price=not self.shadow)
         self.VET += self.VET_needed
 
         # Update the user's buy expenses
         self.update_buy_expenses(self.VET_needed, _price_paid)
 
         # Subtract the VET from the circulating supply
-        self.model.economy.decrease_circulating_VET(self.VET_needed)
+        if not self.shadow:
+            self.model.economy.decrease_circulating_VET(self.VET_needed)
 
-        logging.warning(
-            f"User {self.unique_id} has decided to buy VET after spending {self.total_FIAT_spent_rent} on rent!")
-        logging.debug(
-            f"User {self.unique_id} bought {self.VET_needed} VET for a FIAT price of {_price_paid}")
+        if tracing.tracer is not None:
+            tracing.tracer.buy_decision(self.model.schedule.steps, self.unique_id, LOB_ID, self.VET_needed,
+                                        self.total_FIAT_spent_rent, _price_paid)
 
-    def buy_VTHO(self, LOB):
+    def buy_VTHO(self, LOB_ID):
         """Buys VTHO and updates the state of the user accordingly.
+
+        Args:
+            LOB_ID (int): Index of the VTHO LOB snapshot to buy from.
         """
 
         # Buy the required VTHO
         _price_paid = self.model.economy.VTHO_order(
-            self.user_size, LOB, order_type="BUY")
+            self.user_size, LOB_ID, order_type="BUY", influence_price=not self.shadow)
 
         # Update the rent expenses
         self.update_rent_expenses(self.user_size, _price_paid)
 
-        logging.debug(
-            f"User {self.unique_id} bought {self.user_size} VTHO for a FIAT price of {_price_paid}")
-
     def update_rent_expenses(self, VTHO_bought, FIAT_expense):
         """Updates the user's expenses from renting.
 
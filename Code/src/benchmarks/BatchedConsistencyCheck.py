@@ -0,0 +1,127 @@
+import argparse
+import logging
+import sys
+from Model.Code.src.benchmarks.SimulationBenchmark import STRATEGIES, experiment_parameters
+from Model.Code.src.models.BatchedNetworkModel import BatchedNetworkModel
+from Model.Code.src.models.EconomicModel import EconomicModel
+from Model.Code.src.models.NetworkModel import NetworkModel
+
+
+# Results that both paths report for the main user and its run
+COMPARED_COLUMNS = ["Step", "VET_price", "VTHO_price", "buy_to_rent", "adoption_ratio", "main_user_CR", "active", "state",
+                    "bought_at_day", "VET", "user_size", "VET_needed", "rent_until_spent", "potential_FIAT_spent_rent",
+                    "total_FIAT_spent_rent", "total_FIAT_spent_buying", "initial_buy_price", "optimal", "CR"]
+
+
+def stepped_results(economy_kwargs, model_kwargs, max_steps, max_days, seed=0):
+    """Steps a `NetworkModel` in the same way as Mesa's `batch_run` and reports the results of its main user.
+
+    Args:
+        economy_kwargs (dict): Arguments of the `EconomicModel`.
+        model_kwargs (dict): Arguments of the `NetworkModel`, without the economic model.
+        max_steps (int): Maximum number of model steps after which the model halts.
+        max_days (int): Max. number of days of the main user, which replaces the drawn value.
+        seed (int): Seed of the model.
+
+    Returns:
+        Tuple: The reported results and the main user.
+    """
+
+    model = NetworkModel(economic_model=EconomicModel(**economy_kwargs), seed=seed, **model_kwargs)
+    model.main_user.max_days = max_days
+    while model.running and model.schedule.steps <= max_steps:
+        model.step()
+
+    # Mesa reports the data of the second-to-last collection
+    _step = model.schedule.steps - 1
+    _results = {"Step": _step, **model.datacollector.get_model_vars_dataframe().loc[_step]}
+    _results.update(model.datacollector.get_agent_vars_dataframe().loc[(_step, model.main_user.unique_id)])
+    return _results, model.main_user
+
+
+def batched_results(economy_kwargs, model_kwargs, max_steps, user, seed=0):
+    """Runs a single iteration of a `BatchedNetworkModel`, as `batched_run` does, with the random draws of a user.
+
+    Args:
+        economy_kwargs (dict): Arguments of the `EconomicModel`.
+        model_kwargs (dict): Arguments of the `NetworkModel`, without the economic model.
+        max_steps (int): Maximum number of model steps after which the model halts.
+        user (User): User whose max. days, day of buying and rent threshold are used.
+        seed (int): Seed of the model.
+
+    Returns:
+        dict: The reported results.
+    """
+
+    _model_kwargs = {key: value for key, value in model_kwargs.items() if key != "data_sampling"}
+    model = BatchedNetworkModel(1, economic_model=EconomicModel(**economy_kwargs), seed=seed, **_model_kwargs)
+    model.population.max_days[:] = user.max_days
+    if hasattr(user, "day_of_buying"):
+        model.population.day_of_buying[:] = user.day_of_buying
+    if hasattr(user, "rent_until_spent_norm"):
+        model.population.rent_until_spent_norm[:] = user.rent_until_spent_norm
+    model.run(max_steps)
+
+    return {"Step": model.final_step[0], **model.get_results().iloc[0]}
+
+
+def check_batched_model(experiment_setting, main_user_strategy, simulation_length, max_steps, max_days,
+                        price_trend_setting="VET-up", seed=0):
+    """Checks that the batched model reports the same results as the stepped `NetworkModel`.
+
+    Args:
+        experiment_setting (String): Experiment setting of a single user, see `experiment_parameters`.
+        main_user_strategy (String): Strategy of the main user.
+        simulation_length (int): Number of days in the simulation.
+        max_steps (int): Maximum number of model steps after which the models halt.
+        max_days (int): Max. number of days of the user.
+        price_trend_setting (String): External price trend of the economy.
+        seed (int): Seed of the models.
+
+    Returns:
+        List: The column and both values of every result that differs.
+    """
+
+    _economy_kwargs, _model_kwargs = experiment_parameters(experiment_setting, main_user_strategy, simulation_length)
+    _economy_kwargs["price_trend_setting"] = price_trend_setting
+    _model_kwargs["data_sampling"] = "all"
+
+    _stepped, _user = stepped_results(_economy_kwargs, _model_kwargs, max_steps, max_days, seed)
+    _batched = batched_results(_economy_kwargs, _model_kwargs, max_steps, _user, seed)
+    return [(column, _batched[column], _stepped[column]) for column in COMPARED_COLUMNS
+            if _batched[column] != _stepped[column]]
+
+
+def main():
+    """Runs the check from the command line, e.g.
+    `python -m Model.Code.src.benchmarks.BatchedConsistencyCheck --simulation-length 7300 --max-steps 300`.
+    The max. days of the user are chosen around the max. number of steps, so that users that stop before, at and after
+    the last step are covered.
+    """
+
+    _parser = argparse.ArgumentParser(description="Checks the batched model against the stepped network model.")
+    _parser.add_argument("--experiment-setting", default="OG-SKI-RENTAL", help="Experiment setting of a single user.")
+    _parser.add_argument("--simulation-length", type=int, default=7300, help="Number of days in the simulation.")
+    _parser.add_argument("--max-steps", type=int, default=300, help="Max. number of steps of the models.")
+    _parser.add_argument("--seed", type=int, default=0, help="Seed of the models.")
+    _args = _parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    _max_days = sorted({days for days in [1, _args.max_steps // 2, _args.max_steps - 2, _args.max_steps - 1,
+                                          _args.max_steps, _args.max_steps + 1, _args.simulation_length]
+                        if 1 <= days <= _args.simulation_length})
+
+    _num_differences = 0
+    for strategy in STRATEGIES:
+        for max_days in _max_days:
+            for column, batched, stepped in check_batched_model(_args.experiment_setting, strategy,
+                                                                _args.simulation_length, _args.max_steps, max_days,
+                                                                seed=_args.seed):
+                print(f"{strategy} max_days={max_days} {column}: batched {batched}, stepped {stepped}")
+                _num_differences += 1
+    print(f"{_num_differences} differences")
+    sys.exit(1 if _num_differences else 0)
+
+
+if __name__ == "__main__":
+    main()
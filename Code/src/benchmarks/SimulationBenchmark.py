@@ -0,0 +1,330 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from Model.Code.src.models.EconomicModel import EconomicModel
+from Model.Code.src.models.NetworkModel import NetworkModel
+from Model.Code.src.runners.PoolRunner import pool_run
+import numpy as np
+
+
+# All strategies of the main user
+STRATEGIES = ["RANDOM", "KEEP-RENTING", "INSTANT-BUY", "DET", "RAND", "A-ADAPTED", "A-TREND"]
+
+# Network settings of the experiments
+GENERATION_RATE = 0.000432
+TOTAL_STARTING_VET = 86712634466.0
+TOTAL_STARTING_VTHO = 38396354542
+
+# Simulation length of the production sweeps per experiment setting
+PRODUCTION_LENGTHS = {
+    "OG-SKI-RENTAL": 50,
+    "SINGLE-USER-EXCHANGE": 3650,
+    "SINGLE-USER-EXCHANGE-SPECULATION": 3650,
+    "MAS": 7300,
+}
+
+# Default points of the scaling curves
+AGENT_COUNTS = [4, 16, 64, 256]
+SIMULATION_LENGTHS = [365, 1825, 3650, 7300]
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def experiment_parameters(experiment_setting, main_user_strategy, simulation_length, num_users=4):
+    """Builds the arguments of the economy and the network model in the same way as the experiment notebooks.
+
+    Args:
+        experiment_setting (String): One of the keys of `PRODUCTION_LENGTHS`.
+        main_user_strategy (String): Strategy of the main user.
+        simulation_length (int): Number of days in the simulation.
+        num_users (int): Number of users in the MAS setting, the other settings have a single user.
+
+    Returns:
+        Tuple: The arguments of the `EconomicModel` and of the `NetworkModel`, without the economic model.
+    """
+
+    _economy_kwargs = {
+        "economic_influences": "None",
+        "price_trend_setting": "VET-up" if experiment_setting == "SINGLE-USER-EXCHANGE-SPECULATION" else "None",
+        "price_trend_length": simulation_length,
+        "steps_between_price_trend": simulation_length / 365,
+        "VET_starting_price": 0.0235,
+        "VTHO_starting_price": 0.0015,
+        "total_starting_VET": TOTAL_STARTING_VET,
+        "total_starting_VTHO": TOTAL_STARTING_VTHO,
+        "VET_liquidity_ratio": 0.00674,
+        "VTHO_liquidity_ratio": 0.01226,
+    }
+
+    if experiment_setting == "OG-SKI-RENTAL":
+        # Fixed prices, unit usage and a unit generation rate
+        _economy_kwargs.update(VET_starting_price=10, VTHO_starting_price=1, VET_liquidity_ratio=1, VTHO_liquidity_ratio=1)
+        _generation_rate = 1
+        _usage = 1
+        _user_size = 1
+        _usage_trend = "STABLE-SMALL"
+    elif experiment_setting == "MAS":
+        # Several large users that share 80% of the generated VTHO
+        _generation_rate = GENERATION_RATE
+        _usage = TOTAL_STARTING_VET * GENERATION_RATE * 0.8
+        _user_size = _usage / num_users
+        _usage_trend = "STABLE-LARGE"
+    else:
+        # A single user that uses 60% of the generated VTHO
+        _generation_rate = GENERATION_RATE
+        _usage = TOTAL_STARTING_VET * GENERATION_RATE * 0.6
+        _user_size = _usage
+        _usage_trend = "STABLE-SMALL"
+
+    _model_kwargs = {
+        "experiment_setting": experiment_setting,
+        "simulation_length": simulation_length,
+        "generation_rate": _generation_rate,
+        "initial_VTHO_usage": _usage,
+        "final_VTHO_usage": _usage,
+        "small_user_size": _user_size,
+        "large_user_size": _user_size,
+        "usage_trend": _usage_trend,
+        "usage_trend_length": simulation_length,
+        "starting_usage_trend_size": 0,
+        "user_strategies": "RANDOM",
+        "main_user_strategy": main_user_strategy,
+        "data_sampling": "final",
+    }
+    return _economy_kwargs, _model_kwargs
+
+
+def run_model(economy_kwargs, model_kwargs, seed):
+    """Builds and runs a single model in the same way as the `PoolRunner`.
+
+    Returns:
+        Tuple: The number of steps made, the seconds spent on building the model and the seconds spent on stepping.
+    """
+
+    _start = time.perf_counter()
+    model = NetworkModel(economic_model=EconomicModel(**economy_kwargs), seed=seed, **model_kwargs)
+    _built = time.perf_counter()
+    while model.running and model.schedule.steps <= model_kwargs["simulation_length"]:
+        model.step()
+    _finished = time.perf_counter()
+
+    return model.schedule.steps, _built - _start, _finished - _built
+
+
+def benchmark_model(experiment_setting, main_user_strategy, simulation_length=None, num_users=4, repeats=3, seed=0):
+    """Measures the throughput and the peak memory of runs of a single model.
+
+    An untimed run first loads the market data, which is shared by all runs of a process. The runs are timed without
+    memory tracing. The peak memory is measured in a separate run, since tracing slows down every allocation.
+
+    Args:
+        experiment_setting (String): One of the keys of `PRODUCTION_LENGTHS`.
+        main_user_strategy (String): Strategy of the main user.
+        simulation_length (int): Number of days in the simulation, the length of the production sweeps when None.
+        num_users (int): Number of users in the MAS setting.
+        repeats (int): Number of timed runs, each with its own seed.
+        seed (int): Seed of the first run.
+
+    Returns:
+        dict: The benchmark record.
+    """
+
+    if simulation_length is None:
+        simulation_length = PRODUCTION_LENGTHS[experiment_setting]
+    _economy_kwargs, _model_kwargs = experiment_parameters(
+        experiment_setting, main_user_strategy, simulation_length, num_users)
+
+    # Time the runs after a warm-up run. The throughput of the fastest run is reported, since noise on a shared machine only
+    # ever slows a run down.
+    run_model(_economy_kwargs, _model_kwargs, seed)
+    _steps, _setup_seconds, _step_seconds = np.array(
+        [run_model(_economy_kwargs, _model_kwargs, seed + i) for i in range(repeats)]).T
+
+    # Measure the peak memory of a single run
+    tracemalloc.start()
+    run_model(_economy_kwargs, _model_kwargs, seed)
+    _, _peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "benchmark": "model",
+        "experiment_setting": experiment_setting,
+        "main_user_strategy": main_user_strategy,
+        "simulation_length": simulation_length,
+        "num_users": num_users if experiment_setting == "MAS" else 1,
+        "repeats": repeats,
+        "steps": float(np.median(_steps)),
+        "setup_seconds": float(np.median(_setup_seconds)),
+        "step_seconds": float(np.median(_step_seconds)),
+        "steps_per_second": float(np.max(_steps / _step_seconds)),
+        "peak_memory_MB": _peak_memory / 2**20,
+    }
+
+
+def benchmark_workers(number_processes, iterations=16, simulation_length=365, seed=0):
+    """Measures the throughput of a MAS sweep on a pool of worker processes.
+
+    Args:
+        number_processes (int): Number of worker processes.
+        iterations (int): Number of runs in the sweep.
+        simulation_length (int): Number of days in the simulation.
+        seed (int): Seed of the sweep.
+
+    Returns:
+        dict: The benchmark record.
+    """
+
+    _economy_kwargs, _model_kwargs = experiment_parameters("MAS", "A-ADAPTED", simulation_length)
+    _start = time.perf_counter()
+    pool_run(_economy_kwargs, {key: [value] if isinstance(value, str) else value for key, value in _model_kwargs.items()},
+             iterations=iterations, max_steps=simulation_length + 1, seed=seed, number_processes=number_processes,
+             chunk_size=1, display_progress=False)
+    _seconds = time.perf_counter() - _start
+
+    return {
+        "benchmark": "workers",
+        "experiment_setting": "MAS",
+        "main_user_strategy": "A-ADAPTED",
+        "simulation_length": simulation_length,
+        "number_processes": number_processes,
+        "runs": iterations,
+        "seconds": _seconds,
+        "runs_per_second": iterations / _seconds,
+    }
+
+
+def run_benchmarks(scale=1.0, repeats=3, strategies=STRATEGIES, agent_counts=AGENT_COUNTS,
+                   simulation_lengths=SIMULATION_LENGTHS, worker_counts=WORKER_COUNTS):
+    """Runs the full benchmark suite.
+
+    The suite consists of every experiment setting with every strategy at the simulation length of the production sweeps,
+    and of scaling curves of the MAS setting over the number of agents, the simulation length and the number of workers.
+
+    Args:
+        scale (float): Factor of all simulation lengths, e.g. 0.1 for a quick check.
+        repeats (int): Number of timed runs per benchmark.
+        strategies (List): Strategies of the main user.
+        agent_counts (List): Points of the agent count curve.
+        simulation_lengths (List): Points of the simulation length curve.
+        worker_counts (List): Points of the worker count curve, counts above the number of cores are skipped.
+
+    Returns:
+        dict: The environment in which the suite was run and the benchmark records.
+    """
+
+    def _length(length):
+        return max(int(length * scale), 2)
+
+    _records = []
+
+    # Throughput per experiment setting and strategy
+    for experiment_setting, length in PRODUCTION_LENGTHS.items():
+        for strategy in strategies:
+            _records.append(benchmark_model(experiment_setting, strategy, _length(length), repeats=repeats))
+
+    # Scaling curves of the MAS setting
+    for num_users in agent_counts:
+        _records.append(dict(benchmark_model("MAS", "A-ADAPTED", _length(365), num_users, repeats), curve="agents"))
+    for length in simulation_lengths:
+        _records.append(dict(benchmark_model("MAS", "A-ADAPTED", _length(length), repeats=repeats), curve="length"))
+    for number_processes in worker_counts:
+        if number_processes <= os.cpu_count():
+            _records.append(dict(benchmark_workers(number_processes, simulation_length=_length(365)), curve="workers"))
+
+    return {"environment": environment(), "scale": scale, "records": _records}
+
+
+def environment():
+    """Describes the machine and the version of the code on which the benchmarks are run.
+
+    Returns:
+        dict: The environment.
+    """
+
+    try:
+        _commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        _commit = ""
+
+    return {
+        "commit": _commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def record_key(record):
+    """Identifies the benchmark of a record, so that records of different suites can be matched."""
+
+    return tuple(record.get(key) for key in ("benchmark", "curve", "experiment_setting", "main_user_strategy",
+                                             "simulation_length", "num_users", "number_processes"))
+
+
+def compare(baseline, current, tolerance=0.1):
+    """Compares the throughput and memory of a suite with a baseline suite.
+
+    Args:
+        baseline (dict): Results of `run_benchmarks` to compare with.
+        current (dict): Results of `run_benchmarks` to compare.
+        tolerance (float): Relative change above which a benchmark counts as faster/slower.
+
+    Returns:
+        List: One dictionary per benchmark that is in both suites, with the relative speedup and memory change.
+    """
+
+    _baseline = {record_key(record): record for record in baseline["records"]}
+    _comparison = []
+    for record in current["records"]:
+        _old = _baseline.get(record_key(record))
+        if _old is None:
+            continue
+        _metric = "steps_per_second" if record["benchmark"] == "model" else "runs_per_second"
+        _speedup = record[_metric] / _old[_metric]
+        _comparison.append({
+            "benchmark": " ".join(str(value) for value in record_key(record) if value is not None),
+            "baseline": _old[_metric],
+            "current": record[_metric],
+            "speedup": _speedup,
+            "memory_ratio": record["peak_memory_MB"] / _old["peak_memory_MB"] if "peak_memory_MB" in record else None,
+            "verdict": "faster" if _speedup > 1 + tolerance else "slower" if _speedup < 1 - tolerance else "same",
+        })
+    return _comparison
+
+
+def main():
+    """Runs the suite from the command line, e.g.
+    `python -m Model.Code.src.benchmarks.SimulationBenchmark --output baseline.json` followed by
+    `python -m Model.Code.src.benchmarks.SimulationBenchmark --output current.json --compare baseline.json`.
+    """
+
+    _parser = argparse.ArgumentParser(description="Benchmarks the throughput and memory of the simulations.")
+    _parser.add_argument("--output", default="benchmark.json", help="File to which the results are written.")
+    _parser.add_argument("--compare", help="Results of an earlier suite to compare with.")
+    _parser.add_argument("--scale", type=float, default=1.0, help="Factor of all simulation lengths.")
+    _parser.add_argument("--repeats", type=int, default=3, help="Number of timed runs per benchmark.")
+    _parser.add_argument("--tolerance", type=float, default=0.1, help="Relative change that counts as a difference.")
+    _args = _parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    _results = run_benchmarks(scale=_args.scale, repeats=_args.repeats)
+    with open(_args.output, "w") as file:
+        json.dump(_results, file, indent=2)
+
+    if _args.compare is not None:
+        with open(_args.compare) as file:
+            _baseline = json.load(file)
+        for row in compare(_baseline, _results, _args.tolerance):
+            print(f"{row['verdict']:>6} {row['speedup']:6.2f}x  {row['benchmark']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class LOBGenerator:
+    """Generator of new normalized LOB snapshots, fitted to a set of existing snapshots.
+
+    Every snapshot is a histogram of a whole number of equally sized orders over the buckets of the book. New snapshots
+    are drawn as a Dirichlet-multinomial: the number of orders is drawn from the numbers of orders of the fitted
+    snapshots, the probabilities of the buckets from a Dirichlet distribution around the mean snapshot and the orders are
+    then spread over the buckets by a multinomial draw. The concentration of the Dirichlet distribution is fitted to the
+    variance of the buckets that is not explained by the multinomial draw. When there is no such variance, all snapshots
+    are drawn from the mean snapshot.
+    """
+
+    def __init__(self, LOB):
+        """Fits the generator to the snapshots.
+
+        Args:
+            LOB (ndarray): Normalized LOB snapshots, one snapshot per row.
+        """
+
+        _LOB = np.asarray(LOB, dtype=float)
+        self.num_snapshots, self.num_buckets = _LOB.shape
+
+        # The smallest non-empty bucket of a snapshot holds a single order
+        _smallest = np.where(_LOB > 0, _LOB, np.inf).min(axis=1)
+        self.num_orders = np.round(1 / _smallest).astype(np.int64)
+
+        # Mean snapshot, with a small floor so that every bucket can receive orders
+        _mean = np.maximum(_LOB.mean(axis=0), 1e-12)
+        self.mean = _mean / np.sum(_mean)
+
+        # Method of moments: the variance of a bucket is m(1 - m)(1/N + (1 - 1/N)/(concentration + 1))
+        _relative_variance = np.sum(_LOB.var(axis=0)) / np.sum(self.mean * (1 - self.mean))
+        _multinomial_variance = np.mean(1 / self.num_orders)
+        _excess_variance = _relative_variance - _multinomial_variance
+        if _excess_variance > 0:
+            self.concentration = (1 - _multinomial_variance) / _excess_variance - 1
+        else:
+            self.concentration = None
+
+    def generate_counts(self, rng, size):
+        """Draws new snapshots as the number of orders per bucket, which takes less memory than normalized snapshots.
+
+        Args:
+            rng (Generator): NumPy random number generator.
+            size (int): Number of snapshots.
+
+        Returns:
+            Tuple: The number of orders per bucket, one snapshot per row, and the total number of orders of every snapshot.
+        """
+
+        _num_orders = rng.choice(self.num_orders, size)
+        if self.concentration is None:
+            _probabilities = self.mean
+        else:
+            _probabilities = rng.dirichlet(self.concentration * self.mean, size)
+        return rng.multinomial(_num_orders, _probabilities).astype(np.uint16), _num_orders
+
+    def generate(self, rng, size):
+        """Draws new snapshots.
+
+        Args:
+            rng (Generator): NumPy random number generator.
+            size (int): Number of snapshots.
+
+        Returns:
+            ndarray: The normalized snapshots, one snapshot per row.
+        """
+
+        _counts, _num_orders = self.generate_counts(rng, size)
+        return _counts / _num_orders[:, None]
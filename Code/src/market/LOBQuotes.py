@@ -0,0 +1,92 @@
+import numpy as np
+
+
+class LOBQuotes:
+    """Precomputed cumulative depth of a set of normalized LOB snapshots.
+
+    Every snapshot consists of 100 buckets: the first 50 hold the bids (best bid last) and the last 50 hold the asks (best ask first).
+    For both sides, the cumulative depth and the cumulative tick-weighted depth are stored, so that the fill of any order can be
+    determined with a single binary search.
+    """
+
+    def __init__(self, LOB):
+        """Precomputes the cumulative depth of all snapshots.
+
+        Args:
+            LOB (DataFrame): Normalized LOB snapshots, one snapshot per row.
+        """
+
+        _LOB = np.asarray(LOB, dtype=float)
+        self.num_snapshots = _LOB.shape[0]
+        self.depth = _LOB.shape[1] // 2
+
+        # Order both sides from the best price outwards
+        _asks = _LOB[:, self.depth:]
+        _bids = _LOB[:, :self.depth][:, ::-1]
+        _ticks = np.arange(self.depth)
+
+        # Cumulative depth, used to find the number of ticks that an order moves the price
+        self.cum_depth = {
+            "BUY": np.ascontiguousarray(_asks.cumsum(axis=1)),
+            "SELL": np.ascontiguousarray(_bids.cumsum(axis=1))}
+
+        # Depth and tick-weighted depth of all levels before level i (prefix sums starting at 0)
+        self.prefix_depth = {}
+        self.prefix_weighted_depth = {}
+        for order_type, _orders in (("BUY", _asks), ("SELL", _bids)):
+            _prefix = np.zeros((self.num_snapshots, self.depth + 1))
+            _prefix[:, 1:] = _orders.cumsum(axis=1)
+            self.prefix_depth[order_type] = _prefix
+
+            _weighted_prefix = np.zeros((self.num_snapshots, self.depth + 1))
+            _weighted_prefix[:, 1:] = (_orders * _ticks).cumsum(axis=1)
+            self.prefix_weighted_depth[order_type] = _weighted_prefix
+
+    def fill(self, LOB_ID, amount, liquidity, order_type="BUY"):
+        """Determines how an order of the given size is filled by the given LOB snapshot.
+
+        The price paid for the order follows from the returned values as
+        `price * filled + tick_size * filled_ticks + remainder * (price + tick_change * tick_size)`.
+
+        Args:
+            LOB_ID (int): Index of the LOB snapshot.
+            amount (float): Amount of tokens to buy or sell.
+            liquidity (float): Total amount of tokens in the order book.
+            order_type (String): Either `BUY' or `SELL'.
+
+        Returns:
+            tuple: The tick change, the amount filled by the levels before the last level, the tick-weighted amount filled by
+            those levels and the amount that is filled by the last level.
+        """
+
+        # Calculate how many ticks the order moves the price
+        _tick_change = int(self.cum_depth[order_type][LOB_ID].searchsorted(amount / liquidity))
+
+        # Calculate how much is filled by all levels before the last one
+        _filled = self.prefix_depth[order_type][LOB_ID, _tick_change] * liquidity
+        _filled_ticks = self.prefix_weighted_depth[order_type][LOB_ID, _tick_change] * liquidity
+
+        return _tick_change, _filled, _filled_ticks, amount - _filled
+
+    def fill_many(self, LOB_IDS, amounts, liquidity, order_type="BUY"):
+        """Vectorized version of `fill` for many orders at once.
+
+        Args:
+            LOB_IDS (ndarray): Index of the LOB snapshot of every order.
+            amounts (ndarray): Amount of tokens of every order.
+            liquidity (float or ndarray): Total amount of tokens in the order book(s).
+            order_type (String): Either `BUY' or `SELL'.
+
+        Returns:
+            tuple: Arrays with the tick change, filled amount, tick-weighted filled amount and remainder of every order.
+        """
+
+        # The number of levels with a cumulative depth below the order size equals the left-sided binary search
+        _relative_order_sizes = np.asarray(amounts / liquidity, dtype=float)
+        _tick_changes = (self.cum_depth[order_type][LOB_IDS] <
+                         _relative_order_sizes[..., None]).sum(axis=-1)
+
+        _filled = self.prefix_depth[order_type][LOB_IDS, _tick_changes] * liquidity
+        _filled_ticks = self.prefix_weighted_depth[order_type][LOB_IDS, _tick_changes] * liquidity
+
+        return _tick_changes, _filled, _filled_ticks, amounts - _filled
@@ -0,0 +1,214 @@
+from functools import lru_cache
+import os
+import pickle
+from Model.Code.src.market.LOBGenerator import LOBGenerator
+from Model.Code.src.market.LOBQuotes import LOBQuotes
+from Model.Code.src.market.PricePaths import TREND_WINDOWS, bootstrap_price_paths
+import numpy as np
+import pandas as pd
+
+
+# Location of the source code, relative to which all market data is stored
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Location of the binary copies of the market data
+CACHE_DIR = os.path.join(SRC_DIR, "market", "cache")
+
+# Tokens with LOB snapshots, the index of a token is part of the key of its synthetic snapshots
+TOKENS = ("VET", "VTHO")
+
+# Number of days of synthetic snapshots that are generated at once
+SYNTHETIC_BLOCK_DAYS = 32
+
+# Number of bootstrapped price paths that are generated at once
+BOOTSTRAP_BATCH_PATHS = 1000
+
+
+def data_path(*parts):
+    """Determines the absolute path of a file with market data.
+
+    Args:
+        parts (String): Path of the file relative to the source code, e.g. `"LOB", "LOB_VET.csv"`.
+
+    Returns:
+        String: The absolute path.
+    """
+
+    return os.path.join(SRC_DIR, *parts)
+
+
+def cached_array(name, source, convert):
+    """Memory-maps the binary copy of a data file, converting the file first when the copy is missing or outdated.
+
+    The copy is written to a temporary file that is moved into place, so that processes that convert the same file at the
+    same time never read a partial copy. The temporary file is removed when the conversion fails.
+
+    Args:
+        name (String): Name of the binary copy.
+        source (String): Path of the data file.
+        convert (function): Reads the data file and returns its contents as an array.
+
+    Returns:
+        ndarray: The read-only, memory-mapped contents of the data file.
+    """
+
+    _path = os.path.join(CACHE_DIR, f"{name}.npy")
+    if not os.path.exists(_path) or os.path.getmtime(_path) < os.path.getmtime(source):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _temp_path = f"{_path}.{os.getpid()}.tmp"
+        try:
+            with open(_temp_path, "wb") as file:
+                np.save(file, np.ascontiguousarray(convert(source), dtype=float))
+            os.replace(_temp_path, _path)
+        except BaseException:
+            if os.path.exists(_temp_path):
+                os.remove(_temp_path)
+            raise
+
+    return np.load(_path, mmap_mode="r")
+
+
+@lru_cache(maxsize=None)
+def load_LOB(token):
+    """Loads the normalized LOB snapshots of a token once per process.
+
+    Args:
+        token (String): Either `VET' or `VTHO'.
+
+    Returns:
+        ndarray: The LOB snapshots, one snapshot per row.
+    """
+
+    return cached_array(f"LOB_{token}", data_path("LOB", f"LOB_{token}.csv"),
+                        lambda source: pd.read_csv(source).iloc[:, 1:].to_numpy())
+
+
+@lru_cache(maxsize=None)
+def load_LOB_quotes(token):
+    """Precomputes the cumulative depth of the LOB snapshots of a token once per process.
+
+    Args:
+        token (String): Either `VET' or `VTHO'.
+
+    Returns:
+        LOBQuotes: The cumulative depth of the LOB snapshots, shared by all economies.
+    """
+
+    return LOBQuotes(load_LOB(token))
+
+
+@lru_cache(maxsize=None)
+def load_LOB_generator(token):
+    """Fits the generator of synthetic LOB snapshots of a token once per process.
+
+    Args:
+        token (String): Either `VET' or `VTHO'.
+
+    Returns:
+        LOBGenerator: The generator, fitted to the LOB snapshots of the token.
+    """
+
+    return LOBGenerator(load_LOB(token))
+
+
+@lru_cache(maxsize=64)
+def load_synthetic_LOB_block(token, seed, block):
+    """Generates the synthetic LOB snapshots of a block of days at once, cached per seed.
+
+    The snapshots only depend on the token, the seed and the block, so all runs with the same seed face the same market
+    states.
+
+    Args:
+        token (String): Either `VET' or `VTHO'.
+        seed (int): Seed of the synthetic snapshots.
+        block (int): Index of the block of `SYNTHETIC_BLOCK_DAYS` days.
+
+    Returns:
+        Tuple: The number of orders per bucket of the snapshots of all days of the block, with the snapshots of a day in
+            consecutive rows, and the total number of orders of every snapshot, see `LOBGenerator.generate_counts`.
+    """
+
+    _generator = load_LOB_generator(token)
+    _rng = np.random.Generator(np.random.Philox(np.random.SeedSequence([seed, TOKENS.index(token), block])))
+    return _generator.generate_counts(_rng, SYNTHETIC_BLOCK_DAYS * _generator.num_snapshots)
+
+
+@lru_cache(maxsize=4)
+def load_synthetic_LOB_quotes(token, seed, day):
+    """Precomputes the cumulative depth of the synthetic LOB snapshots of a day.
+
+    Every day has as many fresh snapshots as there are LOB snapshots of the token, so that the LOB IDs that the users draw
+    index the snapshots of the day.
+
+    Args:
+        token (String): Either `VET' or `VTHO'.
+        seed (int): Seed of the synthetic snapshots.
+        day (int): The day.
+
+    Returns:
+        LOBQuotes: The cumulative depth of the snapshots of the day.
+    """
+
+    _num_snapshots = load_LOB_generator(token).num_snapshots
+    _block, _day = divmod(day, SYNTHETIC_BLOCK_DAYS)
+    _rows = slice(_day * _num_snapshots, (_day + 1) * _num_snapshots)
+    _counts, _num_orders = load_synthetic_LOB_block(token, seed, _block)
+    return LOBQuotes(_counts[_rows] / _num_orders[_rows, None])
+
+
+@lru_cache(maxsize=None)
+def load_price_returns(token):
+    """Loads the daily relative price change of a token once per process.
+
+    Args:
+        token (String): Either `VET' or `VTHO'.
+
+    Returns:
+        ndarray: The relative price change of every day of the price history, NaN for the first day.
+    """
+
+    return cached_array(f"{token}-returns", data_path("price_trends", f"{token}-USD.csv"),
+                        lambda source: 1 + pd.read_csv(source)["Close"].pct_change().to_numpy())
+
+
+@lru_cache(maxsize=None)
+def load_price_trend(name):
+    """Loads an external price trend once per process.
+
+    Trends without a pickled copy, such as `VTHO-up', are taken from the same window of the price history of their token
+    as the pickled trends.
+
+    Args:
+        name (String): Name of the price trend, e.g. `VET-up'.
+
+    Returns:
+        ndarray: The relative price change per trend step.
+    """
+
+    def _unpickle(source):
+        with open(source, "rb") as filehandler:
+            return np.asarray(pickle.load(filehandler))
+
+    _source = data_path("price_trends", f"{name}.pkl")
+    if not os.path.exists(_source):
+        _token, _direction = name.split("-")
+        return load_price_returns(_token)[TREND_WINDOWS[_direction]]
+    return cached_array(name, _source, _unpickle)
+
+
+@lru_cache(maxsize=4)
+def load_bootstrapped_price_paths(seed, batch, length):
+    """Generates a batch of bootstrapped VET and VTHO price paths at once, cached per seed.
+
+    Args:
+        seed (int): Seed of the price paths.
+        batch (int): Index of the batch of `BOOTSTRAP_BATCH_PATHS` paths.
+        length (int): Number of days of every path.
+
+    Returns:
+        ndarray: The relative price change per path, day and token (VET, VTHO), see `bootstrap_price_paths`.
+    """
+
+    _returns = np.column_stack([load_price_returns("VET")[1:], load_price_returns("VTHO")[1:]])
+    _rng = np.random.Generator(np.random.Philox(np.random.SeedSequence([seed, batch])))
+    return bootstrap_price_paths(_returns, BOOTSTRAP_BATCH_PATHS, length, _rng)
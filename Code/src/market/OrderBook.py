@@ -0,0 +1,199 @@
+from bisect import bisect_left
+import numpy as np
+
+
+class OrderBook:
+    """Limit order book of a token that keeps its depth across orders and days.
+
+    Both sides start from the mean depth per level of the normalized LOB snapshots. A BUY order consumes the asks and a
+    SELL order consumes the bids from the best level outwards, so that the next order meets the depth that is left. Only
+    the amount consumed per side is updated by an order. The level at which an order starts and ends is found by a binary
+    search over the cumulative depth of the side, so matching takes O(log levels) time.
+
+    Once per day, the book is recentred on the new best level and the depth of every level recovers a fraction
+    (`resilience`) of its distance to the snapshot that was drawn by the last order of the day, or to the mean depth
+    before any order has been executed. The book thereby keeps the day-to-day variation of the snapshots, also when the
+    resilience is 1. The resilience is calibrated from how strongly the depth of consecutive snapshots is correlated.
+
+    The book has the same `fill` and `fill_many` methods as `LOBQuotes`, which quote an order against the current depth
+    without consuming it. The index of the snapshot that is passed to them is ignored.
+    """
+
+    def __init__(self, LOB, resilience=None):
+        """Initializes the book at the mean depth of the snapshots.
+
+        Args:
+            LOB (ndarray): Normalized LOB snapshots, one snapshot per row, see `LOBQuotes`.
+            resilience (float): Fraction of the missing depth that is replenished per day, calibrated from the snapshots
+                when None.
+        """
+
+        _LOB = np.asarray(LOB, dtype=float)
+        self.depth = _LOB.shape[1] // 2
+        self.resilience = calibrate_resilience(_LOB) if resilience is None else resilience
+
+        # Mean depth per level, both sides ordered from the best price outwards
+        _mean = _LOB.mean(axis=0)
+        self.target = {"BUY": _mean[self.depth:], "SELL": _mean[:self.depth][::-1].copy()}
+
+        # Depth per level of every snapshot, towards which the book replenishes once an order has drawn it
+        self.snapshots = {"BUY": _LOB[:, self.depth:], "SELL": _LOB[:, :self.depth][:, ::-1].copy()}
+        self.snapshot_id = None
+
+        # Current depth per level and the amount that has been consumed since the last replenishment
+        self.levels = {order_type: target.copy() for order_type, target in self.target.items()}
+        self.consumed = {"BUY": 0.0, "SELL": 0.0}
+        self.prefix_depth = {}
+        self.prefix_weighted_depth = {}
+        self._cum_depth = {}
+        for order_type in self.levels:
+            self._update_prefixes(order_type)
+
+    def _update_prefixes(self, order_type):
+        """Recomputes the depth and tick-weighted depth of all levels before level i of a side."""
+
+        _levels = self.levels[order_type]
+        _prefix = np.zeros(self.depth + 1)
+        _prefix[1:] = _levels.cumsum()
+        self.prefix_depth[order_type] = _prefix
+
+        _weighted_prefix = np.zeros(self.depth + 1)
+        _weighted_prefix[1:] = (_levels * np.arange(self.depth)).cumsum()
+        self.prefix_weighted_depth[order_type] = _weighted_prefix
+
+        # Plain copy of the cumulative depth for the binary search of single orders, which avoids NumPy's overhead
+        self._cum_depth[order_type] = _prefix[1:].tolist()
+
+    def _match(self, order_type, start, end):
+        """Matches the relative amount between two positions on a side of the book.
+
+        Args:
+            order_type (String): Either `BUY' or `SELL'.
+            start (float or ndarray): Relative amount consumed before the order.
+            end (float or ndarray): Relative amount consumed after the order.
+
+        Returns:
+            tuple: The tick change, relative amount filled by the levels before the last level, relative tick-weighted
+            amount filled by those levels and relative amount filled by the last level, all relative to the best level.
+        """
+
+        _prefix = self.prefix_depth[order_type]
+        _weighted_prefix = self.prefix_weighted_depth[order_type]
+
+        # Levels at which the order starts and ends (the number of levels that are fully consumed before that point)
+        _start_level = _prefix[1:].searchsorted(start)
+        _end_level = _prefix[1:].searchsorted(end)
+
+        # The order fills the rest of its first level and all levels up to its last level
+        _last_level_start = np.maximum(_prefix[_end_level], start)
+        _filled = _last_level_start - start
+        _filled_ticks = (_weighted_prefix[_end_level] + (_last_level_start - _prefix[_end_level]) * _end_level) - \
+            (_weighted_prefix[_start_level] + (start - _prefix[_start_level]) * _start_level) - _start_level * _filled
+
+        return _end_level - _start_level, _filled, _filled_ticks, end - _last_level_start
+
+    def fill(self, LOB_ID, amount, liquidity, order_type="BUY"):
+        """Quotes an order against the current depth, without consuming it. See `LOBQuotes.fill`.
+
+        Args:
+            LOB_ID (int): Ignored, the book replaces the snapshots.
+            amount (float): Amount of tokens to buy or sell.
+            liquidity (float): Total amount of tokens in the order book.
+            order_type (String): Either `BUY' or `SELL'.
+
+        Returns:
+            tuple: The tick change, the amount filled by the levels before the last level, the tick-weighted amount filled by
+            those levels and the amount that is filled by the last level.
+        """
+
+        _prefix = self.prefix_depth[order_type]
+        _weighted_prefix = self.prefix_weighted_depth[order_type]
+        _start = self.consumed[order_type]
+        _end = _start + amount / liquidity
+
+        # Same matching as `_match`, for a single order
+        _start_level = bisect_left(self._cum_depth[order_type], _start)
+        _end_level = bisect_left(self._cum_depth[order_type], _end)
+        _last_level_start = max(float(_prefix[_end_level]), _start)
+        _filled = _last_level_start - _start
+        _filled_ticks = (_weighted_prefix[_end_level] + (_last_level_start - _prefix[_end_level]) * _end_level) - \
+            (_weighted_prefix[_start_level] + (_start - _prefix[_start_level]) * _start_level) - _start_level * _filled
+
+        return _end_level - _start_level, _filled * liquidity, _filled_ticks * liquidity, \
+            (_end - _last_level_start) * liquidity
+
+    def fill_many(self, LOB_IDS, amounts, liquidity, order_type="BUY"):
+        """Vectorized version of `fill` for many orders at once, all quoted against the current depth.
+
+        Args:
+            LOB_IDS (ndarray): Ignored, the book replaces the snapshots.
+            amounts (ndarray): Amount of tokens of every order.
+            liquidity (float or ndarray): Total amount of tokens in the order book(s).
+            order_type (String): Either `BUY' or `SELL'.
+
+        Returns:
+            tuple: Arrays with the tick change, filled amount, tick-weighted filled amount and remainder of every order.
+        """
+
+        _consumed = self.consumed[order_type]
+        _tick_changes, _filled, _filled_ticks, _remainders = self._match(
+            order_type, _consumed, _consumed + np.asarray(amounts / liquidity, dtype=float))
+        return _tick_changes, _filled * liquidity, _filled_ticks * liquidity, _remainders * liquidity
+
+    def execute(self, amount, liquidity, order_type="BUY", LOB_ID=None):
+        """Executes an order, consuming the depth that fills it.
+
+        Args:
+            amount (float): Amount of tokens to buy or sell.
+            liquidity (float): Total amount of tokens in the order book.
+            order_type (String): Either `BUY' or `SELL'.
+            LOB_ID (int): Index of the snapshot that the order has drawn, towards which the book replenishes.
+
+        Returns:
+            tuple: The fill of the order, see `fill`.
+        """
+
+        _fill = self.fill(None, amount, liquidity, order_type)
+        self.consumed[order_type] += amount / liquidity
+        if LOB_ID is not None:
+            self.snapshot_id = LOB_ID
+        return _fill
+
+    def replenish(self):
+        """Recentres both sides on their best level and lets their depth recover towards the drawn snapshot."""
+
+        for order_type, _levels in self.levels.items():
+            _target = self.target[order_type] if self.snapshot_id is None else \
+                self.snapshots[order_type][self.snapshot_id]
+            _consumed = self.consumed[order_type]
+            if _consumed > 0:
+                # Remove the consumed depth, the levels that have been fully consumed now lie behind the best price
+                _prefix = self.prefix_depth[order_type]
+                _remaining = np.diff(np.maximum(_prefix, _consumed))
+                _best_level = min(int(_prefix[1:].searchsorted(_consumed)), self.depth)
+                _levels[:self.depth - _best_level] = _remaining[_best_level:]
+                _levels[self.depth - _best_level:] = _target[self.depth - _best_level:]
+                self.consumed[order_type] = 0.0
+
+            # Replenish part of the missing depth
+            _levels += self.resilience * (_target - _levels)
+            self._update_prefixes(order_type)
+
+
+def calibrate_resilience(LOB, minimum=0.05):
+    """Calibrates the daily replenishment of an order book from the autocorrelation of consecutive LOB snapshots.
+
+    The deviation of the depth per level from its mean is modelled as an AR(1) process. A deviation that is carried over
+    from one snapshot to the next with coefficient rho is replenished at a rate of 1 - rho.
+
+    Args:
+        LOB (ndarray): Normalized LOB snapshots in chronological order, one snapshot per row.
+        minimum (float): Lower bound of the resilience, so that a consumed book always recovers.
+
+    Returns:
+        float: Fraction of the missing depth that is replenished per snapshot interval (day).
+    """
+
+    _deviations = LOB - LOB.mean(axis=0)
+    _rho = np.sum(_deviations[:-1] * _deviations[1:]) / np.sum(_deviations[:-1] ** 2)
+    return float(np.clip(1 - _rho, minimum, 1))
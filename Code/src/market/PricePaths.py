@@ -0,0 +1,57 @@
+import numpy as np
+
+
+# Rows of the daily price history (in the price CSV files) from which the external price trends are taken
+TREND_WINDOWS = {
+    "up": slice(625, 990),
+    "down": slice(991, -1),
+}
+
+# Default number of consecutive days that are resampled together by the block bootstrap
+BOOTSTRAP_BLOCK_LENGTH = 10
+
+
+def trend_multipliers(trend, price_trend_length, steps_between_price_trend):
+    """Precomputes the price multiplier of an external price trend for every step of the economy.
+
+    A trend applies a multiplier every `steps_between_price_trend` steps, up to and including step `price_trend_length`.
+    The multiplier of a step follows from the same index arithmetic as before, but only once per run, so that the
+    multiplier of a step is looked up in constant time.
+
+    Args:
+        trend (ndarray): The relative price change per trend step.
+        price_trend_length (int): Last step at which the trend applies.
+        steps_between_price_trend (float): Number of steps between two trend steps.
+
+    Returns:
+        ndarray: The multiplier of every step, NaN for the steps at which the trend does not apply.
+    """
+
+    _multipliers = np.full(int(price_trend_length) + 1, np.nan)
+    for step in range(1, len(_multipliers)):
+        if step % steps_between_price_trend == 0:
+            _multipliers[step] = trend[round(step / steps_between_price_trend) - 1]
+    return _multipliers
+
+
+def bootstrap_price_paths(returns, num_paths, length, rng, block_length=BOOTSTRAP_BLOCK_LENGTH):
+    """Generates many price paths at once by a moving block bootstrap of the daily price history.
+
+    The paths consist of blocks of consecutive days of the history, so that the paths keep the short-term dependence of
+    the daily returns. All tokens share their blocks, which keeps the correlation between the tokens.
+
+    Args:
+        returns (ndarray): Daily relative price change of every token, one day per row and one token per column.
+        num_paths (int): Number of paths.
+        length (int): Number of days of every path.
+        rng (Generator): NumPy random number generator.
+        block_length (int): Number of consecutive days per block.
+
+    Returns:
+        ndarray: The relative price change per path, day and token, with shape (num_paths, length, num_tokens).
+    """
+
+    _num_blocks = -(-length // block_length)
+    _starts = rng.integers(0, len(returns) - block_length + 1, size=(num_paths, _num_blocks))
+    _days = (_starts[..., None] + np.arange(block_length)).reshape(num_paths, -1)[:, :length]
+    return returns[_days]
@@ -0,0 +1,130 @@
+import math
+import numpy as np
+
+
+class BatchedEconomy:
+    """A batch of independent economies that are advanced in lockstep.
+
+    Every attribute of the `EconomicModel` that changes during a simulation is stored as an array with one value per economy.
+    The LOB's, tick sizes and price trends are shared with the economic model that the batch is created from.
+    """
+
+    def __init__(self, economic_model, num_economies):
+        """Initializes the batch with copies of the given economy.
+
+        Args:
+            economic_model (EconomicModel): Economy that all economies in the batch start from.
+            num_economies (int): Number of economies in the batch.
+        """
+
+        # Set the model settings.
+        self.num_economies = num_economies
+        self.network_step = economic_model.network_step
+        self.VET_price = np.full(num_economies, economic_model.VET_price, dtype=float)
+        self.VTHO_price = np.full(num_economies, economic_model.VTHO_price, dtype=float)
+
+        # Totals on chain
+        self.circulating_VET = np.full(num_economies, economic_model.circulating_VET, dtype=float)
+        self.circulating_VTHO = np.full(num_economies, economic_model.circulating_VTHO, dtype=float)
+        self.VET_liquidity_ratio = np.full(num_economies, economic_model.VET_liquidity_ratio, dtype=float)
+        self.VTHO_liquidity_ratio = np.full(num_economies, economic_model.VTHO_liquidity_ratio, dtype=float)
+
+        # Totals in the orderbooks
+        self.liquidity_VET = self.VET_liquidity_ratio * self.circulating_VET
+        self.liquidity_VTHO = self.VTHO_liquidity_ratio * self.circulating_VTHO
+
+        # Share the LOB's and price trends
+        self.VET_quotes = economic_model.VET_quotes
+        self.VTHO_quotes = economic_model.VTHO_quotes
+        self.VET_LOB_tick_size = economic_model.VET_LOB_tick_size
+        self.VTHO_LOB_tick_size = economic_model.VTHO_LOB_tick_size
+        self.VET_trend_multipliers = economic_model.VET_trend_multipliers
+        self.VTHO_trend_multipliers = economic_model.VTHO_trend_multipliers
+
+    def increase_network_step(self):
+        """Increases the network step by one.
+        """
+        self.network_step += 1
+
+    def handle_price_trends(self, running):
+        """Applies the external price trends to all economies, see `EconomicModel.handle_price_trends`.
+
+        Args:
+            running (ndarray): Whether every economy is still running.
+        """
+        _multipliers = self.VET_trend_multipliers
+        if _multipliers is not None and self.network_step < len(_multipliers) and \
+                not math.isnan(_multipliers[self.network_step]):
+            self.VET_price[running] *= _multipliers[self.network_step]
+
+        _multipliers = self.VTHO_trend_multipliers
+        if _multipliers is not None and self.network_step < len(_multipliers) and \
+                not math.isnan(_multipliers[self.network_step]):
+            self.VTHO_price[running] *= _multipliers[self.network_step]
+
+    def increase_circulating_VTHO(self, amounts):
+        """Increases the amount of existing VTHO in every economy.
+
+        Args:
+            amounts (ndarray): Amount to increase the total of every economy by.
+        """
+        self.circulating_VTHO += amounts
+        self.liquidity_VTHO = self.VTHO_liquidity_ratio * self.circulating_VTHO
+
+    def decrease_circulating_VTHO(self, amounts):
+        """Decreases the amount of existing VTHO in every economy.
+
+        Args:
+            amounts (ndarray): Amount to decrease the total of every economy by.
+        """
+        self.circulating_VTHO -= amounts
+        self.liquidity_VTHO = self.VTHO_liquidity_ratio * self.circulating_VTHO
+
+    def decrease_circulating_VET(self, amounts):
+        """Decreases the amount of existing VET in every economy.
+
+        Args:
+            amounts (ndarray): Amount to decrease the total of every economy by.
+        """
+        self.circulating_VET -= amounts
+        self.liquidity_VET = self.VET_liquidity_ratio * self.circulating_VET
+
+    def apply_VET_orders(self, amounts, LOB_IDS):
+        """Applies the price impact of a VET buy order in every economy, see `EconomicModel.VET_order`.
+
+        Args:
+            amounts (ndarray): Amount of VET bought in every economy. Economies without an order are left untouched.
+            LOB_IDS (ndarray): Index of the VET LOB snapshot of every order.
+        """
+
+        _rows = np.flatnonzero(amounts != 0)
+        if len(_rows) == 0:
+            return
+
+        _tick_change = self.VET_quotes.fill_many(
+            LOB_IDS[_rows], amounts[_rows], self.liquidity_VET[_rows])[0]
+        _new_price = self.VET_price[_rows] + (_tick_change * self.VET_LOB_tick_size)
+
+        # Update the liquidity and the price of VET
+        self.VET_liquidity_ratio[_rows] *= 1 + ((1 - (self.VET_price[_rows] / _new_price)) / 5)
+        self.VET_price[_rows] = _new_price
+
+    def apply_VTHO_orders(self, amounts, LOB_IDS):
+        """Applies the price impact of a VTHO buy order in every economy, see `EconomicModel.VTHO_order`.
+
+        Args:
+            amounts (ndarray): Amount of VTHO bought in every economy. Economies without an order are left untouched.
+            LOB_IDS (ndarray): Index of the VTHO LOB snapshot of every order.
+        """
+
+        _rows = np.flatnonzero(amounts != 0)
+        if len(_rows) == 0:
+            return
+
+        _tick_change = self.VTHO_quotes.fill_many(
+            LOB_IDS[_rows], amounts[_rows], self.liquidity_VTHO[_rows])[0]
+        _new_price = self.VTHO_price[_rows] * (1 + (_tick_change * self.VTHO_LOB_tick_size))
+
+        # Update the liquidity and the price of VTHO
+        self.VTHO_liquidity_ratio[_rows] *= 1 + ((1 - (self.VTHO_price[_rows] / _new_price)) / 5)
+        self.VTHO_price[_rows] = _new_price
@@ -0,0 +1,211 @@
+import logging
+from Model.Code.src.models.BatchedEconomy import BatchedEconomy
+from Model.Code.src.models.OGSkiRentalSolver import OGSkiRentalSolver
+from Model.Code.src.population.UserPopulation import UserPopulation, BOUGHT
+import numpy as np
+import pandas as pd
+
+
+class BatchedNetworkModel:
+    """Many independent iterations of a single-user `NetworkModel` that are advanced in lockstep.
+
+    Every iteration has its own economy in a `BatchedEconomy` and its own user in a `UserPopulation`; row i of both belongs
+    to iteration i. The max. days, LOB draws and randomized thresholds of all iterations are drawn as arrays.
+
+    Like the `NetworkModel`, an iteration stops one step after its user has become inactive. Its economy is no longer
+    advanced after that.
+    """
+
+    def __init__(self,
+                 iterations,
+                 experiment_setting,
+                 economic_model,
+                 simulation_length,
+                 generation_rate,
+                 initial_VTHO_usage,
+                 final_VTHO_usage,
+                 small_user_size,
+                 large_user_size,
+                 usage_trend,
+                 usage_trend_length,
+                 starting_usage_trend_size,
+                 user_strategies,
+                 main_user_strategy,
+                 seed=None):
+        """Initializes all iterations.
+
+        Args:
+            iterations (int): Number of independent iterations.
+            seed (int): Seed of the random number generator of the batch.
+
+        The other arguments are those of the `NetworkModel`.
+        """
+
+        # Basic model settings
+        self.iterations = iterations
+        self.steps = 0
+        self.running = np.ones(iterations, dtype=bool)
+        self.final_step = np.zeros(iterations, dtype=np.int64)
+        self.experiment_setting = experiment_setting
+        self.OG = experiment_setting in ["OG-SKI-RENTAL"]
+        self.simulation_length = simulation_length
+        self.np_random = np.random.default_rng(seed)
+
+        # VTHO usage settings
+        self.initial_VTHO_usage = initial_VTHO_usage
+        self.current_VTHO_usage = initial_VTHO_usage
+        self.final_VTHO_usage = final_VTHO_usage
+        self.usage_trend = usage_trend
+        self.usage_trend_length = usage_trend_length
+        self.current_usage_trend_size = starting_usage_trend_size
+        self.VTHO_generation_rate = generation_rate
+        self.daily_VTHO_generation = economic_model.circulating_VET * self.VTHO_generation_rate
+
+        if usage_trend in ["STABLE-SMALL", "UP-SMALL", "DOWN-SMALL"]:
+            _user_size = small_user_size
+        elif usage_trend in ["STABLE-LARGE", "UP-LARGE", "DOWN-LARGE"]:
+            _user_size = large_user_size
+
+        # Only the main user is simulated
+        if round(initial_VTHO_usage / _user_size) != 1:
+            raise ValueError(
+                "The batched model only supports settings with a single user per iteration.")
+        self.usage_trend_step_size = (
+            self.final_VTHO_usage - self.initial_VTHO_usage)/self.simulation_length
+
+        # Initialize the economies and the users of all iterations
+        self.economic_model = economic_model
+        self.user_size = _user_size
+        self.main_user_strategy = main_user_strategy
+        self.economy = BatchedEconomy(economic_model, iterations)
+        self.population = UserPopulation(
+            [main_user_strategy] * iterations, _user_size, simulation_length, generation_rate,
+            self.economy, self.np_random, OG=self.OG)
+
+        logging.warning(f"Initialized {iterations} batched network models.")
+
+    def step(self):
+        """Advances all iterations by one day/step."""
+
+        # Iterations stop once their user is no longer active
+        _running = self.population.active.copy()
+        self.final_step[_running] = self.steps + 1
+        self.running = _running
+
+        # Let the economies know that a day has passed
+        self.economy.increase_network_step()
+
+        # Handle today's VTHO generation
+        self.economy.increase_circulating_VTHO(
+            np.where(_running, self.VTHO_generation_rate * self.economy.circulating_VET, 0))
+
+        # Handle external price trends
+        self.economy.handle_price_trends(_running)
+
+        # Let the users make their step
+        _VET_bought, _VTHO_bought, _VTHO_used = self.population.step(
+            self.steps, self.economy, self.get_usage_trend_step_size())
+
+        # Every user trades in their own economy
+        if not self.OG:
+            self.economy.apply_VET_orders(_VET_bought, self.population.VET_LOB_ID)
+            self.economy.apply_VTHO_orders(_VTHO_bought, self.population.VTHO_LOB_ID)
+            self.economy.decrease_circulating_VET(_VET_bought)
+            self.economy.decrease_circulating_VTHO(0.7 * _VTHO_used)
+
+        self.steps += 1
+
+    def run(self, max_steps):
+        """Advances all iterations by the given number of steps.
+
+        In the OG setting the outcome of the users is solved analytically instead.
+
+        Args:
+            max_steps (int): Number of steps.
+        """
+
+        if self.OG and self.steps == 0:
+            self.solve_OG(max_steps)
+        else:
+            for _ in range(max_steps):
+                if not self.population.active.any():
+                    break
+                self.step()
+
+    def solve_OG(self, max_steps):
+        """Solves all iterations of the OG setting with the `OGSkiRentalSolver`.
+
+        Args:
+            max_steps (int): Number of steps.
+        """
+
+        solver = OGSkiRentalSolver(self.economic_model, max_steps, self.VTHO_generation_rate,
+                                   self.user_size, self.get_usage_trend_step_size())
+        _outcome = solver.solve(self.main_user_strategy, self.population.max_days,
+                                self.population.rent_until_spent_norm, self.population.day_of_buying)
+
+        # Store the outcome in the population
+        _population = self.population
+        _finished = _population.max_days < max_steps
+        _population.active = ~_finished
+        _population.state[_outcome["bought"]] = BOUGHT
+        for column in ["bought_at_day", "VET", "total_FIAT_spent_rent", "total_FIAT_spent_buying",
+                       "potential_FIAT_spent_rent", "initial_buy_price", "user_size", "VET_needed"]:
+            getattr(_population, column)[:] = _outcome[column]
+        if "rent_until_spent" in _outcome:
+            _population.rent_until_spent[:] = _outcome["rent_until_spent"]
+        _population.optimal[_finished] = _outcome["optimal"][_finished]
+        _population.CR[_finished] = _outcome["CR"][_finished]
+
+        # Advance the economies to the last step of every iteration
+        self.final_step = np.minimum(_population.max_days + 1, max_steps)
+        self.running = ~_finished
+        _circulating_VTHO = np.empty(max_steps + 1)
+        _circulating_VTHO[0] = self.economy.circulating_VTHO[0]
+        for step in range(max_steps):
+            _circulating_VTHO[step + 1] = _circulating_VTHO[step] + \
+                self.VTHO_generation_rate * self.economy.circulating_VET[0]
+        self.economy.network_step += max_steps
+        self.economy.increase_circulating_VTHO(
+            _circulating_VTHO[self.final_step] - self.economy.circulating_VTHO)
+        self.economy.VET_price[:] = solver.VET_prices[self.final_step - 1]
+        self.economy.VTHO_price[:] = solver.VTHO_prices[self.final_step - 1]
+        self.steps = max_steps
+
+    def get_usage_trend_step_size(self):
+        """Determines the change of the user size per day based on the usage trend.
+
+        Returns:
+            float: The change of the user size.
+        """
+
+        if self.usage_trend in ["UP-SMALL", "UP-LARGE"]:
+            return self.usage_trend_step_size
+        elif self.usage_trend in ["DOWN-SMALL", "DOWN-LARGE"]:
+            return -self.usage_trend_step_size
+        else:
+            return 0
+
+    def get_results(self):
+        """Collects the model and agent variables of all iterations, as reported by the `NetworkModel` data collector.
+
+        Returns:
+            DataFrame: One row per iteration.
+        """
+
+        _results = self.population.to_dataframe().reset_index()
+        _model_vars = pd.DataFrame({
+            "VET_price": self.economy.VET_price,
+            "VTHO_price": self.economy.VTHO_price,
+            "num_active_users": np.ones(self.iterations, dtype=int),
+            "daily_VTHO_generation": self.daily_VTHO_generation,
+            "current_VTHO_usage": self.current_VTHO_usage,
+            "current_usage_trend_size": self.current_usage_trend_size,
+            "usage_trend_step_size": self.usage_trend_step_size,
+            "buy_to_rent": (self.economy.VET_price / self.VTHO_generation_rate) / self.economy.VTHO_price,
+            "adoption_ratio": (self.population.state == BOUGHT).astype(float),
+            "main_user_CR": self.population.CR,
+        })
+        _results["AgentID"] = 1
+
+        return pd.concat([_model_vars, _results.drop(columns="strategy")], axis=1)
@@ -0,0 +1,78 @@
+import gzip
+import os
+import pickle
+
+
+# Version of the checkpoint format, checkpoints of another version are rejected
+CHECKPOINT_FORMAT = 1
+
+
+def save_checkpoint(model, path, compresslevel=3):
+    """Saves the full state of a network model to a compressed file.
+
+    The checkpoint holds the network model, its economy, all users, the data collectors and the state of the random
+    streams. The market data is not stored, since it is attached again from the data files of the process that restores
+    the model. The checkpoint is written to a temporary file that is moved into place, so that an interrupted write never
+    leaves a partial checkpoint.
+
+    Args:
+        model (NetworkModel): The model to save.
+        path (String): File to which the checkpoint is written.
+        compresslevel (int): Compression level of gzip, from 1 (fastest) to 9 (smallest).
+    """
+
+    _directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(_directory, exist_ok=True)
+    _temp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(_temp_path, "wb", compresslevel=compresslevel) as file:
+        pickle.dump({"format": CHECKPOINT_FORMAT, "step": model.schedule.steps, "model": model}, file,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(_temp_path, path)
+
+
+def load_checkpoint(path):
+    """Restores a network model from a checkpoint.
+
+    Args:
+        path (String): File that is written by `save_checkpoint`.
+
+    Returns:
+        NetworkModel: The model, ready to make its next step.
+    """
+
+    with gzip.open(path, "rb") as file:
+        _checkpoint = pickle.load(file)
+    if _checkpoint.get("format") != CHECKPOINT_FORMAT:
+        raise ValueError(f"Checkpoint {path} has format {_checkpoint.get('format')}, expected {CHECKPOINT_FORMAT}.")
+    return _checkpoint["model"]
+
+
+def fork_model(model, run_id=None, economy_changes=None, model_changes=None):
+    """Copies a model in its current state, e.g. to simulate several scenarios that share the days simulated so far.
+
+    Args:
+        model (NetworkModel): The model to copy, which is left unchanged.
+        run_id (int): Run whose random streams the copy uses from now on, see `NetworkModel.reseed`. The copy continues
+            with the same random numbers as the model when None.
+        economy_changes (dict): New values of attributes of the economy, e.g. `{"price_trend_setting": "VET-up"}`. A new
+            price trend is applied from the current day on.
+        model_changes (dict): New values of attributes of the network model.
+
+    Returns:
+        NetworkModel: The copy.
+    """
+
+    _fork = pickle.loads(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+    if run_id is not None:
+        _fork.reseed(run_id)
+
+    for name, value in (economy_changes or {}).items():
+        setattr(_fork.economy, name, value)
+    if "price_trend_setting" in (economy_changes or {}):
+        _fork.economy.initialize_price_trend()
+
+    for name, value in (model_changes or {}).items():
+        setattr(_fork, name, value)
+
+    return _fork
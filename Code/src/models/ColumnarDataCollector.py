@@ -0,0 +1,371 @@
+from collections.abc import Mapping
+from operator import attrgetter
+import numpy as np
+import pandas as pd
+
+
+class ColumnarDataCollector:
+    """Data collector that stores the collected data in preallocated NumPy arrays, one array per reporter.
+
+    Drop-in replacement of the Mesa `DataCollector` for the models of this package. The model data is stored per sampled
+    step, the agent data per sampled step and agent. Only the agents in the schedule are evaluated; users that have been
+    removed from the schedule are evaluated once, after which their final record is carried forward.
+
+    The sampling decides which steps are kept:
+        "all": every step.
+        "final": only the two most recent steps, which include the step that the batch runner reports.
+        "change": the steps in which the value of one of the change columns of an agent has changed.
+        int N: every N steps.
+    The two most recent steps are always kept.
+    """
+
+    def __init__(self, model_reporters=None, agent_reporters=None, capacity=1, sampling="all",
+                 change_columns=("active", "state")):
+        """Initializes the data collector.
+
+        Args:
+            model_reporters (dict): Attribute name or function of the model per model variable.
+            agent_reporters (dict): Attribute name or function of an agent per agent variable.
+            capacity (int): Expected number of sampled steps, the arrays grow when more steps are sampled.
+            sampling (String or int): Which steps are kept, see the class description.
+            change_columns (Tuple): Agent variables that trigger a sample when the sampling is "change".
+        """
+
+        self.model_reporters = model_reporters or {}
+        self.agent_reporters = agent_reporters or {}
+        self.sampling = sampling
+        self.change_columns = [column for column in change_columns if column in self.agent_reporters]
+        self.num_collects = 0
+        self._build_getters()
+
+        # Index of the agent data of every agent, in order of appearance
+        self.agent_ids = []
+        self._agent_index = {}
+        self._pending_agents = []
+
+        # The sampled steps and the two most recent steps
+        self._sampled = _Table(self.model_reporters, self.agent_reporters, capacity)
+        self._recent = _Table(self.model_reporters, self.agent_reporters, 2)
+
+    def _build_getters(self):
+        """Builds the getters of the model and agent variables."""
+
+        self._model_getters = [attrgetter(rep) if isinstance(rep, str) else rep
+                               for rep in self.model_reporters.values()]
+        if all(isinstance(rep, str) for rep in self.agent_reporters.values()):
+            _getter = attrgetter(*self.agent_reporters.values()) if self.agent_reporters else None
+            self._agent_getter = _getter if len(self.agent_reporters) != 1 else (lambda agent: (_getter(agent),))
+        else:
+            _getters = [attrgetter(rep) if isinstance(rep, str) else rep for rep in self.agent_reporters.values()]
+            self._agent_getter = lambda agent: tuple(getter(agent) for getter in _getters)
+
+    def __getstate__(self):
+        """Leaves out the getters when the collector is pickled, the reporters themselves need to be picklable."""
+
+        _state = self.__dict__.copy()
+        del _state["_model_getters"], _state["_agent_getter"]
+        return _state
+
+    def __setstate__(self, state):
+        """Rebuilds the getters when the collector is unpickled."""
+
+        self.__dict__.update(state)
+        self._build_getters()
+
+    def add_inactive_user(self, agent):
+        """Evaluates a user that is removed from the schedule once more, at the next collection.
+
+        Args:
+            agent (User): The user that has become inactive.
+        """
+
+        self._pending_agents.append(agent)
+
+    def collect(self, model):
+        """Collects the data of the model and its agents at the current step.
+
+        Args:
+            model (Model): The model of which to collect the data.
+        """
+
+        _step = model.schedule.steps if hasattr(model, "schedule") else self.num_collects
+        _slot = self.num_collects % 2
+        _previous = 1 - _slot if self.num_collects > 0 else None
+
+        # Evaluate the model variables
+        self._recent.set_model_row(_slot, _step, [getter(model) for getter in self._model_getters])
+
+        # Evaluate the agents in the schedule, all other agents keep their previous record
+        if self.agent_reporters:
+            _agents = (model.schedule.agents if hasattr(model, "schedule") else []) + \
+                getattr(model, "shadow_users", []) + self._pending_agents
+            self._pending_agents = []
+            for agent in _agents:
+                if agent.unique_id not in self._agent_index:
+                    self._agent_index[agent.unique_id] = len(self.agent_ids)
+                    self.agent_ids.append(agent.unique_id)
+            self._recent.ensure_agents(len(self.agent_ids))
+            self._recent.copy_agent_row(_previous, _slot)
+            if _agents:
+                self._recent.set_agent_values(
+                    _slot, [self._agent_index[agent.unique_id] for agent in _agents],
+                    list(zip(*map(self._agent_getter, _agents))))
+            self._recent.num_agents[_slot] = len(self.agent_ids)
+
+        # Keep the step when it is sampled
+        if self.is_sampled(_step, _slot, _previous):
+            self._sampled.ensure_agents(len(self.agent_ids))
+            self._sampled.append_row(self._recent, _slot)
+
+        self.num_collects += 1
+
+    def is_sampled(self, step, slot, previous):
+        """Determines whether a collected step is kept after it is no longer one of the two most recent steps.
+
+        Args:
+            step (int): The collected step.
+            slot (int): Slot of the collected step in the most recent steps.
+            previous (int): Slot of the previous step in the most recent steps, None at the first collection.
+
+        Returns:
+            bool: Whether the step is kept.
+        """
+
+        if self.sampling == "all":
+            return True
+        elif self.sampling == "final":
+            return False
+        elif self.sampling == "change":
+            return previous is None or self._recent.num_agents[slot] != self._recent.num_agents[previous] or any(
+                not np.array_equal(self._recent.agent_data[column][slot], self._recent.agent_data[column][previous])
+                for column in self.change_columns)
+        return step % self.sampling == 0
+
+    def steps(self):
+        """Determines the location of the data of every kept step.
+
+        Returns:
+            dict: The table and row of every kept step, ordered by step.
+        """
+
+        _locations = {int(step): (self._sampled, row)
+                      for row, step in enumerate(self._sampled.steps[:self._sampled.num_rows])}
+        for slot in range(min(self.num_collects, 2)):
+            _locations[int(self._recent.steps[slot])] = (self._recent, slot)
+        return dict(sorted(_locations.items()))
+
+    @property
+    def model_vars(self):
+        """The value of every model variable per kept step, in the same format as the Mesa `DataCollector`."""
+
+        _steps = self.steps()
+        return {name: {step: _item(table.model_data[name][row]) for step, (table, row) in _steps.items()}
+                for name in self.model_reporters}
+
+    @property
+    def _agent_records(self):
+        """The records of the agents per kept step, in the same format as the Mesa `DataCollector`."""
+
+        return _AgentRecords(self)
+
+    def get_model_vars_dataframe(self):
+        """Creates a DataFrame with one row per kept step and one column per model variable.
+
+        Returns:
+            DataFrame: The model variables, indexed by step.
+        """
+
+        _steps = self.steps()
+        _df = pd.DataFrame(
+            {name: [_item(table.model_data[name][row]) for table, row in _steps.values()] for name in self.model_reporters},
+            index=pd.Index(list(_steps), name="Step"))
+        return _df
+
+    def get_agent_vars_dataframe(self):
+        """Creates a DataFrame with one row per agent per kept step and one column per agent variable.
+
+        Returns:
+            DataFrame: The agent variables, indexed by step and agent id.
+        """
+
+        # Gather the kept rows of both tables
+        _rows = {}
+        for step, (table, row) in self.steps().items():
+            _rows.setdefault(id(table), (table, [], []))
+            _rows[id(table)][1].append(row)
+            _rows[id(table)][2].append(step)
+
+        _frames = []
+        _agent_ids = np.asarray(self.agent_ids)
+        for table, rows, steps in _rows.values():
+            if table.width == 0:
+                continue
+            _num_agents = table.num_agents[rows]
+            _mask = np.arange(table.width) < _num_agents[:, None]
+            _frame = pd.DataFrame({
+                "Step": np.repeat(steps, _num_agents),
+                "AgentID": np.broadcast_to(np.resize(_agent_ids, table.width), _mask.shape)[_mask]})
+            for name in self.agent_reporters:
+                _frame[name] = table.agent_data[name][rows][_mask]
+            _frames.append(_frame)
+
+        if not _frames:
+            return pd.DataFrame(columns=["Step", "AgentID"] + list(self.agent_reporters)).set_index(["Step", "AgentID"])
+        return pd.concat(_frames, ignore_index=True).sort_values("Step", kind="stable").set_index(["Step", "AgentID"])
+
+
+class _Table:
+    """Preallocated rows of model and agent data."""
+
+    def __init__(self, model_reporters, agent_reporters, capacity):
+        self.steps = np.full(max(capacity, 1), -1, dtype=np.int64)
+        self.num_agents = np.zeros(max(capacity, 1), dtype=np.int64)
+        self.num_rows = 0
+        self.width = 0
+        self.model_data = {name: None for name in model_reporters}
+        self.agent_data = {name: None for name in agent_reporters}
+
+    def ensure_rows(self, num_rows):
+        """Grows the arrays to at least the given number of rows."""
+
+        if num_rows <= len(self.steps):
+            return
+        _capacity = max(num_rows, 2 * len(self.steps))
+        self.steps = _resize(self.steps, (_capacity, ), -1)
+        self.num_agents = _resize(self.num_agents, (_capacity, ), 0)
+        for name, values in self.model_data.items():
+            if values is not None:
+                self.model_data[name] = _resize(values, (_capacity, ))
+        for name, values in self.agent_data.items():
+            if values is not None:
+                self.agent_data[name] = _resize(values, (_capacity, self.width))
+
+    def ensure_agents(self, num_agents):
+        """Grows the arrays of the agent data to at least the given number of agents."""
+
+        if num_agents <= self.width:
+            return
+        self.width = max(num_agents, 2 * self.width)
+        for name, values in self.agent_data.items():
+            if values is not None:
+                self.agent_data[name] = _resize(values, (len(self.steps), self.width))
+
+    def set_model_row(self, row, step, values):
+        """Stores the model variables of a step."""
+
+        self.steps[row] = step
+        for name, value in zip(self.model_data, values):
+            self.model_data[name] = _store(self.model_data[name], (len(self.steps), ), row, value)
+
+    def copy_agent_row(self, source, target):
+        """Copies the agent data of one row to another row."""
+
+        if source is None:
+            return
+        for values in self.agent_data.values():
+            if values is not None:
+                values[target] = values[source]
+
+    def set_agent_values(self, row, agents, columns):
+        """Stores the agent variables of the given agents in a row."""
+
+        for name, column in zip(list(self.agent_data), columns):
+            self.agent_data[name] = _store(
+                self.agent_data[name], (len(self.steps), self.width), (row, agents), _column(column))
+
+    def append_row(self, source, row):
+        """Appends a row of another table."""
+
+        self.ensure_rows(self.num_rows + 1)
+        self.ensure_agents(source.width)
+        _target = self.num_rows
+        self.steps[_target] = source.steps[row]
+        self.num_agents[_target] = source.num_agents[row]
+        for name, values in source.model_data.items():
+            self.model_data[name] = _store(self.model_data[name], (len(self.steps), ), _target, values[row])
+        for name, values in source.agent_data.items():
+            if values is not None:
+                self.agent_data[name] = _store(
+                    self.agent_data[name], (len(self.steps), self.width), (_target, slice(0, source.width)),
+                    values[row])
+        self.num_rows += 1
+
+
+class _AgentRecords(Mapping):
+    """Read-only view of the agent records of a `ColumnarDataCollector` per step, as tuples of step, agent id and values."""
+
+    def __init__(self, collector):
+        self.collector = collector
+        self._steps = collector.steps()
+
+    def __getitem__(self, step):
+        _table, _row = self._steps[step]
+        _num_agents = _table.num_agents[_row]
+        _columns = [_table.agent_data[name][_row, :_num_agents].tolist() for name in self.collector.agent_reporters]
+        return [(step, agent_id) + values for agent_id, values in zip(self.collector.agent_ids, zip(*_columns))]
+
+    def __iter__(self):
+        return iter(self._steps)
+
+    def __len__(self):
+        return len(self._steps)
+
+
+def _item(value):
+    """Converts a value of an array to the corresponding Python value."""
+
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _dtype(value):
+    """Determines the array type in which a collected value is stored."""
+
+    _value_dtype = np.asarray(value).dtype if np.ndim(value) == 0 else np.dtype(object)
+    return _value_dtype if _value_dtype.kind in "biuf" else np.dtype(object)
+
+
+def _column(values):
+    """Converts the collected values of a variable of several agents to an array."""
+
+    _array = np.array(values)
+    if _array.ndim == 1 and _array.dtype.kind in "biuf":
+        return _array
+    _array = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        _array[i] = value
+    return _array
+
+
+def _resize(values, shape, fill=None):
+    """Copies an array into a larger array of the given shape."""
+
+    _resized = np.full(shape, _fill_value(values.dtype) if fill is None else fill, dtype=values.dtype)
+    _resized[tuple(slice(0, size) for size in values.shape)] = values
+    return _resized
+
+
+def _fill_value(dtype):
+    """Value of the entries that have not been collected."""
+
+    if dtype.kind == "f":
+        return np.nan
+    elif dtype.kind == "O":
+        return None
+    return 0
+
+
+def _store(values, shape, index, value):
+    """Stores a value or an array of values in an array, creating the array or widening its type when needed.
+
+    Returns:
+        ndarray: The array in which the value is stored.
+    """
+
+    _value_dtype = value.dtype if isinstance(value, np.ndarray) else _dtype(value)
+    if values is None:
+        values = np.full(shape, _fill_value(_value_dtype), dtype=_value_dtype)
+    elif values.dtype != _value_dtype and np.result_type(values.dtype, _value_dtype) != values.dtype:
+        _new_dtype = np.result_type(values.dtype, _value_dtype) if _value_dtype != object else np.dtype(object)
+        values = values.astype(_new_dtype)
+    values[index] = value
+    return values
@@ -1,8 +1,13 @@
 import logging
+import math
 from mesa import Model
-from mesa.datacollection import DataCollector
-import pandas as pd
-import pickle
+from Model.Code.src.models.ColumnarDataCollector import ColumnarDataCollector
+from Model.Code.src.market.MarketData import load_LOB, load_LOB_quotes, load_price_trend, load_synthetic_LOB_quotes, \
+    load_bootstrapped_price_paths, BOOTSTRAP_BATCH_PATHS
+from Model.Code.src.market.PricePaths import trend_multipliers
+from Model.Code.src.market.OrderBook import OrderBook
+import Model.Code.src.tracing.EventTracer as tracing
+import numpy as np
 
 
 class EconomicModel(Model):
@@ -22,12 +27,26 @@ class EconomicModel(Model):
                  total_starting_VET,
                  total_starting_VTHO,
                  VET_liquidity_ratio,
-                 VTHO_liquidity_ratio):
+                 VTHO_liquidity_ratio,
+                 data_sampling="all",
+                 order_book=False,
+                 order_book_resilience=None,
+                 synthetic_LOB_seed=None,
+                 price_path_seed=0,
+                 price_path_id=0):
         """Initializes the economy.
 
         Args:
             VET_starting_price (float): Starting price of the VET token.
             VTHO_starting_price (float): Starting price of the VTHO token.
+            data_sampling (String or int): Which steps the data collector keeps, see `ColumnarDataCollector`.
+            order_book (bool): Whether orders are matched against persistent order books instead of a random LOB snapshot.
+            order_book_resilience (float): Fraction of the consumed depth that is replenished per day, calibrated from the
+                LOB snapshots when None, see `OrderBook`.
+            synthetic_LOB_seed (int): Seed of the synthetic LOB snapshots that replace the stored snapshots, with fresh
+                snapshots every day. The stored snapshots are used when None, see `LOBGenerator`.
+            price_path_seed (int): Seed of the bootstrapped price paths of the `BOOTSTRAP' price trend setting.
+            price_path_id (int): Index of the bootstrapped price path of this economy, e.g. swept over a range of paths.
         """
 
         # Set the model settings.
@@ -46,22 +65,23 @@ class EconomicModel(Model):
         self.liquidity_VET = self.VET_liquidity_ratio * self.circulating_VET
         self.liquidity_VTHO = self.VTHO_liquidity_ratio * self.circulating_VTHO
 
-        # Initialize the LOB's
-        self.LOB_VET = pd.read_csv(
-            "Model/Code/src/LOB/LOB_VET.csv").iloc[:, 1:]
-        self.LOB_VTHO = pd.read_csv(
-            "Model/Code/src/LOB/LOB_VTHO.csv").iloc[:, 1:]
+        # Initialize the LOB's and the price trends
         self.VET_LOB_tick_size = 0.00426
         self.VTHO_LOB_tick_size = 0.00684
-
-        # Initialize price trends
         self.price_trend_setting = price_trend_setting
         self.price_trend_length = price_trend_length
         self.steps_between_price_trend = steps_between_price_trend
-        self.initialize_price_trend()
+        self.price_path_seed = price_path_seed
+        self.price_path_id = price_path_id
+        self.order_book = order_book
+        self.order_book_resilience = order_book_resilience
+        self.synthetic_LOB_seed = synthetic_LOB_seed
+        self.VET_book = None
+        self.VTHO_book = None
+        self.load_market_data()
 
         # Initialize the data collection
-        self.datacollector = DataCollector(
+        self.datacollector = ColumnarDataCollector(
             model_reporters={
                 "network_step": "network_step",
                 "circulating_VET": "circulating_VET",
@@ -70,7 +90,8 @@ class EconomicModel(Model):
                 "liquidity_VTHO": "liquidity_VTHO",
                 "VET_price": "VET_price",
                 "VTHO_price": "VTHO_price"},
-            agent_reporters={}
+            capacity=round(price_trend_length) + 3,
+            sampling=data_sampling
         )
 
         # Collect intial data
@@ -79,64 +100,114 @@ class EconomicModel(Model):
         # Logging
         logging.warning("Initialized the economic model.")
 
-    def initialize_price_trend(self):
-        """Initializes the external price trend.
+    def load_market_data(self):
+        """Attaches the LOB's and the price trends, which are loaded once per process and shared by all economies.
         """
-        if self.price_trend_setting == "VET-up" or self.price_trend_setting == "BOTH-up":
-            filehandler = open("Model/Code/src/price_trends/VET-up.pkl", "rb")
-            self.VET_trend = pickle.load(filehandler)
-            filehandler.close()
 
+        # Initialize the LOB's
+        self.LOB_VET = load_LOB("VET")
+        self.LOB_VTHO = load_LOB("VTHO")
+
+        # Precompute the cumulative depth of the LOB's for fast order pricing
+        self.VET_quotes = load_LOB_quotes("VET")
+        self.VTHO_quotes = load_LOB_quotes("VTHO")
+        self.load_synthetic_LOB()
+
+        # The persistent order books take the place of the snapshots, they are part of the state of the economy
+        if self.order_book:
+            if self.VET_book is None:
+                self.VET_book = OrderBook(self.LOB_VET, self.order_book_resilience)
+                self.VTHO_book = OrderBook(self.LOB_VTHO, self.order_book_resilience)
+            self.VET_quotes = self.VET_book
+            self.VTHO_quotes = self.VTHO_book
+
+        # Initialize price trends
+        self.initialize_price_trend()
+
+    def load_synthetic_LOB(self):
+        """Attaches the synthetic LOB snapshots of the current day, when the economy uses synthetic snapshots.
+        """
+
+        if self.synthetic_LOB_seed is not None and self.VET_book is None:
+            self.VET_quotes = load_synthetic_LOB_quotes("VET", self.synthetic_LOB_seed, self.network_step)
+            self.VTHO_quotes = load_synthetic_LOB_quotes("VTHO", self.synthetic_LOB_seed, self.network_step)
+
+    def __getstate__(self):
+        """Leaves out the shared market data when the economy is pickled, e.g. in a checkpoint."""
+
+        _state = self.__dict__.copy()
+        for name in ["LOB_VET", "LOB_VTHO", "VET_quotes", "VTHO_quotes", "VET_trend", "VTHO_trend",
+                     "VET_trend_multipliers", "VTHO_trend_multipliers"]:
+            _state.pop(name, None)
+        return _state
+
+    def __setstate__(self, state):
+        """Attaches the market data of this process when the economy is unpickled."""
+
+        self.__dict__.update(state)
+        self.load_market_data()
+
+    def initialize_price_trend(self):
+        """Initializes the external price trend and precomputes its price multiplier for every step.
+
+        The `BOOTSTRAP' setting applies a bootstrapped path of the VET and VTHO price history to both tokens, see
+        `load_bootstrapped_price_paths`.
+        """
+        if self.price_trend_setting == "BOOTSTRAP":
+            # One path of a batch of paths that is generated at once and shared by all economies of the process
+            _batch, _path = divmod(self.price_path_id, BOOTSTRAP_BATCH_PATHS)
+            _num_trend_steps = max(round(int(self.price_trend_length) / self.steps_between_price_trend), 1)
+            _paths = load_bootstrapped_price_paths(self.price_path_seed, _batch, _num_trend_steps)
+            self.VET_trend = _paths[_path, :, 0]
+            self.VTHO_trend = _paths[_path, :, 1]
+        elif self.price_trend_setting == "VET-up" or self.price_trend_setting == "BOTH-up":
+            self.VET_trend = load_price_trend("VET-up")
         elif self.price_trend_setting == "VET-down" or self.price_trend_setting == "BOTH-down":
-            filehandler = open(
-                "Model/Code/src/price_trends/VET-down.pkl", "rb")
-            self.VET_trend = pickle.load(filehandler)
-            filehandler.close()
+            self.VET_trend = load_price_trend("VET-down")
         else:
             self.VET_trend = 0
 
         if self.price_trend_setting == "VTHO-up" or self.price_trend_setting == "BOTH-up":
-            filehandler = open("Model/Code/src/price_trends/VTHO-up.pkl", "rb")
-            self.VTHO_trend = pickle.load(filehandler)
-            filehandler.close()
+            self.VTHO_trend = load_price_trend("VTHO-up")
         elif self.price_trend_setting == "VTHO-down" or self.price_trend_setting == "BOTH-down":
-            filehandler = open(
-                "Model/Code/src/price_trends/VTHO-down.pkl", "rb")
-            self.VTHO_trend = pickle.load(filehandler)
-            filehandler.close()
-        else:
+            self.VTHO_trend = load_price_trend("VTHO-down")
+        elif self.price_trend_setting != "BOOTSTRAP":
             self.VTHO_trend = 0
 
-    def VET_order(self, amount, LOB, order_type, influence_price=True):
+        # Multiplier per step, None for a token without trend
+        self.VET_trend_multipliers = None if np.ndim(self.VET_trend) == 0 else trend_multipliers(
+            self.VET_trend, self.price_trend_length, self.steps_between_price_trend)
+        self.VTHO_trend_multipliers = None if np.ndim(self.VTHO_trend) == 0 else trend_multipliers(
+            self.VTHO_trend, self.price_trend_length, self.steps_between_price_trend)
+
+    def VET_order(self, amount, LOB_ID, order_type, influence_price=True):
         """Determines the type of VET order that is placed and executes it.
 
         Args:
             amount (int): The amount of VET to buy when positive or sell when negative.
+            LOB_ID (int): Index of the VET LOB snapshot that represents the current state of the exchange.
             order_type (String): Either `SELL' or `BUY'.
+            influence_price (bool): Whether the order moves the price (and consumes the depth of the order book).
         Returns:
             float: The FIAT price that is paid/earned.
         """
 
-        # BUY
-        if order_type == "BUY":
-            _LOB_orders = LOB[50:]
-        # SELL
-        elif order_type == "SELL":
-            _LOB_orders = LOB[:50][::-1]
-
-        # Calculate how much to buy/sell and the effect on price
-        _relative_order_size = amount / self.liquidity_VET
-        _tick_change = _LOB_orders.cumsum().searchsorted(_relative_order_size)
-
-        # Calculate how much to buy from the last of the i orders
-        _amount_from_last_order = amount - \
-            sum([_LOB_orders[i]*self.liquidity_VET for i in range(_tick_change)])
+        # Calculate how much to buy/sell, the effect on price and how much to buy from the last of the orders
+        if self.VET_book is not None and influence_price:
+            _tick_change, _filled, _filled_ticks, _amount_from_last_order = self.VET_book.execute(
+                amount, self.liquidity_VET, order_type, LOB_ID)
+        else:
+            _tick_change, _filled, _filled_ticks, _amount_from_last_order = self.VET_quotes.fill(
+                LOB_ID, amount, self.liquidity_VET, order_type)
 
         # Calculate total price paid
         _price_paid_last_order = _amount_from_last_order * \
             (self.VET_price + (_tick_change * self.VET_LOB_tick_size))
-        _price_paid = sum([_LOB_orders[i]*self.liquidity_VET*(self.VET_price + (
-            i * self.VET_LOB_tick_size)) for i in range(_tick_change)]) + _price_paid_last_order
+        _price_paid = (self.VET_price * _filled) + \
+            (self.VET_LOB_tick_size * _filled_ticks) + _price_paid_last_order
+
+        if tracing.tracer is not None:
+            tracing.tracer.trade(self.network_step, "VET", order_type, LOB_ID, amount, _tick_change, _price_paid)
 
         # if self.economic_influences in ["ADOPTION", "TREND", "BOTH"]:
         if influence_price:
@@ -156,43 +227,40 @@ class EconomicModel(Model):
 
         return _price_paid
 
-    def VTHO_order(self, amount, LOB, order_type, influence_price=True):
+    def VTHO_order(self, amount, LOB_ID, order_type, influence_price=True):
         """Determines the type of VTHO order that is placed and executes it.
 
         Args:
             amount (int): The amount of VTHO to buy when positive or sell when negative.
+            LOB_ID (int): Index of the VTHO LOB snapshot that represents the current state of the exchange.
             order_type (String): Either `SELL' or `BUY'.
+            influence_price (bool): Whether the order moves the price (and consumes the depth of the order book).
         Returns:
             float: The FIAT price that is paid/earned.
         """
 
-        # BUY
-        if order_type == "BUY":
-            _LOB_orders = LOB[50:]
-        # SELL
-        elif order_type == "SELL":
-            _LOB_orders = LOB[:50][::-1]
-
-        # Calculate how much to buy/sell and the effect on price
-        _relative_order_size = amount / self.liquidity_VTHO
-        _tick_change = _LOB_orders.cumsum().searchsorted(_relative_order_size)
-        logging.warning(f"Tick change = {_tick_change}")
-
-        # Calculate how much to buy from the last of the i orders
-        _amount_from_last_order = amount - \
-            sum([_LOB_orders[i]*self.liquidity_VTHO for i in range(_tick_change)])
+        # Calculate how much to buy/sell, the effect on price and how much to buy from the last of the orders
+        if self.VTHO_book is not None and influence_price:
+            _tick_change, _filled, _filled_ticks, _amount_from_last_order = self.VTHO_book.execute(
+                amount, self.liquidity_VTHO, order_type, LOB_ID)
+        else:
+            _tick_change, _filled, _filled_ticks, _amount_from_last_order = self.VTHO_quotes.fill(
+                LOB_ID, amount, self.liquidity_VTHO, order_type)
 
         # Calculate total price paid
         if order_type == "BUY":
             _price_paid_last_order = _amount_from_last_order * \
                 (self.VTHO_price * (1 + (_tick_change * self.VTHO_LOB_tick_size)))
-            _price_paid = sum([_LOB_orders[i]*self.liquidity_VTHO*(self.VTHO_price * (
-                1 + (i * self.VTHO_LOB_tick_size))) for i in range(_tick_change)]) + _price_paid_last_order
+            _price_paid = self.VTHO_price * \
+                (_filled + (self.VTHO_LOB_tick_size * _filled_ticks)) + _price_paid_last_order
         elif order_type == "SELL":
             _price_paid_last_order = _amount_from_last_order * \
                 (self.VTHO_price * (1 - (_tick_change * self.VTHO_LOB_tick_size)))
-            _price_paid = sum([_LOB_orders[i]*self.liquidity_VTHO*(self.VTHO_price * (
-                1 - (i * self.VTHO_LOB_tick_size))) for i in range(_tick_change)]) + _price_paid_last_order
+            _price_paid = self.VTHO_price * \
+                (_filled - (self.VTHO_LOB_tick_size * _filled_ticks)) + _price_paid_last_order
+
+        if tracing.tracer is not None:
+            tracing.tracer.trade(self.network_step, "VTHO", order_type, LOB_ID, amount, _tick_change, _price_paid)
 
         # if self.economic_influences in ["ADOPTION", "TREND", "BOTH"]:
         if influence_price:
@@ -213,18 +281,23 @@ class EconomicModel(Model):
         return _price_paid
 
     def handle_price_trends(self):
-        if self.network_step <= self.price_trend_length:
-            if self.network_step != 0 and self.network_step % self.steps_between_price_trend == 0:
-                _VET_trends = ["VET-up", "VET-down", "BOTH-up", "BOTH-down"]
-                _VTHO_trends = ["VTHO-up", "VTHO-down", "BOTH-up", "BOTH-down"]
-                if self.price_trend_setting in _VET_trends:
-                    self.VET_price = self.VET_price * \
-                        self.VET_trend[round(
-                            self.network_step/self.steps_between_price_trend)-1]
-                if self.price_trend_setting in _VTHO_trends:
-                    self.VTHO_price = self.VTHO_price * \
-                        self.VTHO_trend[round(
-                            self.network_step/self.steps_between_price_trend)-1]
+        """Applies the external price trends of the current step, looked up in the precomputed multipliers.
+        """
+        _multipliers = self.VET_trend_multipliers
+        if _multipliers is not None and self.network_step < len(_multipliers) and \
+                not math.isnan(_multipliers[self.network_step]):
+            _old_price = self.VET_price
+            self.VET_price = self.VET_price * _multipliers[self.network_step]
+            if tracing.tracer is not None:
+                tracing.tracer.price_update(self.network_step, "VET", "TREND", _old_price, self.VET_price)
+
+        _multipliers = self.VTHO_trend_multipliers
+        if _multipliers is not None and self.network_step < len(_multipliers) and \
+                not math.isnan(_multipliers[self.network_step]):
+            _old_price = self.VTHO_price
+            self.VTHO_price = self.VTHO_price * _multipliers[self.network_step]
+            if tracing.tracer is not None:
+                tracing.tracer.price_update(self.network_step, "VTHO", "TREND", _old_price, self.VTHO_price)
 
     def increase_circulating_VTHO(self, amount):
         """Increases the amount of existing VTHO by the given amount.
@@ -269,16 +342,24 @@ class EconomicModel(Model):
         self.liquidity_VET = self.VET_liquidity_ratio * self.circulating_VET
 
     def increase_network_step(self):
-        """Increases the network step by one.
+        """Increases the network step by one, after which the order books replenish their depth.
         """
         self.network_step += 1
 
+        if self.VET_book is not None:
+            self.VET_book.replenish()
+            self.VTHO_book.replenish()
+        else:
+            self.load_synthetic_LOB()
+
     def update_VET_price(self, new_price):
         """Updates the price of a single VET.
 
         Args:
             new_price (float ): New price of a single VET
         """
+        if tracing.tracer is not None:
+            tracing.tracer.price_update(self.network_step, "VET", "ORDER", self.VET_price, new_price)
         self.update_VET_liquidity(new_price)
         self.VET_price = new_price
 
@@ -288,6 +369,8 @@ class EconomicModel(Model):
         Args:
             new_price (float ): New price of a single VTHO
         """
+        if tracing.tracer is not None:
+            tracing.tracer.price_update(self.network_step, "VTHO", "ORDER", self.VTHO_price, new_price)
         self.update_VTHO_liquidity(new_price)
         self.VTHO_price = new_price
 
@@ -1,4 +1,5 @@
 import logging
+from operator import methodcaller
 # from random import randint
 from Model.Code.src.agents.DeterministicUser import DeterministicUser
 from Model.Code.src.agents.RandomizedUser import RandomizedUser
@@ -7,12 +8,44 @@ from Model.Code.src.agents.ATrendUser import ATrendUser
 from Model.Code.src.agents.RandomUser import RandomUser
 from Model.Code.src.agents.KeepRentingUser import KeepRentingUser
 from Model.Code.src.agents.InstantBuyUser import InstantBuyUser
+from Model.Code.src.models.ColumnarDataCollector import ColumnarDataCollector
+from Model.Code.src.population.UserPopulation import BOUGHT
+from Model.Code.src.population.UserCounts import UserCounts
+from Model.Code.src.tracing.PhaseProfiler import PhaseProfiler
+from Model.Code.src.models.RandomStreams import RandomStreams, SCHEDULE_STREAM
 from mesa import Model
-from mesa.datacollection import DataCollector
 from mesa.time import RandomActivation
 import numpy as np
 
 
+# User class per strategy
+USER_CLASSES = {
+    "DET": DeterministicUser,
+    "RAND": RandomizedUser,
+    "A-ADAPTED": AAdaptedUser,
+    "A-TREND": ATrendUser,
+    "RANDOM": RandomUser,
+    "KEEP-RENTING": KeepRentingUser,
+    "INSTANT-BUY": InstantBuyUser,
+}
+
+# Strategies that are evaluated as shadow users with `shadow_strategies="ALL"`
+SHADOW_STRATEGIES = ["RANDOM", "KEEP-RENTING", "INSTANT-BUY", "DET", "RAND", "A-ADAPTED", "A-TREND"]
+
+
+def _num_active_users(model):
+    """Reports the number of users, including those that have become inactive and without the shadow users, as the
+    schedule did before inactive users were removed from it."""
+
+    return model.user_counts.count()
+
+
+def _profile(model):
+    """Reports the profile of the model so far."""
+
+    return model.profiler.profile()
+
+
 class NetworkModel(Model):
     """Model of the VeChain network.
 
@@ -33,7 +66,12 @@ class NetworkModel(Model):
                  usage_trend_length,
                  starting_usage_trend_size,
                  user_strategies,
-                 main_user_strategy):
+                 main_user_strategy,
+                 data_sampling="all",
+                 seed=None,
+                 run_id=0,
+                 profile=False,
+                 shadow_strategies=None):
 
         # Basic model settings
         self.running = True  # Necessary for the batchrunner to work.
@@ -42,6 +80,13 @@ class NetworkModel(Model):
         self.simulation_length = simulation_length
         self.current_id = 0
 
+        # Timing of the phases of every step, only when profiling is enabled
+        self.profiler = PhaseProfiler() if profile else None
+
+        # Random streams of this run, keyed by the seed and the run id (the scheduler draws from a stream as well)
+        self.streams = RandomStreams(seed, run_id, simulation_length)
+        self.random = self.streams.python_random(SCHEDULE_STREAM)
+
         # VTHO usage settings
         self.initial_VTHO_usage = initial_VTHO_usage
         self.current_VTHO_usage = initial_VTHO_usage
@@ -59,12 +104,21 @@ class NetworkModel(Model):
         self.small_user_size = small_user_size
         self.large_user_size = large_user_size
 
-        # Create the schedule
+        # Create the schedule (only active users are kept in the schedule)
         self.schedule = RandomActivation(self)
+        self.inactive_users = []
+
+        # Live counts of the users per strategy, state and activity, which are updated on every change of a user
+        self.user_counts = UserCounts()
 
         # Initialize the user(s).
         self.initialize_users()
-        self.num_initial_users = self.schedule.get_agent_count()
+        self.num_initial_users = self.user_counts.count()
+
+        # Shadow users evaluate other strategies on the market path of this run, they are not part of the schedule
+        self.shadow_users = []
+        if shadow_strategies:
+            self.add_shadow_users(shadow_strategies)
 
         # Usage trend settings
         self.usage_trend_length = usage_trend_length
@@ -74,41 +128,55 @@ class NetworkModel(Model):
         self.buy_to_rent = (self.economy.VET_price /
                             self.VTHO_generation_rate) / self.economy.VTHO_price
 
-        self.datacollector = DataCollector(
-            model_reporters={
-                "VET_price": lambda m: m.economy.VET_price,
-                "VTHO_price": lambda m: m.economy.VTHO_price,
-                "num_active_users": lambda m: m.schedule.get_agent_count(),
-                "daily_VTHO_generation": "daily_VTHO_generation",
-                "current_VTHO_usage": "current_VTHO_usage",
-                "current_usage_trend_size": "current_usage_trend_size",
-                "usage_trend_step_size": "usage_trend_step_size",
-                "buy_to_rent": "buy_to_rent",
-                "adoption_ratio": lambda m: m.calculate_adoption_ratio(),
-                "main_user_CR": lambda m: m.schedule.agents[0].CR,
-            },
-            agent_reporters={
-                "active": "active",
-                "state": "state",
-                "bought_at_day": "bought_at_day",
-                "max_days": "max_days",
-                "VET": "VET",
-                "VTHO": "VTHO",
-                "user_size": "user_size",
-                "VET_needed": "VET_needed",
-                "rent_until_spent": "rent_until_spent",
-                "potential_FIAT_spent_rent": "potential_FIAT_spent_rent",
-                "VTHO_LOB_ID": "VTHO_LOB_ID",
-                "total_FIAT_spent_rent": "total_FIAT_spent_rent",
-                "VET_LOB_ID": "VET_LOB_ID",
-                "total_FIAT_spent_buying": "total_FIAT_spent_buying",
-                "initial_buy_price": "initial_buy_price",
-                "b": "b",
-                "max_a": "max_a",
-                "y": "y",
-                "CR": "CR",
-                "optimal": "optimal"
-            }
+        # The reporters are attribute names or module-level functions, so that the model can be checkpointed
+        _model_reporters = {
+            "VET_price": "economy.VET_price",
+            "VTHO_price": "economy.VTHO_price",
+            "num_active_users": _num_active_users,
+            "daily_VTHO_generation": "daily_VTHO_generation",
+            "current_VTHO_usage": "current_VTHO_usage",
+            "current_usage_trend_size": "current_usage_trend_size",
+            "usage_trend_step_size": "usage_trend_step_size",
+            "buy_to_rent": "buy_to_rent",
+            "adoption_ratio": methodcaller("calculate_adoption_ratio"),
+            "main_user_CR": "main_user.CR",
+        }
+        if self.profiler is not None:
+            # Report the profile so far, so that the batch runner reports the profile of the full run
+            _model_reporters["profile"] = _profile
+
+        _agent_reporters = {
+            "active": "active",
+            "state": "state_name",
+            "bought_at_day": "bought_at_day",
+            "max_days": "max_days",
+            "VET": "VET",
+            "VTHO": "VTHO",
+            "user_size": "user_size",
+            "VET_needed": "VET_needed",
+            "rent_until_spent": "rent_until_spent",
+            "potential_FIAT_spent_rent": "potential_FIAT_spent_rent",
+            "VTHO_LOB_ID": "VTHO_LOB_ID",
+            "total_FIAT_spent_rent": "total_FIAT_spent_rent",
+            "VET_LOB_ID": "VET_LOB_ID",
+            "total_FIAT_spent_buying": "total_FIAT_spent_buying",
+            "initial_buy_price": "initial_buy_price",
+            "b": "b",
+            "max_a": "max_a",
+            "y": "y",
+            "CR": "CR",
+            "optimal": "optimal"
+        }
+        if self.shadow_users:
+            # Tell the shadow users apart from the regular users in the results
+            _agent_reporters["strategy"] = "strategy"
+            _agent_reporters["shadow"] = "shadow"
+
+        self.datacollector = ColumnarDataCollector(
+            model_reporters=_model_reporters,
+            agent_reporters=_agent_reporters,
+            capacity=self.simulation_length + 3,
+            sampling=data_sampling
         )
 
         # Collect initial data
@@ -118,35 +186,75 @@ class NetworkModel(Model):
         logging.warning("Initialized the network model.")
 
     def step(self):
-        """Advances the model by one day/step."""
+        """Advances the model by one day/step. Every phase of the step is timed when profiling is enabled."""
+
+        _profiler = self.profiler
+        if _profiler is not None:
+            _profiler.start()
 
-        # if self.schedule.agents[0].active == True:
+        # Stop the run after this step when all users have become inactive. This step is still made, since the batch runner
+        # reports the data of the second-to-last step.
+        if self.user_counts.count(active=True) == 0 and not self.shadow_users:
+            self.running = False
 
         # Let the economy know that a day has passed
         self.economy.increase_network_step()
+        if _profiler is not None:
+            _profiler.lap("network_step")
 
         # Handle today's VTHO generation
         self.economy.increase_circulating_VTHO(
             self.VTHO_generation_rate * self.economy.circulating_VET)
+        if _profiler is not None:
+            _profiler.lap("VTHO_generation")
 
         # Handle usage trend
         # self.handle_usage_trend()
 
         # Handle external price trends
         self.economy.handle_price_trends()
+        if _profiler is not None:
+            _profiler.lap("price_trends")
 
-        # Let agents make their step
+        # Let agents make their step, the shadow users follow once all regular users have acted
         self.schedule.step()
+        for user in list(self.shadow_users):
+            user.step()
+        if _profiler is not None:
+            _profiler.lap("agents")
 
         # Update the general buy-to-rent ratio
         self.buy_to_rent = (self.economy.VET_price /
                             self.VTHO_generation_rate) / self.economy.VTHO_price
+        if _profiler is not None:
+            _profiler.lap("buy_to_rent")
 
         # Collect network data
         self.datacollector.collect(self)
+        if _profiler is not None:
+            _profiler.lap("network_data")
 
         # Collect economic data
         self.economy.datacollector.collect(self.economy)
+        if _profiler is not None:
+            _profiler.lap("economy_data")
+
+    def reseed(self, run_id):
+        """Switches the model to the random streams of another run, e.g. when a forked model needs to diverge.
+
+        The users in the schedule draw the LOB snapshots of the remaining days from the new streams. Draws that already
+        decided something, such as the last day of a user, are kept.
+
+        Args:
+            run_id (int): Id of the run whose streams are used.
+        """
+
+        _shared_ids = self.streams.shared_ids
+        self.streams = RandomStreams(self.streams.seed, run_id, self.simulation_length)
+        self.streams.shared_ids = _shared_ids
+        self.random = self.streams.python_random(SCHEDULE_STREAM)
+        for user in self.schedule.agents + self.shadow_users:
+            user.draws = self.streams.user_draws(user.unique_id)
 
     def initialize_users(self):
         """Initializes the correct amount of users based on the usage trend that is being simulated.
@@ -159,6 +267,7 @@ class NetworkModel(Model):
 
             # Add the main user
             self.add_users(1, self.main_user_strategy, self.small_user_size)
+            self.main_user = self.schedule.agents[0]
 
             # Add the other users
             self.add_users(_num_total_users-1,
@@ -171,6 +280,7 @@ class NetworkModel(Model):
 
             # Add the main user
             self.add_users(1, self.main_user_strategy, self.large_user_size)
+            self.main_user = self.schedule.agents[0]
 
             # Add the other users
             self.add_users(_num_total_users-1,
@@ -203,49 +313,49 @@ class NetworkModel(Model):
             for i in range(num_users):
                 id = self.next_id()
                 user = DeterministicUser(id, self, user_size)
-                self.schedule.add(user)
+                self.add_user(user)
             logging.info(f"Added {num_users} deterministic users.")
         elif user_strategies == "RAND":
             # Only add RAND users
             for i in range(num_users):
                 id = self.next_id()
                 user = RandomizedUser(id, self, user_size)
-                self.schedule.add(user)
+                self.add_user(user)
             logging.info(f"Added {num_users} randomized users.")
         elif user_strategies == "A-ADAPTED":
             # Only add A-ADAPTED users
             for i in range(num_users):
                 id = self.next_id()
                 user = AAdaptedUser(id, self, user_size)
-                self.schedule.add(user)
+                self.add_user(user)
             logging.info(f"Added {num_users} A-ADAPTED users.")
         elif user_strategies == "A-TREND":
             # Only add A-TREND users
             for i in range(num_users):
                 id = self.next_id()
                 user = ATrendUser(id, self, user_size)
-                self.schedule.add(user)
+                self.add_user(user)
             logging.info(f"Added {num_users} A-TREND users.")
         elif user_strategies == "RANDOM":
             # Only add RANDOM users
             for i in range(num_users):
                 id = self.next_id()
                 user = RandomUser(id, self, user_size)
-                self.schedule.add(user)
+                self.add_user(user)
             logging.info(f"Added {num_users} random users.")
         elif user_strategies == "KEEP-RENTING":
             # Only add KEEP RENTING users
             for i in range(num_users):
                 id = self.next_id()
                 user = KeepRentingUser(id, self, user_size)
-                self.schedule.add(user)
+                self.add_user(user)
             logging.info(f"Added {num_users} keep-renting users.")
         elif user_strategies == "INSTANT-BUY":
             # Only add INSTANT-BUY users
             for i in range(num_users):
                 id = self.next_id()
                 user = InstantBuyUser(id, self, user_size)
-                self.schedule.add(user)
+                self.add_user(user)
             logging.info(f"Added {num_users} instant-buy users.")
         elif user_strategies == "UNIFORM":
             _all_users = ["RANDOM", "DET", "RAND", "A-ADAPTED"]
@@ -264,24 +374,74 @@ class NetworkModel(Model):
             logging.info(
                 f"Added one of each user that is not {self.main_user_strategy}.")
 
+    def add_user(self, user):
+        """Adds a user to the schedule and counts them.
+
+        Args:
+            user (User): The user to add.
+        """
+
+        self.schedule.add(user)
+        self.user_counts.add(user.strategy, user.state, user.active)
+
+    def add_shadow_users(self, shadow_strategies):
+        """Adds a shadow user per strategy that shares the random numbers and the size of the main user.
+
+        Shadow users are price takers: they trade at the prices of the LOB snapshots, but their orders neither move the
+        prices nor change the circulating supplies. Every strategy is therefore evaluated on the same market path, which is
+        generated by the regular users, and with the same max_days and LOB snapshots (common random numbers).
+
+        Args:
+            shadow_strategies (String or List): "ALL", a comma-separated string or a list of strategies.
+        """
+
+        if shadow_strategies == "ALL":
+            shadow_strategies = SHADOW_STRATEGIES
+        elif isinstance(shadow_strategies, str):
+            shadow_strategies = shadow_strategies.split(",")
+
+        for strategy in shadow_strategies:
+            if strategy not in USER_CLASSES:
+                raise ValueError(f"Unknown shadow strategy {strategy}.")
+            id = self.next_id()
+            self.streams.share_draws(id, self.main_user.unique_id)
+            user = USER_CLASSES[strategy](id, self, self.main_user.user_size)
+            user.shadow = True
+            self.shadow_users.append(user)
+        logging.info(f"Added {len(shadow_strategies)} shadow users.")
+
+    def deactivate_user(self, user):
+        """Removes a user that has become inactive from the schedule, while keeping its final record for reporting.
+
+        Args:
+            user (User): The user that has become inactive.
+        """
+
+        if user.shadow:
+            self.shadow_users.remove(user)
+        else:
+            self.schedule.remove(user)
+            self.inactive_users.append(user)
+            self.user_counts.move(user.strategy, user.state, True, user.state, False)
+        self.datacollector.add_inactive_user(user)
+
+    def set_user_state(self, user, state):
+        """Changes the state of a user and updates the counts of the users accordingly.
+
+        Args:
+            user (User): The user whose state changes.
+            state (int): The new state, RENTING or BOUGHT.
+        """
+
+        if not user.shadow:
+            self.user_counts.move(user.strategy, user.state, user.active, state, user.active)
+        user.state = state
+
     def calculate_adoption_ratio(self):
-        """Calculates the current long-term adoption ratio (the ratio of active users that have bought).
+        """Calculates the current long-term adoption ratio (the ratio of users that have bought) from the live counts.
 
         Returns:
             float: Adoption ratio.
         """
-        _renting_count = 0
-        _bought_count = 0
-
-        # Count the number of active agents and those that have bought
-        for agent in self.schedule.agents:
-            if agent.state == "BOUGHT":
-                _bought_count += 1
-            elif agent.state == "RENTING":
-                _renting_count += 1
-
-        if _bought_count > 0:
-            # Return the adoption ratio
-            return _bought_count / self.num_initial_users
-        else:
-            return 0
+
+        return self.user_counts.count(state=BOUGHT) / self.num_initial_users
@@ -0,0 +1,160 @@
+import numpy as np
+
+
+def trend_prices(price, multipliers, steps):
+    """Applies the precomputed price-trend multipliers of an economy to a price, step after step.
+
+    Args:
+        price (float): Price before the first step.
+        multipliers (ndarray): Multiplier per step, see `EconomicModel.VET_trend_multipliers`. None without a trend.
+        steps (ndarray): The consecutive network steps.
+
+    Returns:
+        ndarray: The price after every step.
+    """
+
+    if multipliers is None:
+        return np.full(len(steps), float(price))
+
+    # Steps beyond the trend or between two trend steps leave the price unchanged
+    _multipliers = np.ones(len(steps))
+    _in_trend = steps < len(multipliers)
+    _multipliers[_in_trend] = multipliers[steps[_in_trend]]
+    _multipliers[np.isnan(_multipliers)] = 1
+
+    # The cumulative product multiplies in the same order as the economy does, so the prices are identical
+    return np.cumprod(np.concatenate([[price], _multipliers]))[1:]
+
+
+class OGSkiRentalSolver:
+    """Computes the outcome of users in the OG-SKI-RENTAL setting without stepping through the days.
+
+    In the OG setting the users do not influence the economy, so the buy and rent prices only follow the external price
+    trends. The solver precomputes the daily prices and the prefix sums of the rent costs, after which the buy day, the
+    expenses and the CR of every user follow directly from the threshold rule of their strategy.
+    """
+
+    def __init__(self, economic_model, num_days, generation_rate, user_size, usage_trend_step_size=0):
+        """Precomputes the price path and the prefix sums of the rent costs.
+
+        Args:
+            economic_model (EconomicModel): Economy in which the users act, in its initial state.
+            num_days (int): Number of days (model steps) that are simulated.
+            generation_rate (float): Amount of VTHO that one VET generates each day.
+            user_size (float): Amount of VTHO that the user uses on the first day.
+            usage_trend_step_size (float): Change of the user size per day due to the usage trend.
+        """
+
+        self.num_days = num_days
+
+        # Determine the prices on every day from the price-trend multipliers of the economy
+        _steps = economic_model.network_step + 1 + np.arange(num_days + 1)
+        self.VET_prices = trend_prices(economic_model.VET_price, economic_model.VET_trend_multipliers, _steps)
+        self.VTHO_prices = trend_prices(economic_model.VTHO_price, economic_model.VTHO_trend_multipliers, _steps)
+
+        # Determine the size of the user on every day
+        _size_changes = np.full(num_days + 1, float(usage_trend_step_size))
+        _size_changes[0] = user_size
+        self.user_sizes = np.cumsum(_size_changes)
+        self.VET_needed = self.user_sizes / generation_rate
+
+        # Daily costs of renting and buying and the rent spent before every day
+        self.rent_costs = self.VTHO_prices * self.user_sizes
+        self.buy_costs = self.VET_needed * self.VET_prices
+        self.rent_before = np.zeros(num_days + 2)
+        self.rent_before[1:] = np.cumsum(self.rent_costs)
+
+    def first_day(self, condition):
+        """Finds the first day on which the given condition holds.
+
+        Args:
+            condition (ndarray): Whether the condition holds on every day.
+
+        Returns:
+            int: The first day, or the number of days + 1 when the condition never holds.
+        """
+
+        return int(np.argmax(condition)) if condition.any() else self.num_days + 1
+
+    def buy_days(self, strategy, num_users, rent_until_spent_norm=None, day_of_buying=None):
+        """Determines the day on which every user would buy if they were active long enough.
+
+        Args:
+            strategy (String): Strategy of the users.
+            num_users (int): Number of users.
+            rent_until_spent_norm (ndarray): Normalized rent threshold of every RAND user.
+            day_of_buying (ndarray): Day of buying of every RANDOM user.
+
+        Returns:
+            ndarray: The buy day of every user, or the number of days + 1 for users that never buy.
+        """
+
+        _rent_before = self.rent_before[:-1]
+
+        if strategy == "DET":
+            # Buy when FIAT spent on rent >= buying price for all VET needed to generate enough VTHO
+            _day = self.first_day(_rent_before >= self.buy_costs)
+        elif strategy in ["A-ADAPTED", "A-TREND"]:
+            # y is never updated in the OG setting
+            _day = self.first_day((_rent_before + self.rent_costs) >= 1 * self.buy_costs)
+        elif strategy == "RAND":
+            # Buy on the first day on which the ratio of the (would-be) rent to the buy cost exceeds the threshold
+            _ratio = np.maximum.accumulate((_rent_before + self.rent_costs) / self.buy_costs)
+            return np.searchsorted(_ratio, rent_until_spent_norm, side="right")
+        elif strategy == "RANDOM":
+            return np.asarray(day_of_buying)
+        elif strategy == "INSTANT-BUY":
+            _day = 0
+        else:
+            _day = self.num_days + 1
+
+        return np.full(num_users, _day)
+
+    def solve(self, strategy, max_days, rent_until_spent_norm=None, day_of_buying=None):
+        """Determines the outcome of every user.
+
+        Args:
+            strategy (String): Strategy of the users.
+            max_days (ndarray): Max. number of days of every user, as chosen by the adversary.
+            rent_until_spent_norm (ndarray): Normalized rent threshold of every RAND user.
+            day_of_buying (ndarray): Day of buying of every RANDOM user.
+
+        Returns:
+            dict: The final value of the user attributes, one array per attribute.
+        """
+
+        # Users that are still active after the last day have only been charged up to that day
+        max_days = np.minimum(max_days, self.num_days - 1)
+        _buy_days = self.buy_days(strategy, len(max_days), rent_until_spent_norm, day_of_buying)
+        _bought = _buy_days <= max_days
+        _last_day = np.where(_bought, _buy_days, max_days)
+        _buy_day = np.where(_bought, _buy_days, 0)
+
+        # Rent is paid on all days before buying, the would-be rent on all active days
+        _total_FIAT_spent_rent = self.rent_before[np.where(_bought, _buy_days, max_days + 1)]
+        _total_FIAT_spent_buying = np.where(_bought, self.VET_prices[_buy_day] * self.VET_needed[_buy_day], 0)
+        _potential_FIAT_spent_rent = self.rent_before[max_days + 1]
+        _initial_buy_price = self.VET_needed[0] * self.VET_prices[0]
+
+        # Determine the achieved CR
+        _optimal = np.minimum(_initial_buy_price, _potential_FIAT_spent_rent)
+        _CR = (_total_FIAT_spent_rent + _total_FIAT_spent_buying) / _optimal
+
+        # As in `User.OG_buy_VET`, buying does not add VET to the user in the OG setting
+        _outcome = {
+            "bought": _bought,
+            "bought_at_day": _buy_day,
+            "total_FIAT_spent_rent": _total_FIAT_spent_rent,
+            "total_FIAT_spent_buying": _total_FIAT_spent_buying,
+            "VET": np.zeros(len(max_days)),
+            "potential_FIAT_spent_rent": _potential_FIAT_spent_rent,
+            "initial_buy_price": np.full(len(max_days), _initial_buy_price),
+            "user_size": self.user_sizes[max_days + 1],
+            "VET_needed": self.VET_needed[max_days + 1],
+            "optimal": _optimal,
+            "CR": _CR,
+        }
+        if strategy == "RAND":
+            _outcome["rent_until_spent"] = rent_until_spent_norm * self.buy_costs[_last_day]
+
+        return _outcome
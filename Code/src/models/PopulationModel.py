@@ -0,0 +1,283 @@
+import logging
+from operator import methodcaller
+from Model.Code.src.population.UserPopulation import UserPopulation, BOUGHT
+from Model.Code.src.population.Cohorts import build_cohorts, draw_user, concatenate_cohorts
+from mesa import Model
+from Model.Code.src.models.ColumnarDataCollector import ColumnarDataCollector
+from mesa.time import BaseScheduler
+import numpy as np
+
+
+def _num_users(model):
+    """Reports the number of users, including those that have become inactive and all users of every cohort."""
+
+    return model.population.count()
+
+
+def _main_user_CR(model):
+    """Reports the CR of the main user, who is stored in the first row of the population."""
+
+    return model.population.CR[0]
+
+
+class PopulationModel(Model):
+    """Model of the VeChain network in which the users are stored as a struct of arrays instead of as Mesa agents.
+
+    Takes the same arguments as the `NetworkModel`. All users trade against the state of the economy at the start of the day,
+    after which their aggregated order flow is executed on the economy. This allows for populations of millions of users.
+
+    With `cohort_buckets` set, the users besides the main user are grouped into weighted cohorts of identical users (see
+    `build_cohorts`), so that the memory and time per step are proportional to the number of cohorts instead of the number
+    of users.
+
+    Args:
+        Model (Mesa model): Base model of the Mesa framework.
+    """
+
+    def __init__(self,
+                 experiment_setting,
+                 economic_model,
+                 simulation_length,
+                 generation_rate,
+                 initial_VTHO_usage,
+                 final_VTHO_usage,
+                 small_user_size,
+                 large_user_size,
+                 usage_trend,
+                 usage_trend_length,
+                 starting_usage_trend_size,
+                 user_strategies,
+                 main_user_strategy,
+                 data_sampling="all",
+                 seed=None,
+                 cohort_buckets=None):
+
+        # Basic model settings
+        self.running = True  # Necessary for the batchrunner to work.
+        self.experiment_setting = experiment_setting
+        self.economy = economic_model
+        self.simulation_length = simulation_length
+        self.np_random = np.random.default_rng(seed)
+
+        # VTHO usage settings
+        self.initial_VTHO_usage = initial_VTHO_usage
+        self.current_VTHO_usage = initial_VTHO_usage
+        self.final_VTHO_usage = final_VTHO_usage
+        self.usage_trend = usage_trend
+        self.current_usage_trend_size = starting_usage_trend_size
+
+        self.VTHO_generation_rate = generation_rate
+        self.daily_VTHO_generation = self.economy.circulating_VET * self.VTHO_generation_rate
+
+        # User settings
+        self.user_strategies = user_strategies
+        self.main_user_strategy = main_user_strategy
+        self.small_user_size = small_user_size
+        self.large_user_size = large_user_size
+        self.cohort_buckets = cohort_buckets
+
+        # The schedule only keeps track of the steps
+        self.schedule = BaseScheduler(self)
+
+        # Initialize the user(s).
+        self.initialize_users()
+        self.num_initial_users = self.population.count()
+
+        # Usage trend settings
+        self.usage_trend_length = usage_trend_length
+        self.usage_trend_step_size = (
+            (self.final_VTHO_usage - self.initial_VTHO_usage)/self.simulation_length)/self.num_initial_users
+
+        self.buy_to_rent = (self.economy.VET_price /
+                            self.VTHO_generation_rate) / self.economy.VTHO_price
+
+        # The reporters are attribute names or module-level functions, so that the model can be checkpointed
+        self.datacollector = ColumnarDataCollector(
+            model_reporters={
+                "VET_price": "economy.VET_price",
+                "VTHO_price": "economy.VTHO_price",
+                "num_active_users": _num_users,
+                "daily_VTHO_generation": "daily_VTHO_generation",
+                "current_VTHO_usage": "current_VTHO_usage",
+                "current_usage_trend_size": "current_usage_trend_size",
+                "usage_trend_step_size": "usage_trend_step_size",
+                "buy_to_rent": "buy_to_rent",
+                "adoption_ratio": methodcaller("calculate_adoption_ratio"),
+                "main_user_CR": _main_user_CR,
+            },
+            capacity=self.simulation_length + 3,
+            sampling=data_sampling
+        )
+
+        # Collect initial data
+        self.datacollector.collect(self)
+        self.economy.datacollector.collect(self.economy)
+
+        logging.warning("Initialized the population model.")
+
+    def step(self):
+        """Advances the model by one day/step."""
+
+        # Stop the run after this step when all users have become inactive. This step is still made, since the batch runner
+        # reports the data of the second-to-last step.
+        if self.population.count(active=True) == 0:
+            self.running = False
+
+        # Let the economy know that a day has passed
+        self.economy.increase_network_step()
+
+        # Handle today's VTHO generation
+        self.economy.increase_circulating_VTHO(
+            self.VTHO_generation_rate * self.economy.circulating_VET)
+
+        # Handle external price trends
+        self.economy.handle_price_trends()
+
+        # Let all users make their step at once
+        _VET_bought, _VTHO_bought, _VTHO_used = self.population.step(
+            self.schedule.steps, self.economy, self.get_usage_trend_step_size())
+
+        # Execute the aggregated order flow of the users (of all users in every cohort) on the economy
+        if self.experiment_setting not in ["OG-SKI-RENTAL"]:
+            _weight = self.population.weight
+            self.execute_order_flow(
+                np.sum(_weight * _VET_bought), np.sum(_weight * _VTHO_bought), np.sum(_weight * _VTHO_used))
+
+        self.schedule.step()
+
+        # Update the general buy-to-rent ratio
+        self.buy_to_rent = (self.economy.VET_price /
+                            self.VTHO_generation_rate) / self.economy.VTHO_price
+
+        # Collect network data
+        self.datacollector.collect(self)
+
+        # Collect economic data
+        self.economy.datacollector.collect(self.economy)
+
+    def execute_order_flow(self, VET_bought, VTHO_bought, VTHO_used):
+        """Executes the total orders and transactions of all users on the economy.
+
+        Args:
+            VET_bought (float): Total amount of VET bought by the users.
+            VTHO_bought (float): Total amount of VTHO bought by the users.
+            VTHO_used (float): Total amount of VTHO used by the users.
+        """
+
+        if VET_bought > 0:
+            self.economy.VET_order(
+                VET_bought, self.np_random.integers(0, 100), order_type="BUY")
+            self.economy.decrease_circulating_VET(VET_bought)
+
+        if VTHO_bought > 0:
+            self.economy.VTHO_order(
+                VTHO_bought, self.np_random.integers(0, 100), order_type="BUY")
+
+        # Destroy 70% of the spent VTHO
+        self.economy.decrease_circulating_VTHO(0.7 * VTHO_used)
+
+    def initialize_users(self):
+        """Initializes the population based on the usage trend that is being simulated.
+        """
+
+        if self.usage_trend in ["STABLE-SMALL", "UP-SMALL", "DOWN-SMALL"]:
+            _user_size = self.small_user_size
+        elif self.usage_trend in ["STABLE-LARGE", "UP-LARGE", "DOWN-LARGE"]:
+            _user_size = self.large_user_size
+
+        # Calculate the total amount of users
+        _num_total_users = round(self.initial_VTHO_usage / _user_size)
+
+        if self.cohort_buckets is None:
+            # The main user is always the first user
+            _strategies = [self.main_user_strategy] + \
+                self.get_user_strategies(_num_total_users-1, self.user_strategies)
+
+            self.population = UserPopulation(
+                _strategies, _user_size, self.simulation_length, self.VTHO_generation_rate,
+                self.economy, self.np_random, OG=self.experiment_setting in ["OG-SKI-RENTAL"])
+        else:
+            # The main user is always the first cohort, of a single user with exactly drawn attributes
+            _cohorts = concatenate_cohorts([
+                draw_user(self.main_user_strategy, self.simulation_length, self.np_random),
+                build_cohorts(self.get_user_strategy_counts(_num_total_users-1, self.user_strategies),
+                              self.simulation_length, self.np_random, self.cohort_buckets)])
+
+            self.population = UserPopulation(
+                _cohorts["strategy"], _user_size, self.simulation_length, self.VTHO_generation_rate,
+                self.economy, self.np_random, OG=self.experiment_setting in ["OG-SKI-RENTAL"],
+                weights=_cohorts["weight"], max_days=_cohorts["max_days"], day_of_buying=_cohorts["day_of_buying"],
+                rent_until_spent_norm=_cohorts["rent_until_spent_norm"])
+        logging.info(
+            f"Added {self.population.count()} users in {self.population.num_users} rows with strategies "
+            f"{list(self.population.rows)}.")
+
+    def get_user_strategies(self, num_users, user_strategies):
+        """Determines the strategies of the users besides the main user, in the same way as `NetworkModel.add_users`.
+
+        Args:
+            num_users (int): Number of users to add.
+            user_strategies (String): Strategy that the to-be added users need to apply.
+
+        Returns:
+            List: Strategy of every user.
+        """
+
+        if user_strategies == "UNIFORM":
+            _all_users = ["RANDOM", "DET", "RAND", "A-ADAPTED"]
+            _all_users.remove(self.main_user_strategy)
+            return _all_users
+        elif user_strategies == "UNIFORM-A-TREND":
+            _all_users = ["RANDOM", "DET", "RAND", "A-TREND"]
+            _all_users.remove(self.main_user_strategy)
+            return _all_users
+        else:
+            return [user_strategies] * num_users
+
+    def get_user_strategy_counts(self, num_users, user_strategies):
+        """Determines the number of users per strategy besides the main user, without listing every user.
+
+        Args:
+            num_users (int): Number of users to add.
+            user_strategies (String): Strategy that the to-be added users need to apply.
+
+        Returns:
+            dict: Number of users per strategy.
+        """
+
+        if user_strategies in ["UNIFORM", "UNIFORM-A-TREND"]:
+            return {strategy: 1 for strategy in self.get_user_strategies(num_users, user_strategies)}
+        else:
+            return {user_strategies: num_users} if num_users > 0 else {}
+
+    def get_usage_trend_step_size(self):
+        """Determines the change of the user size per day based on the usage trend.
+
+        Returns:
+            float: The change of the user size.
+        """
+
+        if self.usage_trend in ["UP-SMALL", "UP-LARGE"]:
+            return self.usage_trend_step_size
+        elif self.usage_trend in ["DOWN-SMALL", "DOWN-LARGE"]:
+            return -self.usage_trend_step_size
+        else:
+            return 0
+
+    def calculate_adoption_ratio(self):
+        """Calculates the current long-term adoption ratio (the ratio of users that have bought).
+
+        Returns:
+            float: Adoption ratio.
+        """
+
+        return self.population.count(state=BOUGHT) / self.num_initial_users
+
+    def get_agent_vars_dataframe(self):
+        """Exports the current state of all users.
+
+        Returns:
+            DataFrame: One row per user, or per cohort when the users are grouped into cohorts.
+        """
+
+        return self.population.to_dataframe()
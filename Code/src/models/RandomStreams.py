@@ -0,0 +1,153 @@
+import random
+from Model.Code.src.population.RentThresholds import THRESHOLD_DISTRIBUTIONS
+import numpy as np
+
+
+# Streams of a run, every stream has its own key
+USER_STREAM = 0
+SCHEDULE_STREAM = 1
+
+# Number of LOB snapshots per token
+NUM_LOB_SNAPSHOTS = 100
+
+
+class RandomStreams:
+    """Counter-based random streams of a single run.
+
+    Every stream is a Philox generator keyed by the seed of the sweep, the id of the run, the stream and the index within the
+    stream (e.g. the id of a user). A draw therefore only depends on these keys, and not on the order in which users are
+    created or stepped, or on the process in which the run is executed.
+    """
+
+    def __init__(self, seed=None, run_id=0, simulation_length=1):
+        """Initializes the streams of a run.
+
+        Args:
+            seed (int): Seed of the sweep, fresh entropy is used when None.
+            run_id (int): Id of the run within the sweep.
+            simulation_length (int): Number of days in the simulation.
+        """
+
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.run_id = run_id
+        self.simulation_length = simulation_length
+
+        # Users that draw the random numbers of another user, e.g. shadow users
+        self.shared_ids = {}
+
+    def key(self, stream, index=0):
+        """Derives the Philox key of a stream.
+
+        Args:
+            stream (int): The stream, e.g. `USER_STREAM`.
+            index (int): Index within the stream.
+
+        Returns:
+            ndarray: The 128-bit key as two unsigned 64-bit integers.
+        """
+
+        return np.random.SeedSequence([self.seed, self.run_id, stream, index]).generate_state(2, np.uint64)
+
+    def generator(self, stream, index=0):
+        """Creates the NumPy generator of a stream.
+
+        Args:
+            stream (int): The stream, e.g. `USER_STREAM`.
+            index (int): Index within the stream.
+
+        Returns:
+            Generator: The generator, starting at counter 0.
+        """
+
+        return np.random.Generator(np.random.Philox(key=self.key(stream, index)))
+
+    def python_random(self, stream):
+        """Creates a Python random number generator that is seeded by a stream, e.g. for the Mesa scheduler.
+
+        Args:
+            stream (int): The stream, e.g. `SCHEDULE_STREAM`.
+
+        Returns:
+            Random: The seeded generator.
+        """
+
+        return random.Random(int.from_bytes(self.key(stream).tobytes(), "little"))
+
+    def user_draws(self, unique_id):
+        """Draws all random numbers that a user needs during the simulation.
+
+        Args:
+            unique_id (int): Unique identifier of the user.
+
+        Returns:
+            UserDraws: The draws of the user.
+        """
+
+        return UserDraws(self.generator(USER_STREAM, self.shared_ids.get(unique_id, unique_id)), self.simulation_length)
+
+    def share_draws(self, unique_id, source_id):
+        """Lets a user draw the same random numbers as another user (common random numbers).
+
+        Args:
+            unique_id (int): Unique identifier of the user that shares the draws.
+            source_id (int): Unique identifier of the user whose draws are shared.
+        """
+
+        self.shared_ids[unique_id] = self.shared_ids.get(source_id, source_id)
+
+
+class UserDraws:
+    """The random numbers of a single user, drawn at once when the user is created.
+
+    Every user draws the same numbers in the same order regardless of their strategy, so users with the same id face the
+    same adversary and the same LOB snapshots in runs that only differ in their strategies.
+    """
+
+    __slots__ = ("max_days", "day_of_buying", "threshold_uniform", "initial_VET_LOB_ID", "initial_VTHO_LOB_ID",
+                 "VET_LOB_IDs", "VTHO_LOB_IDs")
+
+    def __init__(self, rng, simulation_length):
+        """Draws the random numbers.
+
+        Args:
+            rng (Generator): Generator of the user.
+            simulation_length (int): Number of days in the simulation.
+        """
+
+        # Last day, chosen by the adversary, and the day of buying of a RANDOM user, both from [1 or 0, simulation_length]
+        self.max_days = int(rng.integers(1, simulation_length + 1))
+        self.day_of_buying = int(rng.integers(0, simulation_length + 1))
+
+        # Uniform draw from which the rent threshold of a RAND user follows
+        self.threshold_uniform = rng.random()
+
+        # LOB snapshots of the initial price-to-rent ratio and of every day
+        self.initial_VET_LOB_ID, self.initial_VTHO_LOB_ID = rng.integers(0, NUM_LOB_SNAPSHOTS, size=2).tolist()
+        _LOB_IDs = rng.integers(0, NUM_LOB_SNAPSHOTS, size=(2, simulation_length + 1), dtype=np.int8)
+        self.VET_LOB_IDs = _LOB_IDs[0]
+        self.VTHO_LOB_IDs = _LOB_IDs[1]
+
+    def LOB_IDs(self, day):
+        """Looks up the LOB snapshots of a day.
+
+        Args:
+            day (int): The day, days after the simulation length reuse the snapshots from the start.
+
+        Returns:
+            Tuple: The index of the VET and of the VTHO LOB snapshot.
+        """
+
+        _day = day % len(self.VET_LOB_IDs)
+        return int(self.VET_LOB_IDs[_day]), int(self.VTHO_LOB_IDs[_day])
+
+    def rent_threshold(self, distribution="SKI-RENTAL"):
+        """Determines the normalized rent threshold of a RAND user.
+
+        Args:
+            distribution (String): Name of the threshold distribution.
+
+        Returns:
+            float: The normalized rent threshold.
+        """
+
+        return float(THRESHOLD_DISTRIBUTIONS[distribution](self.threshold_uniform))
@@ -0,0 +1,134 @@
+from Model.Code.src.population.RentThresholds import THRESHOLD_DISTRIBUTIONS, sample_rent_thresholds
+import numpy as np
+
+
+# Default number of buckets of the max. number of days, the day of buying and the normalized rent threshold
+NUM_DAY_BUCKETS = 73
+NUM_THRESHOLD_BUCKETS = 20
+
+
+def integer_buckets(low, high, num_buckets):
+    """Splits the integers in [low, high] into consecutive buckets of (almost) equal width.
+
+    Args:
+        low (int): Smallest integer.
+        high (int): Largest integer.
+        num_buckets (int): Max. number of buckets, every integer gets a bucket of its own when there are fewer integers.
+
+    Returns:
+        Tuple: The middle integer of every bucket and the probability that a uniform draw from [low, high] falls into it.
+    """
+
+    _edges = np.unique(np.round(np.linspace(low, high + 1, num_buckets + 1)).astype(np.int64))
+    return (_edges[:-1] + _edges[1:] - 1) // 2, np.diff(_edges) / (high + 1 - low)
+
+
+def threshold_buckets(num_buckets, distribution="SKI-RENTAL"):
+    """Splits a distribution of the normalized rent threshold into buckets of equal probability.
+
+    Args:
+        num_buckets (int): Number of buckets.
+        distribution (String): Name of the threshold distribution.
+
+    Returns:
+        Tuple: The median threshold of every bucket and the probability of every bucket.
+    """
+
+    _quantiles = (np.arange(num_buckets) + 0.5) / num_buckets
+    return THRESHOLD_DISTRIBUTIONS[distribution](_quantiles), np.full(num_buckets, 1 / num_buckets)
+
+
+def build_cohorts(strategy_counts, simulation_length, rng, num_day_buckets=NUM_DAY_BUCKETS,
+                  num_threshold_buckets=NUM_THRESHOLD_BUCKETS):
+    """Groups users into weighted cohorts of identical users.
+
+    The users of a strategy are spread over the buckets of their random attributes (max_days, plus the day of buying of
+    RANDOM users and the rent threshold of RAND users) by a single multinomial draw. Every bucket that receives users
+    becomes a cohort that takes the middle value of the bucket and a weight equal to its number of users. The memory and
+    time that this takes only depend on the number of buckets, not on the number of users.
+
+    Args:
+        strategy_counts (dict): Number of users per strategy.
+        simulation_length (int): Number of days in the simulation.
+        rng (Generator): NumPy random number generator of the model.
+        num_day_buckets (int): Number of buckets of max_days and of the day of buying.
+        num_threshold_buckets (int): Number of buckets of the normalized rent threshold.
+
+    Returns:
+        dict: The columns `strategy`, `weight`, `max_days`, `day_of_buying` and `rent_until_spent_norm` with one value per
+            cohort. The columns are empty when there are no users.
+    """
+
+    _max_days = integer_buckets(1, simulation_length, num_day_buckets)
+    _cohorts = []
+    for strategy, count in strategy_counts.items():
+        # Every strategy has its own random attributes, the other columns keep their default value
+        _dimensions = {"max_days": _max_days}
+        if strategy == "RANDOM":
+            _dimensions["day_of_buying"] = integer_buckets(0, simulation_length, num_day_buckets)
+        elif strategy == "RAND":
+            _dimensions["rent_until_spent_norm"] = threshold_buckets(num_threshold_buckets)
+
+        # Distribute the users over all combinations of buckets
+        _probabilities = np.ones(1)
+        for _, probabilities in _dimensions.values():
+            _probabilities = np.multiply.outer(_probabilities, probabilities)
+        _weights = rng.multinomial(count, _probabilities.ravel() / np.sum(_probabilities))
+        _occupied = np.flatnonzero(_weights)
+        _indices = np.unravel_index(_occupied, _probabilities.shape[1:])
+
+        _cohort = _default_columns(strategy, len(_occupied))
+        _cohort["weight"] = _weights[_occupied]
+        for (name, (values, _)), index in zip(_dimensions.items(), _indices):
+            _cohort[name] = values[index]
+        _cohorts.append(_cohort)
+
+    if not _cohorts:
+        return _default_columns(None, 0)
+    return concatenate_cohorts(_cohorts)
+
+
+def draw_user(strategy, simulation_length, rng):
+    """Draws the random attributes of a single user exactly, e.g. of the main user, as a cohort of weight 1.
+
+    Args:
+        strategy (String): Strategy of the user.
+        simulation_length (int): Number of days in the simulation.
+        rng (Generator): NumPy random number generator of the model.
+
+    Returns:
+        dict: The columns of the cohort, see `build_cohorts`.
+    """
+
+    _cohort = _default_columns(strategy, 1)
+    _cohort["max_days"][:] = rng.integers(1, simulation_length + 1)
+    if strategy == "RANDOM":
+        _cohort["day_of_buying"][:] = rng.integers(0, simulation_length + 1)
+    elif strategy == "RAND":
+        _cohort["rent_until_spent_norm"][:] = sample_rent_thresholds(rng, 1)
+    return _cohort
+
+
+def concatenate_cohorts(cohorts):
+    """Concatenates the columns of several groups of cohorts.
+
+    Args:
+        cohorts (List): Groups of cohorts, see `build_cohorts`.
+
+    Returns:
+        dict: The columns of all cohorts, in the given order.
+    """
+
+    return {name: np.concatenate([cohort[name] for cohort in cohorts]) for name in cohorts[0]}
+
+
+def _default_columns(strategy, num_cohorts):
+    """Creates the columns of cohorts of a strategy with the default value of every attribute."""
+
+    return {
+        "strategy": np.full(num_cohorts, strategy, dtype=object),
+        "weight": np.ones(num_cohorts, dtype=np.int64),
+        "max_days": np.ones(num_cohorts, dtype=np.int64),
+        "day_of_buying": np.full(num_cohorts, -1, dtype=np.int64),
+        "rent_until_spent_norm": np.zeros(num_cohorts),
+    }
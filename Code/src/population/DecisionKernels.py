@@ -0,0 +1,154 @@
+import numpy as np
+
+
+# Weights of the fluctuation ratios in the A-TREND weighted mean (the most recent ratio has weight 1)
+ALPHA_WINDOW = 100
+ALPHA_WEIGHTS = np.array([0.9**i for i in range(ALPHA_WINDOW-1, -1, -1)])
+
+# Number of price-to-rent ratios used for the A-TREND regression
+TREND_WINDOW = 50
+TREND_X = np.arange(TREND_WINDOW) - ((TREND_WINDOW - 1) / 2)
+TREND_SXX = np.sum(TREND_X ** 2)
+SLOPE_STRENGTH = 10
+
+
+def deterministic(population, rows, rent_costs, buy_costs, step, OG):
+    """Decision kernel of the deterministic "break-even" algorithm.
+
+    Args:
+        population (UserPopulation): Population that the users belong to.
+        rows (ndarray): Rows of the users that are deciding.
+        rent_costs (ndarray): Estimated cost of renting today for every user.
+        buy_costs (ndarray): Estimated cost of buying today for every user.
+        step (int): Current step of the model.
+        OG (bool): Whether the decision is made in the OG setting.
+
+    Returns:
+        ndarray: TRUE for the users that need to buy. False otherwise.
+    """
+
+    if not OG:
+        population.buy_to_rent[rows] = buy_costs / rent_costs
+
+    # Buy when FIAT spent on rent >= buying price for all VET needed to generate enough VTHO
+    return population.total_FIAT_spent_rent[rows] >= buy_costs
+
+
+def randomized(population, rows, rent_costs, buy_costs, step, OG):
+    """Decision kernel of the randomized algorithm. See `deterministic` for the arguments.
+    """
+
+    if not OG:
+        population.buy_to_rent[rows] = buy_costs / rent_costs
+
+    # Determine new FIAT value of max. rent
+    _rent_until_spent = population.rent_until_spent_norm[rows] * buy_costs
+    population.rent_until_spent[rows] = _rent_until_spent
+
+    # Buy when
+    return population.total_FIAT_spent_rent[rows] > (_rent_until_spent - rent_costs)
+
+
+def a_adapted(population, rows, rent_costs, buy_costs, step, OG):
+    """Decision kernel of the A-ADAPTED algorithm. See `deterministic` for the arguments.
+    """
+
+    if not OG:
+        # Determine the fluctuation ratio based on this and the previous day
+        _price_to_rent = buy_costs / rent_costs
+        _previous_price_to_rent = population.last_price_to_rent[rows]
+        _alpha = np.maximum(_price_to_rent, _previous_price_to_rent) / \
+            np.minimum(_price_to_rent, _previous_price_to_rent)
+        population.buy_to_rent[rows] = _price_to_rent
+        population.last_price_to_rent[rows] = _price_to_rent
+
+        # Update the maximum fluctuation ratio if needed
+        _max_a = np.maximum(population.max_a[rows], _alpha)
+        population.max_a[rows] = _max_a
+
+        # Keep adding the maximum fluctuation ratio to the numerator
+        _n = 1 + (_price_to_rent - np.mod(_price_to_rent, _max_a))
+        _numerator = np.where(_n <= _price_to_rent, _n, _n - _max_a)
+        population.y[rows] = np.clip(_numerator / _price_to_rent, 0, 1)
+
+    # Buy when
+    return (population.total_FIAT_spent_rent[rows] + rent_costs) >= population.y[rows] * buy_costs
+
+
+def a_trend(population, rows, rent_costs, buy_costs, step, OG):
+    """Decision kernel of the A-TREND algorithm. See `deterministic` for the arguments.
+    """
+
+    if not OG:
+        _slots = population.trend_slot[rows]
+
+        # Determine the fluctuation ratio based on this and the previous day
+        _price_to_rent = buy_costs / rent_costs
+        _previous_price_to_rent = population.last_price_to_rent[rows]
+        _alpha = np.maximum(_price_to_rent, _previous_price_to_rent) / \
+            np.minimum(_price_to_rent, _previous_price_to_rent)
+        population.buy_to_rent[rows] = _price_to_rent
+        population.last_price_to_rent[rows] = _price_to_rent
+
+        # Shift the new ratios into the windows (the most recent value is stored last)
+        _price_to_rents = population.price_to_rent_window[_slots]
+        _price_to_rents[:, :-1] = _price_to_rents[:, 1:]
+        _price_to_rents[:, -1] = _price_to_rent
+        population.price_to_rent_window[_slots] = _price_to_rents
+        population.num_price_to_rents[rows] += 1
+
+        _alphas = population.alpha_window[_slots]
+        _alphas[:, :-1] = _alphas[:, 1:]
+        _alphas[:, -1] = _alpha
+        population.alpha_window[_slots] = _alphas
+        population.num_alphas[rows] += 1
+
+        # Update b with the slope of a linear regression over the last price-to-rent ratios
+        _slopes = (_price_to_rents @ TREND_X) / TREND_SXX
+        population.b[rows] = np.where(
+            population.num_price_to_rents[rows] > TREND_WINDOW, 1 + SLOPE_STRENGTH * np.abs(_slopes), 1)
+
+        # Calculate the weighted mean fluctuation ratio over the last alphas
+        _weights = ALPHA_WEIGHTS * \
+            (np.arange(ALPHA_WINDOW) >= (ALPHA_WINDOW - population.num_alphas[rows, None]))
+        _mean_alpha = np.sum(_weights * _alphas, axis=1) / np.sum(_weights, axis=1)
+        population.weighted_a[rows] = _mean_alpha
+
+        # Keep adding the trend-adjusted mean fluctuation ratio to the numerator
+        _numerator = 1 + (_price_to_rent - np.mod(_price_to_rent, population.b[rows] * _mean_alpha))
+        population.y[rows] = np.clip(_numerator / _price_to_rent, 0, 1)
+
+    # Buy when
+    return (population.total_FIAT_spent_rent[rows] + rent_costs) >= population.y[rows] * buy_costs
+
+
+def random_day(population, rows, rent_costs, buy_costs, step, OG):
+    """Decision kernel of the users that buy on a randomly chosen day. See `deterministic` for the arguments.
+    """
+
+    return population.day_of_buying[rows] == step
+
+
+def keep_renting(population, rows, rent_costs, buy_costs, step, OG):
+    """Decision kernel of the users that never buy. See `deterministic` for the arguments.
+    """
+
+    return np.zeros(len(rows), dtype=bool)
+
+
+def instant_buy(population, rows, rent_costs, buy_costs, step, OG):
+    """Decision kernel of the users that buy right away. See `deterministic` for the arguments.
+    """
+
+    return np.ones(len(rows), dtype=bool)
+
+
+DECISION_KERNELS = {
+    "DET": deterministic,
+    "RAND": randomized,
+    "A-ADAPTED": a_adapted,
+    "A-TREND": a_trend,
+    "RANDOM": random_day,
+    "KEEP-RENTING": keep_renting,
+    "INSTANT-BUY": instant_buy,
+}
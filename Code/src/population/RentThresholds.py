@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def ski_rental_inverse_cdf(u):
+    """Inverse CDF of the pdf e^x / (e - 1) on [0, 1], the optimal threshold distribution of the randomized ski-rental
+    algorithm.
+
+    Args:
+        u (ndarray): Uniform draws on [0, 1).
+
+    Returns:
+        ndarray: The normalized rent thresholds.
+    """
+
+    return np.log1p(u * (np.e - 1))
+
+
+# Inverse CDF of every distribution of the normalized rent threshold
+THRESHOLD_DISTRIBUTIONS = {
+    "SKI-RENTAL": ski_rental_inverse_cdf,
+}
+
+
+def sample_rent_thresholds(rng, size, distribution="SKI-RENTAL"):
+    """Draws the normalized rent thresholds of several randomized users at once.
+
+    Other threshold distributions are added to `THRESHOLD_DISTRIBUTIONS` as a vectorized inverse CDF.
+
+    Args:
+        rng (Generator or Random): Random number generator of the model, either NumPy's or Python's.
+        size (int): Number of users.
+        distribution (String): Name of the threshold distribution.
+
+    Returns:
+        ndarray: The normalized rent threshold of every user.
+    """
+
+    if isinstance(rng, np.random.Generator):
+        _uniforms = rng.random(size)
+    else:
+        _uniforms = np.array([rng.random() for _ in range(size)])
+    return THRESHOLD_DISTRIBUTIONS[distribution](_uniforms)
@@ -0,0 +1,58 @@
+from Model.Code.src.population.UserPopulation import RENTING
+
+
+class UserCounts:
+    """Live number of users per strategy, state and activity.
+
+    The counts are updated on every change of the state or the activity of a user, so that population statistics such as
+    the adoption ratio take constant time per step instead of a scan over all users. There are at most a few keys per
+    strategy, whatever the size of the population.
+    """
+
+    def __init__(self):
+        """Initializes the counts without any users."""
+
+        # Number of users per (strategy, state, active)
+        self.counts = {}
+
+    def add(self, strategy, state=RENTING, active=True):
+        """Counts a new user.
+
+        Args:
+            strategy (String): Strategy of the user.
+            state (int): RENTING or BOUGHT.
+            active (bool): Whether the user is active.
+        """
+
+        _key = (strategy, state, active)
+        self.counts[_key] = self.counts.get(_key, 0) + 1
+
+    def move(self, strategy, state, active, new_state, new_active):
+        """Moves a user from one state and activity to another.
+
+        Args:
+            strategy (String): Strategy of the user.
+            state (int): State of the user before the change.
+            active (bool): Activity of the user before the change.
+            new_state (int): State of the user after the change.
+            new_active (bool): Activity of the user after the change.
+        """
+
+        self.counts[(strategy, state, active)] -= 1
+        self.add(strategy, new_state, new_active)
+
+    def count(self, state=None, active=None, strategy=None):
+        """Counts the users with the given state, activity and strategy, see `UserPopulation.count`.
+
+        Args:
+            state (int): RENTING or BOUGHT. All states when None.
+            active (bool): Whether to count active or inactive users. Both when None.
+            strategy (String): Strategy of the users. All strategies when None.
+
+        Returns:
+            int: Number of users.
+        """
+
+        return sum(count for (_strategy, _state, _active), count in self.counts.items()
+                   if (state is None or _state == state) and (active is None or _active == active)
+                   and (strategy is None or _strategy == strategy))
@@ -0,0 +1,365 @@
+from Model.Code.src.population.DecisionKernels import DECISION_KERNELS, ALPHA_WINDOW, TREND_WINDOW
+from Model.Code.src.population.RentThresholds import sample_rent_thresholds
+import numpy as np
+import pandas as pd
+
+
+RENTING = 0
+BOUGHT = 1
+STATE_NAMES = np.array(["RENTING", "BOUGHT"])
+
+
+def _at(value, rows):
+    """Selects the value of an economy attribute for the given users.
+
+    The economy either holds one value that is shared by all users, or one value per user (when every user acts in an
+    economy of their own).
+    """
+    return value[rows] if np.ndim(value) else value
+
+
+class UserPopulation:
+    """Population of users that is stored as a struct of arrays, with one array (column) per user attribute.
+
+    All users of a strategy are stepped at once by the vectorized decision kernel of that strategy. The columns carry the same
+    names as the attributes of the `User` agent. A row either holds a single user or a cohort of identical users, in which
+    case the `weight` column holds the number of users in the cohort and the returned order flow is per user.
+    """
+
+    def __init__(self, strategies, user_sizes, simulation_length, generation_rate, economy, rng, OG=False, weights=None,
+                 max_days=None, day_of_buying=None, rent_until_spent_norm=None):
+        """Initializes the population. The random attributes are drawn per row, unless they are given.
+
+        Args:
+            strategies (List): Strategy of every user.
+            user_sizes (float or ndarray): Amount of VTHO that every user uses each day.
+            simulation_length (int): Number of days in the simulation.
+            generation_rate (float): Amount of VTHO that one VET generates each day.
+            economy (EconomicModel): Economy in which the users act.
+            rng (Generator): NumPy random number generator of the model.
+            OG (bool): Whether the users act in the OG setting.
+            weights (ndarray): Number of users in every row, a single user per row when None.
+            max_days (ndarray): Max. number of days of every row.
+            day_of_buying (ndarray): Day of buying of every row, only used for the RANDOM users.
+            rent_until_spent_norm (ndarray): Normalized rent threshold of every row, only used for the RAND users.
+        """
+
+        self.num_users = len(strategies)
+        self.generation_rate = generation_rate
+        self.rng = rng
+        self.OG = OG
+        n = self.num_users
+
+        # Group the users by strategy
+        self.strategy = np.asarray(strategies, dtype=object)
+        self.rows = {strategy: np.flatnonzero(self.strategy == strategy)
+                     for strategy in DECISION_KERNELS if np.any(self.strategy == strategy)}
+
+        self.weight = np.ones(n, dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+        self.active = np.ones(n, dtype=bool)
+        self.state = np.full(n, RENTING, dtype=np.int8)
+
+        self.rent_until_spent = np.zeros(n)
+        self.bought_at_day = np.zeros(n, dtype=np.int64)
+        self.CR = np.zeros(n)
+
+        self.VET = np.zeros(n)
+        self.VTHO = np.zeros(n)
+        self.total_VTHO_bought = np.zeros(n)
+        self.total_VET_bought = np.zeros(n)
+
+        self.total_FIAT_spent_rent = np.zeros(n)
+        self.total_FIAT_spent_buying = np.zeros(n)
+
+        # Play the adversary for all users at once
+        if max_days is None:
+            self.max_days = rng.integers(1, simulation_length + 1, size=n)
+        else:
+            self.max_days = np.asarray(max_days, dtype=np.int64)
+        self.optimal = np.zeros(n)
+        self.weighted_a = np.ones(n)
+        self.max_a = np.ones(n)
+        self.y = np.zeros(n)
+        self.b = np.zeros(n)
+        self.buy_to_rent = np.zeros(n)
+
+        self.VTHO_LOB_ID = np.full(n, -1, dtype=np.int64)
+        self.VET_LOB_ID = np.full(n, -1, dtype=np.int64)
+
+        # Determine the VET needed to generate required daily VTHO
+        self.user_size = np.broadcast_to(np.asarray(user_sizes, dtype=float), (n,)).copy()
+        self.VET_needed = self.user_size / self.generation_rate
+
+        # Metrics for eventual CR calculation
+        self.is_first_step = np.ones(n, dtype=bool)
+        self.initial_buy_price = np.zeros(n)
+        self.potential_FIAT_spent_rent = np.zeros(n)
+
+        # Strategy specific columns
+        self.rent_until_spent_norm = np.zeros(n)
+        self.day_of_buying = np.full(n, -1, dtype=np.int64)
+        self.last_price_to_rent = np.zeros(n)
+        self.num_price_to_rents = np.zeros(n, dtype=np.int64)
+        self.num_alphas = np.zeros(n, dtype=np.int64)
+        self.trend_slot = np.full(n, -1, dtype=np.int64)
+        self.initialize_strategies(economy, simulation_length, day_of_buying, rent_until_spent_norm)
+
+    def initialize_strategies(self, economy, simulation_length, day_of_buying=None, rent_until_spent_norm=None):
+        """Initializes the columns that are specific to the strategies in the population.
+
+        Args:
+            economy (EconomicModel): Economy in which the users act.
+            simulation_length (int): Number of days in the simulation.
+            day_of_buying (ndarray): Given day of buying of every row, drawn when None.
+            rent_until_spent_norm (ndarray): Given normalized rent threshold of every row, drawn when None.
+        """
+
+        if "RAND" in self.rows:
+            # Draw the normalized rent threshold from the pdf e^x / (e - 1) on [0, 1] through its inverse CDF
+            _rows = self.rows["RAND"]
+            if rent_until_spent_norm is None:
+                self.rent_until_spent_norm[_rows] = sample_rent_thresholds(self.rng, len(_rows))
+            else:
+                self.rent_until_spent_norm[_rows] = rent_until_spent_norm[_rows]
+
+        if "RANDOM" in self.rows:
+            # Determine when to buy by selecting a random day in the range [0,simulation_length]
+            _rows = self.rows["RANDOM"]
+            if day_of_buying is None:
+                self.day_of_buying[_rows] = self.rng.integers(
+                    0, simulation_length + 1, size=len(_rows))
+            else:
+                self.day_of_buying[_rows] = day_of_buying[_rows]
+
+        for strategy in ("A-ADAPTED", "A-TREND"):
+            if strategy in self.rows:
+                _rows = self.rows[strategy]
+                self.y[_rows] = 1
+
+                # Initialize the price-to-rent ratio from random initial LOB's
+                _rent_costs = self.estimate_rent_costs(
+                    economy, _rows, self.rng.integers(0, 100, size=len(_rows)))
+                _buy_costs = self.estimate_buy_costs(
+                    economy, _rows, self.rng.integers(0, 100, size=len(_rows)))
+                self.last_price_to_rent[_rows] = _buy_costs / _rent_costs
+
+        if "A-TREND" in self.rows:
+            # Only A-TREND users keep windows of their past price-to-rent and fluctuation ratios
+            _rows = self.rows["A-TREND"]
+            self.b[_rows] = 1
+            self.trend_slot[_rows] = np.arange(len(_rows))
+            self.price_to_rent_window = np.zeros((len(_rows), TREND_WINDOW))
+            self.price_to_rent_window[:, -1] = self.last_price_to_rent[_rows]
+            self.num_price_to_rents[_rows] = 1
+            self.alpha_window = np.zeros((len(_rows), ALPHA_WINDOW))
+            self.alpha_window[:, -1] = 1
+            self.num_alphas[_rows] = 1
+
+    def step(self, step, economy, usage_trend_step_size=0):
+        """Advances all active users by one day.
+
+        All users trade against the state of the economy at the start of the day. The returned order flow needs to be
+        applied to the economy by the model. The LOB snapshots that the users traded on are stored in the `VET_LOB_ID` and
+        `VTHO_LOB_ID` columns.
+
+        Args:
+            step (int): Current step of the model.
+            economy (EconomicModel): Economy in which the users act.
+            usage_trend_step_size (float): Change of the user size per day due to the usage trend.
+
+        Returns:
+            tuple: Arrays with the VET bought, VTHO bought and VTHO used by every user (of every cohort) on this day.
+        """
+
+        _active = self.active.copy()
+        _renting = _active & (self.state == RENTING)
+        _VET_bought = np.zeros(self.num_users)
+        _VTHO_bought = np.zeros(self.num_users)
+
+        # Users that have already bought only log their would-be rent cost
+        _bought_rows = np.flatnonzero(_active & (self.state == BOUGHT))
+        if len(_bought_rows) > 0:
+            if self.OG:
+                _rent_costs = _at(economy.VTHO_price, _bought_rows) * self.user_size[_bought_rows]
+            else:
+                _rent_costs = self.estimate_rent_costs(
+                    economy, _bought_rows, self.rng.integers(0, 100, size=len(_bought_rows)))
+            self.potential_FIAT_spent_rent[_bought_rows] += _rent_costs
+
+        for strategy, _strategy_rows in self.rows.items():
+            _rows = _strategy_rows[_renting[_strategy_rows]]
+            if len(_rows) == 0:
+                continue
+
+            # Estimate the cost of renting and buying today
+            if self.OG:
+                _rent_costs = _at(economy.VTHO_price, _rows) * self.user_size[_rows]
+                _buy_costs = _at(economy.VET_price, _rows) * self.VET_needed[_rows]
+            else:
+                _VET_LOB_IDS = self.rng.integers(0, 100, size=len(_rows))
+                _VTHO_LOB_IDS = self.rng.integers(0, 100, size=len(_rows))
+                self.VET_LOB_ID[_rows] = _VET_LOB_IDS
+                self.VTHO_LOB_ID[_rows] = _VTHO_LOB_IDS
+                _rent_costs = self.estimate_rent_costs(economy, _rows, _VTHO_LOB_IDS)
+                _buy_costs = self.estimate_buy_costs(economy, _rows, _VET_LOB_IDS)
+
+            # Determine the initial buy price (used for calculating the optimal performance and CR)
+            _first = self.is_first_step[_rows]
+            self.initial_buy_price[_rows[_first]] = _buy_costs[_first]
+            self.is_first_step[_rows] = False
+
+            # Check which users buy at this point in time
+            _buys = DECISION_KERNELS[strategy](self, _rows, _rent_costs, _buy_costs, step, self.OG)
+
+            # Buy the required VET
+            _buyers = _rows[_buys]
+            self.potential_FIAT_spent_rent[_buyers] += _rent_costs[_buys]
+            self.state[_buyers] = BOUGHT
+            self.VET[_buyers] += self.VET_needed[_buyers]
+            self.total_VET_bought[_buyers] += self.VET_needed[_buyers]
+            self.total_FIAT_spent_buying[_buyers] += _buy_costs[_buys]
+            self.bought_at_day[_buyers] = step
+            _VET_bought[_buyers] = self.VET_needed[_buyers]
+
+            # Buy the required VTHO
+            _renters = _rows[~_buys]
+            if self.OG:
+                _price_paid = _rent_costs[~_buys]
+            else:
+                _price_paid = self.VTHO_order_costs(economy, _renters, _VTHO_LOB_IDS[~_buys])
+            self.total_VTHO_bought[_renters] += self.user_size[_renters]
+            self.total_FIAT_spent_rent[_renters] += _price_paid
+            self.potential_FIAT_spent_rent[_renters] += _price_paid
+            _VTHO_bought[_renters] = self.user_size[_renters]
+
+        _VTHO_used = np.where(_active, self.user_size, 0)
+
+        # Handle the usage trend
+        if usage_trend_step_size != 0:
+            self.user_size[_active] += usage_trend_step_size
+            self.VET_needed[_active] = self.user_size[_active] / self.generation_rate
+
+        # Deactivate the users that have reached their max. number of active days
+        self.handle_max_days_reached(step)
+
+        return _VET_bought, _VTHO_bought, _VTHO_used
+
+    def handle_max_days_reached(self, step):
+        """Sets the CR of the users that have reached their maximum number of days and sets them to inactive.
+
+        Args:
+            step (int): Current step of the model.
+        """
+
+        _rows = np.flatnonzero(self.active & (step >= self.max_days))
+        if len(_rows) > 0:
+            self.optimal[_rows] = np.minimum(
+                self.initial_buy_price[_rows], self.potential_FIAT_spent_rent[_rows])
+            self.CR[_rows] = (self.total_FIAT_spent_rent[_rows] +
+                              self.total_FIAT_spent_buying[_rows]) / self.optimal[_rows]
+            self.active[_rows] = False
+
+    def estimate_rent_costs(self, economy, rows, LOB_IDS):
+        """Estimates the cost of renting for the given users, see `User.estimate_rent_cost`.
+
+        Args:
+            economy (EconomicModel): Economy in which the users act.
+            rows (ndarray): Rows of the users.
+            LOB_IDS (ndarray): Index of the VTHO LOB snapshot of every user.
+
+        Returns:
+            ndarray: The estimated cost in FIAT of renting on this day.
+        """
+
+        _VTHO_price = _at(economy.VTHO_price, rows)
+        _tick_change, _filled, _filled_ticks, _amount_from_last_order = economy.VTHO_quotes.fill_many(
+            LOB_IDS, self.user_size[rows], _at(economy.liquidity_VTHO, rows))
+        return (_VTHO_price * _filled) + (economy.VTHO_LOB_tick_size * _filled_ticks) + \
+            _amount_from_last_order * (_VTHO_price + (_tick_change * economy.VTHO_LOB_tick_size))
+
+    def estimate_buy_costs(self, economy, rows, LOB_IDS):
+        """Estimates the cost of buying for the given users, see `User.estimate_buy_cost`.
+
+        Args:
+            economy (EconomicModel): Economy in which the users act.
+            rows (ndarray): Rows of the users.
+            LOB_IDS (ndarray): Index of the VET LOB snapshot of every user.
+
+        Returns:
+            ndarray: The estimated cost in FIAT of buying today.
+        """
+
+        _VET_price = _at(economy.VET_price, rows)
+        _tick_change, _filled, _filled_ticks, _amount_from_last_order = economy.VET_quotes.fill_many(
+            LOB_IDS, self.VET_needed[rows], _at(economy.liquidity_VET, rows))
+        return (_VET_price * _filled) + (economy.VET_LOB_tick_size * _filled_ticks) + \
+            _amount_from_last_order * (_VET_price + (_tick_change * economy.VET_LOB_tick_size))
+
+    def VTHO_order_costs(self, economy, rows, LOB_IDS):
+        """Calculates the FIAT price that the given users pay for their VTHO, see `EconomicModel.VTHO_order`.
+
+        Args:
+            economy (EconomicModel): Economy in which the users act.
+            rows (ndarray): Rows of the users.
+            LOB_IDS (ndarray): Index of the VTHO LOB snapshot of every user.
+
+        Returns:
+            ndarray: The FIAT price that is paid.
+        """
+
+        _VTHO_price = _at(economy.VTHO_price, rows)
+        _tick_change, _filled, _filled_ticks, _amount_from_last_order = economy.VTHO_quotes.fill_many(
+            LOB_IDS, self.user_size[rows], _at(economy.liquidity_VTHO, rows))
+        return _VTHO_price * (_filled + (economy.VTHO_LOB_tick_size * _filled_ticks)) + \
+            _amount_from_last_order * (_VTHO_price * (1 + (_tick_change * economy.VTHO_LOB_tick_size)))
+
+    def count(self, state=None, active=None):
+        """Counts the users with the given state and activity, including all users of every cohort.
+
+        Args:
+            state (int): RENTING or BOUGHT. All states when None.
+            active (bool): Whether to count active or inactive users. Both when None.
+
+        Returns:
+            int: Number of users.
+        """
+
+        _mask = np.ones(self.num_users, dtype=bool)
+        if state is not None:
+            _mask &= self.state == state
+        if active is not None:
+            _mask &= self.active == active
+        return int(np.sum(self.weight[_mask]))
+
+    def to_dataframe(self):
+        """Exports the population to a DataFrame with one row per user or cohort.
+
+        Returns:
+            DataFrame: The columns of the agent reporters of the `NetworkModel`, plus the strategy and weight of every row.
+        """
+
+        return pd.DataFrame({
+            "AgentID": np.arange(1, self.num_users + 1),
+            "strategy": pd.Categorical(self.strategy),
+            "weight": self.weight,
+            "active": self.active,
+            "state": pd.Categorical.from_codes(self.state, STATE_NAMES),
+            "bought_at_day": self.bought_at_day,
+            "max_days": self.max_days,
+            "VET": self.VET,
+            "VTHO": self.VTHO,
+            "user_size": self.user_size,
+            "VET_needed": self.VET_needed,
+            "rent_until_spent": self.rent_until_spent,
+            "potential_FIAT_spent_rent": self.potential_FIAT_spent_rent,
+            "VTHO_LOB_ID": self.VTHO_LOB_ID,
+            "total_FIAT_spent_rent": self.total_FIAT_spent_rent,
+            "VET_LOB_ID": self.VET_LOB_ID,
+            "total_FIAT_spent_buying": self.total_FIAT_spent_buying,
+            "initial_buy_price": self.initial_buy_price,
+            "b": self.b,
+            "max_a": self.max_a,
+            "y": self.y,
+            "CR": self.CR,
+            "optimal": self.optimal,
+        }).set_index("AgentID")
@@ -0,0 +1,206 @@
+import itertools
+import math
+from multiprocessing import Pool
+from statistics import NormalDist
+from Model.Code.src.runners.BatchedRunner import make_model_kwargs
+from Model.Code.src.runners.PoolRunner import compute_runs
+from Model.Code.src.runners.ResultCache import ResultCache
+import numpy as np
+import pandas as pd
+from scipy.stats import binom
+from tqdm.auto import tqdm
+
+
+# Default quantile by which the max. CR is tracked. The sample maximum has no valid confidence interval (no resample can
+# exceed it), whereas the order statistics of the runs give a distribution-free interval of a high quantile. The upper
+# bound of the interval of the 0.99 quantile only exists from 368 runs onwards (at a confidence of 0.95), which is
+# therefore the least number of runs of every configuration that tracks the max. CR.
+MAX_CR_QUANTILE = 0.99
+
+# Tracked statistics: the reported variable of a run and the statistic over the runs of a configuration, which is either
+# the mean or a quantile
+STATISTICS = {
+    "mean_CR": ("main_user_CR", np.mean),
+    "max_CR": ("main_user_CR", MAX_CR_QUANTILE),
+    "adoption_ratio": ("adoption_ratio", np.mean),
+}
+
+# Target width of the confidence interval of every statistic, relative to the estimate
+TARGET_WIDTHS = {
+    "mean_CR": 0.02,
+    "max_CR": 0.1,
+    "adoption_ratio": 0.05,
+}
+
+
+def confidence_interval(values, statistic, confidence=0.95):
+    """Determines the confidence interval of a statistic of the runs of a configuration.
+
+    The interval of a mean follows from the normal approximation. The interval of a quantile is bounded by two order
+    statistics of the runs, whose ranks follow from the binomial distribution of the number of runs below the quantile.
+    Until there are enough runs to reach into the tail, the upper bound of a high quantile is infinite, so that the
+    configuration keeps receiving runs.
+
+    Args:
+        values (ndarray): The reported variable of every run.
+        statistic (function or float): Either `np.mean` or the level of a quantile.
+        confidence (float): Confidence level of the interval.
+
+    Returns:
+        Tuple: The estimate and the lower and upper bound of the interval.
+    """
+
+    if statistic is np.mean:
+        _estimate = float(np.mean(values))
+        if len(values) < 2:
+            return _estimate, -math.inf, math.inf
+        _half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * np.std(values, ddof=1) / math.sqrt(len(values))
+        return _estimate, _estimate - _half_width, _estimate + _half_width
+
+    _estimate = float(np.quantile(values, statistic))
+    _sorted = np.sort(values)
+    _lower_rank = int(binom.ppf(0.5 - confidence / 2, len(values), statistic))
+    _upper_rank = int(binom.ppf(0.5 + confidence / 2, len(values), statistic)) + 1
+    _lower = float(_sorted[_lower_rank - 1]) if _lower_rank >= 1 else -math.inf
+    _upper = float(_sorted[_upper_rank - 1]) if _upper_rank <= len(values) else math.inf
+    return _estimate, _lower, _upper
+
+
+def precision_table(run_values, target_widths=TARGET_WIDTHS, relative=True, confidence=0.95, statistics=STATISTICS):
+    """Determines the achieved precision of the tracked statistics of every configuration.
+
+    Args:
+        run_values (DataFrame): The reported variables of every run, with the index of its configuration.
+        target_widths (dict): Target width of the confidence interval of every tracked statistic.
+        relative (bool): Whether the widths are relative to the estimate, or absolute.
+        confidence (float): Confidence level of the intervals.
+        statistics (dict): The reported variable and the statistic of every tracked statistic, see `STATISTICS`.
+
+    Returns:
+        DataFrame: The number of runs and, per statistic, the estimate, the bounds and width of its interval and whether
+            the target width is reached, with one row per configuration.
+    """
+
+    _rows = []
+    for configuration, _values in run_values.groupby("configuration"):
+        _row = {"configuration": configuration, "iterations": len(_values)}
+        _converged = True
+        for name, target in target_widths.items():
+            _variable, _statistic = statistics[name]
+            _estimate, _lower, _upper = confidence_interval(
+                _values[_variable].to_numpy(dtype=float), _statistic, confidence)
+            _width = _upper - _lower
+            if relative and _width > 0:
+                _width = _width / abs(_estimate) if _estimate != 0 else math.inf
+            _row.update({name: _estimate, f"{name}_lower": _lower, f"{name}_upper": _upper, f"{name}_width": _width,
+                         f"{name}_converged": _width <= target})
+            _converged &= _width <= target
+        _row["converged"] = _converged
+        _rows.append(_row)
+    return pd.DataFrame(_rows).set_index("configuration")
+
+
+def plan_iterations(precision, target_widths, batch_size, max_iterations):
+    """Determines the number of runs of every configuration after the next batch.
+
+    The width of an interval shrinks with the square root of the number of runs, so the runs that a configuration still
+    needs follow from its current width. Every configuration that has not converged gets at most `batch_size` more runs.
+
+    Args:
+        precision (DataFrame): The achieved precision, see `precision_table`.
+        target_widths (dict): Target width of the confidence interval of every tracked statistic.
+        batch_size (int): Max. number of runs that are added to a configuration at once.
+        max_iterations (int): Max. number of runs of a configuration.
+
+    Returns:
+        Series: The planned number of runs of every configuration.
+    """
+
+    _needed = precision["iterations"].astype(float)
+    for name, target in target_widths.items():
+        _ratio = (precision[f"{name}_width"] / target).clip(lower=1).replace(math.inf, np.nan)
+        _needed = np.maximum(_needed, (precision["iterations"] * _ratio ** 2).fillna(math.inf))
+
+    _additional = np.clip(np.ceil(_needed - precision["iterations"]), 0, batch_size)
+    _additional[precision["converged"]] = 0
+    return np.minimum(precision["iterations"] + _additional, max_iterations).astype(int)
+
+
+def adaptive_run(economy_parameters, parameters, target_widths=TARGET_WIDTHS, relative=True, confidence=0.95,
+                 min_iterations=100, batch_size=500, max_iterations=10000, max_steps=1000, seed=0, number_processes=None,
+                 chunk_size=10, display_progress=True, cache_dir=None, cache_max_bytes=None, cache_max_age=None,
+                 max_CR_quantile=MAX_CR_QUANTILE):
+    """Runs every parameter combination until the confidence intervals of the tracked statistics reach their target width.
+
+    All configurations start with `min_iterations` runs. After every round, the configurations whose intervals are still
+    too wide get a batch of runs that is sized by how far they are from their target, until they converge or reach
+    `max_iterations`. The runs get the same ids as in `pool_run` (iteration times the number of configurations plus the
+    index of the configuration), and their random streams are keyed by the seed, the configuration and the iteration
+    (see `stream_key`), so they give the same results as `pool_run` and share a `ResultCache` with every sweep that
+    contains the same configurations.
+
+    Args:
+        economy_parameters (dict): Single or multiple values for each `EconomicModel` parameter name.
+        parameters (dict): Single or multiple values for each `NetworkModel` parameter name, except the economic model.
+        target_widths (dict): Target width of the confidence interval of every tracked statistic, see `STATISTICS`.
+        relative (bool): Whether the widths are relative to the estimate, or absolute.
+        confidence (float): Confidence level of the intervals.
+        min_iterations (int): Number of runs of every configuration in the first round. A configuration that tracks the
+            max. CR needs more runs before the interval of its quantile has an upper bound, e.g. 368 runs for the 0.99
+            quantile and 72 runs for the 0.95 quantile, see `MAX_CR_QUANTILE`.
+        batch_size (int): Max. number of runs that are added to a configuration per round.
+        max_iterations (int): Max. number of runs of a configuration.
+        max_steps (int): Maximum number of model steps after which the model halts.
+        seed (int): Seed of the sweep.
+        number_processes (int): Number of worker processes, all cores are used when None.
+        chunk_size (int): Number of runs that a worker executes at once.
+        display_progress (bool): Whether to display a progress bar per round.
+        cache_dir (String): Directory of a `ResultCache`, no cache is used when None.
+        cache_max_bytes (int): Max. total size of the cache, after the sweep the least recently used runs are removed.
+        cache_max_age (float): Max. number of seconds since a cached run was last used.
+        max_CR_quantile (float): Quantile by which the max. CR is tracked.
+
+    Returns:
+        Tuple: The results, with one row per agent per run as returned by `pool_run`, and the achieved precision of every
+            configuration, with the arguments of the configuration, see `precision_table`.
+    """
+
+    _statistics = {**STATISTICS, "max_CR": ("main_user_CR", max_CR_quantile)}
+    _configurations = list(itertools.product(make_model_kwargs(economy_parameters), make_model_kwargs(parameters)))
+    _num_configurations = len(_configurations)
+    _iterations = pd.Series(0, index=range(_num_configurations))
+    _planned = pd.Series(min(min_iterations, max_iterations), index=range(_num_configurations))
+
+    _results = []
+    _cache = None if cache_dir is None else ResultCache(cache_dir, cache_max_bytes, cache_max_age)
+    _pool = Pool(number_processes) if number_processes != 1 else None
+    try:
+        while (_planned > _iterations).any():
+            _runs = [(iteration * _num_configurations + configuration, iteration, *_configurations[configuration])
+                     for configuration in range(_num_configurations)
+                     for iteration in range(_iterations[configuration], _planned[configuration])]
+            with tqdm(total=len(_runs), disable=not display_progress) as pbar:
+                for run_ids, chunk_results in compute_runs(_runs, max_steps, seed, _pool, chunk_size, cache=_cache):
+                    _results.append(chunk_results)
+                    pbar.update(len(run_ids))
+            _iterations = _planned
+
+            # Determine the precision that has been reached and plan the next round
+            _run_values = pd.concat(_results, ignore_index=True).drop_duplicates("RunId")
+            _run_values["configuration"] = _run_values["RunId"] % _num_configurations
+            _precision = precision_table(_run_values, target_widths, relative, confidence, _statistics)
+            _planned = plan_iterations(_precision, target_widths, batch_size, max_iterations)
+    finally:
+        if _pool is not None:
+            _pool.close()
+            _pool.join()
+        if _cache is not None:
+            _cache.prune()
+
+    # Report the arguments of every configuration next to its precision
+    _arguments = pd.DataFrame([{**economy_kwargs, **model_kwargs} for economy_kwargs, model_kwargs in _configurations])
+    _precision = _arguments.join(_precision)
+    _precision.index.name = "configuration"
+
+    _results = pd.concat(_results, ignore_index=True).sort_values(["RunId", "AgentID"], ignore_index=True)
+    return _results, _precision
@@ -0,0 +1,60 @@
+import itertools
+from Model.Code.src.models.BatchedNetworkModel import BatchedNetworkModel
+import pandas as pd
+
+
+def make_model_kwargs(parameters):
+    """Creates the model arguments of all parameter combinations, in the same way as Mesa's `batch_run`.
+
+    Args:
+        parameters (dict): Single or multiple values for each model parameter name.
+
+    Returns:
+        List: A dictionary of model arguments per combination.
+    """
+
+    _parameter_list = []
+    for param, values in parameters.items():
+        if isinstance(values, str):
+            _parameter_list.append([(param, values)])
+            continue
+        try:
+            _parameter_list.append([(param, value) for value in values])
+        except TypeError:
+            _parameter_list.append([(param, values)])
+    return [dict(kwargs) for kwargs in itertools.product(*_parameter_list)]
+
+
+def batched_run(parameters, iterations=1, max_steps=1000, seed=None):
+    """Runs all iterations of every parameter combination of a single-user experiment in lockstep.
+
+    Replaces `batch_run(model_cls=NetworkModel, ..., data_collection_period=-1)` for settings with a single user. The
+    OG-SKI-RENTAL setting is solved analytically.
+
+    Args:
+        parameters (dict): Single or multiple values for each `NetworkModel` parameter name.
+        iterations (int): Number of iterations for each parameter combination.
+        max_steps (int): Maximum number of model steps after which the model halts.
+        seed (int): Seed of the random number generator. Every parameter combination gets its own stream.
+
+    Returns:
+        DataFrame: One row per run with the same columns as the results of `batch_run`.
+    """
+
+    _results = []
+    for i, kwargs in enumerate(make_model_kwargs(parameters)):
+        _seed = None if seed is None else [seed, i]
+        model = BatchedNetworkModel(iterations, seed=_seed, **kwargs)
+        model.run(max_steps)
+
+        # Add the run information and parameters in front of the collected data
+        _run_results = model.get_results()
+        _run_info = pd.DataFrame({
+            "RunId": range(i * iterations, (i + 1) * iterations),
+            "iteration": range(iterations),
+            "Step": model.final_step})
+        for param, value in kwargs.items():
+            _run_info[param] = [value] * iterations
+        _results.append(pd.concat([_run_info, _run_results], axis=1))
+
+    return pd.concat(_results, ignore_index=True)
@@ -0,0 +1,218 @@
+import hashlib
+import itertools
+import json
+import os
+from multiprocessing import Pool
+from Model.Code.src.models.Checkpoint import save_checkpoint, load_checkpoint
+from Model.Code.src.models.EconomicModel import EconomicModel
+from Model.Code.src.models.NetworkModel import NetworkModel
+from Model.Code.src.runners.BatchedRunner import make_model_kwargs
+from Model.Code.src.runners.ResultCache import ResultCache
+from Model.Code.src.runners.ResultSink import ResultSink
+import pandas as pd
+from tqdm.auto import tqdm
+
+
+def stream_key(iteration, economy_kwargs, model_kwargs):
+    """Derives the key of the random streams of a run from its configuration and iteration.
+
+    The key does not depend on the position of the run in the sweep, so a configuration gives the same results in every
+    sweep that contains it, and its cached runs are shared by all these sweeps.
+
+    Args:
+        iteration (int): Iteration of the parameter combination.
+        economy_kwargs (dict): Arguments of the `EconomicModel`.
+        model_kwargs (dict): Arguments of the `NetworkModel`, without the economic model.
+
+    Returns:
+        int: The 64-bit key, which is passed to the model as its run id.
+    """
+
+    _description = json.dumps({"iteration": iteration, "economy": economy_kwargs, "model": model_kwargs},
+                              sort_keys=True, default=repr)
+    return int(hashlib.sha256(_description.encode()).hexdigest()[:16], 16)
+
+
+def run_network_model(run_id, iteration, economy_kwargs, model_kwargs, max_steps, seed, checkpoint_dir=None,
+                      checkpoint_interval=365):
+    """Builds a fresh economy and network model and runs it, in the same way as Mesa's `batch_run`.
+
+    When a checkpoint directory is given, the model is checkpointed every `checkpoint_interval` steps and an interrupted
+    run continues from its last checkpoint. The checkpoint is removed when the run has finished.
+
+    Args:
+        run_id (int): Id of the run.
+        iteration (int): Iteration of the parameter combination.
+        economy_kwargs (dict): Arguments of the `EconomicModel`.
+        model_kwargs (dict): Arguments of the `NetworkModel`, without the economic model.
+        max_steps (int): Maximum number of model steps after which the model halts.
+        seed (int): Seed of the sweep.
+        checkpoint_dir (String): Directory of the checkpoints of unfinished runs, no checkpoints are made when None.
+        checkpoint_interval (int): Number of steps between two checkpoints.
+
+    Returns:
+        List: A dictionary with the data of the last step per agent.
+    """
+
+    _stream_key = stream_key(iteration, economy_kwargs, model_kwargs)
+    _checkpoint = None if checkpoint_dir is None else os.path.join(checkpoint_dir, f"run_{_stream_key:016x}.ckpt.gz")
+
+    # The random streams of the model only depend on the seed, the configuration and the iteration, so a run gives the same
+    # results regardless of the worker or chunk that it is executed in, or of the other configurations of the sweep. Only
+    # the reported step is kept by the data collector, unless another sampling is requested.
+    if _checkpoint is not None and os.path.exists(_checkpoint):
+        model = load_checkpoint(_checkpoint)
+    else:
+        model = NetworkModel(economic_model=EconomicModel(**economy_kwargs), seed=seed, run_id=_stream_key,
+                             **{"data_sampling": "final", **model_kwargs})
+    while model.running and model.schedule.steps <= max_steps:
+        model.step()
+        if _checkpoint is not None and model.schedule.steps % checkpoint_interval == 0:
+            save_checkpoint(model, _checkpoint)
+
+    # Collect the data of the last step
+    _step = model.schedule.steps - 1
+    _collector = model.datacollector
+    _run_data = {"RunId": run_id, "iteration": iteration, "Step": _step, **economy_kwargs, **model_kwargs}
+    _run_data.update({param: values[_step] for param, values in _collector.model_vars.items()})
+
+    _data = [{**_run_data, "AgentID": record[1], **dict(zip(_collector.agent_reporters, record[2:]))}
+             for record in _collector._agent_records.get(_step, [])]
+
+    if _checkpoint is not None and os.path.exists(_checkpoint):
+        os.remove(_checkpoint)
+    return _data
+
+
+def run_chunk(chunk):
+    """Runs a chunk of runs in a worker process.
+
+    Args:
+        chunk (Tuple): The runs of the chunk, the max. number of steps, the seed of the sweep, the checkpoint directory
+            and the checkpoint interval.
+
+    Returns:
+        Tuple: The ids of the runs in the chunk and the data of all these runs, which is empty when no data is collected.
+    """
+
+    _runs, max_steps, seed, checkpoint_dir, checkpoint_interval = chunk
+
+    _data = []
+    for run_id, iteration, economy_kwargs, model_kwargs in _runs:
+        _data.extend(run_network_model(run_id, iteration, economy_kwargs, model_kwargs, max_steps, seed,
+                                       checkpoint_dir, checkpoint_interval))
+
+    return [run[0] for run in _runs], pd.DataFrame(_data)
+
+
+def compute_runs(runs, max_steps, seed, pool=None, chunk_size=10, checkpoint_dir=None, checkpoint_interval=365,
+                 cache=None):
+    """Computes runs in chunks on a pool of worker processes, loading the runs that are in a cache instead.
+
+    Args:
+        runs (List): The id, iteration, economy arguments and model arguments of every run.
+        max_steps (int): Maximum number of model steps after which the model halts.
+        seed (int): Seed of the sweep.
+        pool (Pool): Pool of worker processes, the runs are computed in this process when None.
+        chunk_size (int): Number of runs that a worker executes at once.
+        checkpoint_dir (String): Directory in which unfinished runs are checkpointed, see `run_network_model`.
+        checkpoint_interval (int): Number of steps between two checkpoints of a run.
+        cache (ResultCache): Cache from which runs are loaded and to which computed runs are added.
+
+    Yields:
+        Tuple: The ids of the runs and their results, first for all cached runs at once and then for every computed chunk.
+            The results can be empty, e.g. when no data is collected.
+    """
+
+    # Load the runs that are in the cache, only the missing runs are computed. A cached run may stem from another sweep,
+    # so it gets the id of the run in this sweep.
+    if cache is not None:
+        _keys = {run[0]: cache.key(max_steps, seed, *run[1:]) for run in runs}
+        _cached = {run[0]: cache.get(_keys[run[0]]) for run in runs}
+        _cached = {run_id: results.assign(RunId=run_id) for run_id, results in _cached.items() if results is not None}
+        if _cached:
+            runs = [run for run in runs if run[0] not in _cached]
+            yield list(_cached), pd.concat(_cached.values(), ignore_index=True)
+
+    _chunks = [(runs[i:i + chunk_size], max_steps, seed, checkpoint_dir, checkpoint_interval)
+               for i in range(0, len(runs), chunk_size)]
+    for run_ids, chunk_results in map(run_chunk, _chunks) if pool is None else pool.imap_unordered(run_chunk, _chunks):
+        if cache is not None and not chunk_results.empty:
+            for run_id, run_results in chunk_results.groupby("RunId"):
+                cache.put(_keys[run_id], run_results.reset_index(drop=True))
+        yield run_ids, chunk_results
+
+
+def pool_run(economy_parameters, parameters, iterations=1, max_steps=1000, seed=0, number_processes=None,
+             chunk_size=10, output_dir=None, display_progress=True, checkpoint_dir=None, checkpoint_interval=365,
+             cache_dir=None, cache_max_bytes=None, cache_max_age=None):
+    """Runs all iterations of every parameter combination of the `NetworkModel` on a pool of worker processes.
+
+    Replaces `batch_run(model_cls=NetworkModel, ..., data_collection_period=-1)`. Every run builds its own
+    `EconomicModel` inside the worker, so no state is shared between runs. The economy is passed as its arguments instead
+    of as an object.
+
+    Args:
+        economy_parameters (dict): Single or multiple values for each `EconomicModel` parameter name.
+        parameters (dict): Single or multiple values for each `NetworkModel` parameter name, except the economic model.
+        iterations (int): Number of iterations for each parameter combination.
+        max_steps (int): Maximum number of model steps after which the model halts.
+        seed (int): Seed of the sweep. Every run gets its own random streams, keyed by the seed, the configuration and
+            the iteration (see `stream_key`).
+        number_processes (int): Number of worker processes, all cores are used when None.
+        chunk_size (int): Number of runs that a worker executes at once.
+        output_dir (String): Directory to which every finished chunk is streamed by a `ResultSink`. Runs that are already
+            stored in it are skipped, so that a partly finished sweep can be resumed. The results are kept in memory and
+            returned instead when None.
+        display_progress (bool): Whether to display a progress bar.
+        checkpoint_dir (String): Directory in which unfinished runs are checkpointed, so that a run that is interrupted
+            continues from its last checkpoint. No checkpoints are made when None.
+        checkpoint_interval (int): Number of steps between two checkpoints of a run.
+        cache_dir (String): Directory of a `ResultCache`. Runs that are in the cache are loaded instead of computed, and
+            every computed run is added to it. No cache is used when None.
+        cache_max_bytes (int): Max. total size of the cache, after the sweep the least recently used runs are removed.
+        cache_max_age (float): Max. number of seconds since a cached run was last used.
+
+    Returns:
+        DataFrame: One row per agent per run with the same columns as the results of `batch_run`, or None when the results
+            are streamed to the output directory.
+    """
+
+    # Determine all runs, in the same order as Mesa's batch runner
+    _runs = [(run_id, iteration, economy_kwargs, model_kwargs) for run_id, (iteration, (economy_kwargs, model_kwargs))
+             in enumerate(itertools.product(range(iterations), itertools.product(
+                 make_model_kwargs(economy_parameters), make_model_kwargs(parameters))))]
+
+    # Skip the runs that have already been stored
+    _results = []
+    _sink = None
+    if output_dir is not None:
+        _sink = ResultSink(output_dir)
+        _done = _sink.finished_run_ids()
+        _runs = [run for run in _runs if run[0] not in _done]
+
+    _cache = None if cache_dir is None else ResultCache(cache_dir, cache_max_bytes, cache_max_age)
+    _pool = Pool(number_processes) if number_processes != 1 else None
+    try:
+        with tqdm(total=len(_runs), disable=not display_progress) as pbar:
+            for run_ids, chunk_results in compute_runs(_runs, max_steps, seed, _pool, chunk_size, checkpoint_dir,
+                                                       checkpoint_interval, _cache):
+                # Stream the chunk to disk, or keep it in memory when there is no output directory
+                if _sink is None:
+                    if not chunk_results.empty:
+                        _results.append(chunk_results)
+                else:
+                    _sink.write(chunk_results)
+                pbar.update(len(run_ids))
+    finally:
+        if _pool is not None:
+            _pool.close()
+            _pool.join()
+        if _cache is not None:
+            _cache.prune()
+
+    if _sink is not None:
+        return None
+    if not _results:
+        return pd.DataFrame()
+    return pd.concat(_results, ignore_index=True).sort_values(["RunId", "AgentID"], ignore_index=True)
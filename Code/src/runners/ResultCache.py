@@ -0,0 +1,146 @@
+from functools import lru_cache
+import hashlib
+import json
+import os
+import pickle
+import time
+from Model.Code.src.market.MarketData import SRC_DIR
+
+
+# Files of the source tree whose contents determine the results of a run
+VERSIONED_EXTENSIONS = (".py", ".csv", ".pkl")
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """Hashes the code and the market data of the model once per process.
+
+    Returns:
+        String: The SHA-256 hash of all source and data files, which changes with every change to the model.
+    """
+
+    _paths = []
+    for directory, directories, files in os.walk(SRC_DIR):
+        directories[:] = [name for name in directories if name not in ("__pycache__", "cache")]
+        _paths.extend(os.path.relpath(os.path.join(directory, name), SRC_DIR)
+                      for name in files if name.endswith(VERSIONED_EXTENSIONS))
+
+    _hash = hashlib.sha256()
+    for path in sorted(_paths):
+        _hash.update(path.encode())
+        with open(os.path.join(SRC_DIR, path), "rb") as file:
+            _hash.update(file.read())
+    return _hash.hexdigest()
+
+
+class ResultCache:
+    """Content-addressed cache of the results of single runs, shared by all sweeps.
+
+    A run is stored under the hash of everything that determines its results: the arguments of the economy and the network
+    model, the max. number of steps, the seed of the sweep, the iteration of the run (which keys its random streams together
+    with the seed and the arguments) and the version of the code. The position of the run in its sweep is not part of the
+    key, so a sweep that repeats a configuration, also within another grid, or that adds iterations to it, only computes
+    the runs that are missing. The cache is kept within its size and age limits by `prune`, which removes the least recently used
+    runs first.
+    """
+
+    def __init__(self, cache_dir, max_bytes=None, max_age=None):
+        """Initializes the cache.
+
+        Args:
+            cache_dir (String): Directory of the cache.
+            max_bytes (int): Max. total size of the cached runs, unlimited when None.
+            max_age (float): Max. number of seconds since a cached run was last used, unlimited when None.
+        """
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, max_steps, seed, iteration, economy_kwargs, model_kwargs):
+        """Determines the key of a run.
+
+        Args:
+            max_steps (int): Maximum number of model steps after which the model halts.
+            seed (int): Seed of the sweep.
+            iteration (int): Iteration of the parameter combination.
+            economy_kwargs (dict): Arguments of the `EconomicModel`.
+            model_kwargs (dict): Arguments of the `NetworkModel`, without the economic model.
+
+        Returns:
+            String: The hexadecimal key.
+        """
+
+        _description = json.dumps({
+            "code_version": code_version(), "max_steps": max_steps, "seed": seed, "iteration": iteration,
+            "economy": economy_kwargs, "model": model_kwargs}, sort_keys=True, default=repr)
+        return hashlib.sha256(_description.encode()).hexdigest()
+
+    def path(self, key):
+        """Determines the file of a run, in one of 256 subdirectories so that no directory grows too large."""
+
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl")
+
+    def get(self, key):
+        """Loads a cached run and marks it as used.
+
+        Args:
+            key (String): Key of the run.
+
+        Returns:
+            DataFrame: The results of the run, or None when the run is not cached.
+        """
+
+        _path = self.path(key)
+        try:
+            with open(_path, "rb") as file:
+                _results = pickle.load(file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(_path)
+        return _results
+
+    def put(self, key, results):
+        """Stores the results of a run. The file is written to a temporary file that is moved into place.
+
+        Args:
+            key (String): Key of the run.
+            results (DataFrame): The results of the run.
+        """
+
+        _path = self.path(key)
+        os.makedirs(os.path.dirname(_path), exist_ok=True)
+        _temp_path = f"{_path}.{os.getpid()}.tmp"
+        with open(_temp_path, "wb") as file:
+            pickle.dump(results, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(_temp_path, _path)
+
+    def prune(self):
+        """Removes the runs that exceed the age limit, and then the least recently used runs until the size limit is met.
+
+        Returns:
+            int: Number of removed runs.
+        """
+
+        _files = []
+        for directory, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".pkl"):
+                    _path = os.path.join(directory, name)
+                    _stat = os.stat(_path)
+                    _files.append((_stat.st_mtime, _stat.st_size, _path))
+        _files.sort()
+
+        _removed = 0
+        _total_bytes = sum(size for _, size, _ in _files)
+        _now = time.time()
+        for modified, size, path in _files:
+            _expired = self.max_age is not None and _now - modified > self.max_age
+            _too_large = self.max_bytes is not None and _total_bytes > self.max_bytes
+            if not (_expired or _too_large):
+                break
+            os.remove(path)
+            _total_bytes -= size
+            _removed += 1
+        return _removed
@@ -0,0 +1,106 @@
+import os
+from urllib.parse import quote
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# Columns by which the results are split into directories
+PARTITION_COLUMNS = ["main_user_strategy", "user_strategies", "price_trend_setting"]
+
+# Numeric columns that are stored as integers, all other numeric columns are stored as floats
+INTEGER_COLUMNS = ["RunId", "iteration", "Step", "AgentID", "num_active_users", "bought_at_day", "max_days",
+                   "VET_LOB_ID", "VTHO_LOB_ID", "simulation_length", "price_trend_length", "usage_trend_length"]
+
+
+class ResultSink:
+    """Streams the results of a sweep to disk as a partitioned Parquet dataset.
+
+    Every chunk of results is written to its own files as soon as it arrives, so the results of the full sweep are never
+    kept in memory. Strings are stored as categoricals and every numeric column gets a fixed type, so that all files share
+    the same schema.
+    """
+
+    def __init__(self, output_dir, partition_columns=PARTITION_COLUMNS, compression="zstd"):
+        """Initializes the sink.
+
+        Args:
+            output_dir (String): Directory of the dataset.
+            partition_columns (List): Columns by which the results are split into directories, when present.
+            compression (String): Compression codec of the Parquet files.
+        """
+
+        self.output_dir = output_dir
+        self.partition_columns = partition_columns
+        self.compression = compression
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, results):
+        """Writes a chunk of results to the dataset.
+
+        Args:
+            results (DataFrame): Results of a chunk of runs, with one row per agent per run.
+        """
+
+        if results.empty:
+            return
+
+        _results = results.copy()
+        for column in _results.columns:
+            if _results[column].dtype == object:
+                _results[column] = _results[column].astype(str).astype("category")
+            elif pd.api.types.is_bool_dtype(_results[column]):
+                continue
+            elif pd.api.types.is_numeric_dtype(_results[column]):
+                _results[column] = _results[column].astype(
+                    "int64" if column in INTEGER_COLUMNS else "float64")
+
+        # Write every partition to a Hive-style directory (column=value/...), in a file that is named after the runs of the
+        # chunk so that a chunk never overwrites the files of another chunk
+        _partition_columns = [column for column in self.partition_columns if column in _results.columns]
+        _file_name = f"runs_{_results['RunId'].min()}-{_results['RunId'].max()}.parquet"
+        _partitions = _results.groupby(_partition_columns, observed=True, sort=False) if _partition_columns \
+            else [((), _results)]
+        for values, partition in _partitions:
+            _values = values if isinstance(values, tuple) else (values,)
+            _directory = os.path.join(self.output_dir, *(
+                f"{column}={quote(str(value), safe='')}" for column, value in zip(_partition_columns, _values)))
+            os.makedirs(_directory, exist_ok=True)
+
+            # Write to a temporary file that is moved into place, so that an interrupted write leaves no partial file. Its
+            # name starts with a dot, so that readers of the dataset skip it.
+            _path = os.path.join(_directory, _file_name)
+            _temp_path = os.path.join(_directory, f".{_file_name}.{os.getpid()}.tmp")
+            pq.write_table(
+                pa.Table.from_pandas(partition.drop(columns=_partition_columns), preserve_index=False),
+                _temp_path, compression=self.compression)
+            os.replace(_temp_path, _path)
+
+    def finished_run_ids(self):
+        """Determines which runs are already stored in the dataset.
+
+        Returns:
+            set: The ids of the stored runs.
+        """
+
+        if not any(True for _, _, files in os.walk(self.output_dir) if files):
+            return set()
+        return set(load_results(self.output_dir, columns=["RunId"])["RunId"])
+
+
+def load_results(output_dir, columns=None, filters=None):
+    """Loads (part of) a dataset that is written by a `ResultSink`.
+
+    Only the requested columns and partitions are read from disk.
+
+    Args:
+        output_dir (String): Directory of the dataset.
+        columns (List): Columns to load, all columns are loaded when None.
+        filters (List): Row filters in the format of `pyarrow.parquet.read_table`, e.g.
+            `[("price_trend_setting", "=", "VET-up")]`.
+
+    Returns:
+        DataFrame: The loaded results.
+    """
+
+    return pd.read_parquet(output_dir, columns=columns, filters=filters)
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+
+# Types of the traced events
+TRADE = 0
+BUY_DECISION = 1
+DEACTIVATION = 2
+PRICE_UPDATE = 3
+EVENT_NAMES = ["TRADE", "BUY_DECISION", "DEACTIVATION", "PRICE_UPDATE"]
+
+# Tokens and causes that are stored as codes
+TOKENS = ["VET", "VTHO"]
+ORDER_TYPES = ["BUY", "SELL"]
+PRICE_CAUSES = ["ORDER", "TREND"]
+
+# Binary layout of a single event. The meaning of the values depends on the type of the event:
+#   TRADE:        code = order type, x = amount, y = tick change, z = FIAT price paid
+#   BUY_DECISION: code = 0,          x = VET bought, y = FIAT spent on rent before buying, z = FIAT price paid
+#   DEACTIVATION: code = state,      x = CR, y = total FIAT spent on rent, z = total FIAT spent on buying
+#   PRICE_UPDATE: code = cause,      x = old price, y = new price, z = 0
+EVENT_DTYPE = np.dtype([
+    ("event", np.int8),
+    ("token", np.int8),
+    ("code", np.int8),
+    ("LOB_ID", np.int16),
+    ("step", np.int32),
+    ("agent", np.int32),
+    ("x", np.float64),
+    ("y", np.float64),
+    ("z", np.float64)])
+
+# The active tracer of this process, None when tracing is disabled
+tracer = None
+
+
+class EventTracer:
+    """Records simulation events into a preallocated ring buffer of fixed-size binary records.
+
+    Tracing is enabled by `enable_tracing`. The models only check whether the module-level `tracer` is set before
+    recording an event, so tracing costs nothing when it is disabled. When a file is given, every full buffer is appended
+    to the file instead of being overwritten, so that the full trace is kept.
+    """
+
+    def __init__(self, capacity=65536, path=None):
+        """Initializes the tracer.
+
+        Args:
+            capacity (int): Number of events in the ring buffer.
+            path (String): Binary file to which the events are written, only the last events are kept when None.
+        """
+
+        self.buffer = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.capacity = capacity
+        self.path = path
+        self.num_events = 0
+        self._file = open(path, "wb") if path is not None else None
+
+    def record(self, event, step, agent=-1, token=0, code=0, LOB_ID=-1, x=0.0, y=0.0, z=0.0):
+        """Records a single event.
+
+        Args:
+            event (int): Type of the event.
+            step (int): Day on which the event took place.
+            agent (int): Id of the user, -1 for events of the economy.
+            token (int): Index of the token in `TOKENS`.
+            code (int): Order type, state or cause of the event, see `EVENT_DTYPE`.
+            LOB_ID (int): Index of the LOB snapshot, -1 when no LOB is involved.
+            x (float): First value of the event.
+            y (float): Second value of the event.
+            z (float): Third value of the event.
+        """
+
+        _index = self.num_events % self.capacity
+        self.buffer[_index] = (event, token, code, LOB_ID, step, agent, x, y, z)
+        self.num_events += 1
+
+        # Write the full buffer to the file before it is overwritten
+        if self._file is not None and self.num_events % self.capacity == 0:
+            self.buffer.tofile(self._file)
+
+    def trade(self, step, token, order_type, LOB_ID, amount, tick_change, price_paid):
+        """Records an order on the exchange."""
+
+        self.record(TRADE, step, -1, TOKENS.index(token), ORDER_TYPES.index(order_type), LOB_ID,
+                    amount, tick_change, price_paid)
+
+    def buy_decision(self, step, agent, LOB_ID, VET_bought, FIAT_spent_rent, price_paid):
+        """Records the decision of a user to buy VET."""
+
+        self.record(BUY_DECISION, step, agent, 0, 0, LOB_ID, VET_bought, FIAT_spent_rent, price_paid)
+
+    def deactivation(self, step, agent, bought, CR, FIAT_spent_rent, FIAT_spent_buying):
+        """Records a user that has become inactive."""
+
+        self.record(DEACTIVATION, step, agent, 0, int(bought), -1, CR, FIAT_spent_rent, FIAT_spent_buying)
+
+    def price_update(self, step, token, cause, old_price, new_price):
+        """Records a change of the price of a token."""
+
+        self.record(PRICE_UPDATE, step, -1, TOKENS.index(token), PRICE_CAUSES.index(cause), -1, old_price, new_price)
+
+    def events(self):
+        """Collects the events in the ring buffer, oldest first.
+
+        Returns:
+            ndarray: The recorded events.
+        """
+
+        if self.num_events <= self.capacity:
+            return self.buffer[:self.num_events].copy()
+        _start = self.num_events % self.capacity
+        return np.concatenate([self.buffer[_start:], self.buffer[:_start]])
+
+    def close(self):
+        """Writes the events that are not yet in the file and closes it."""
+
+        if self._file is not None:
+            self.buffer[:self.num_events % self.capacity].tofile(self._file)
+            self._file.close()
+            self._file = None
+
+
+def enable_tracing(capacity=65536, path=None):
+    """Enables tracing in this process.
+
+    Args:
+        capacity (int): Number of events in the ring buffer.
+        path (String): Binary file to which the events are written, only the last events are kept when None.
+
+    Returns:
+        EventTracer: The active tracer.
+    """
+
+    global tracer
+    disable_tracing()
+    tracer = EventTracer(capacity, path)
+    return tracer
+
+
+def disable_tracing():
+    """Disables tracing in this process and closes the file of the active tracer.
+    """
+
+    global tracer
+    if tracer is not None:
+        tracer.close()
+    tracer = None
+
+
+def events_dataframe(events):
+    """Converts recorded events to a DataFrame with readable event types, tokens and codes.
+
+    Args:
+        events (ndarray): Events as returned by `EventTracer.events` or `load_trace`.
+
+    Returns:
+        DataFrame: One row per event.
+    """
+
+    _df = pd.DataFrame(events)
+    _df["event"] = pd.Categorical.from_codes(_df["event"], EVENT_NAMES)
+    _df["token"] = pd.Categorical.from_codes(_df["token"], TOKENS)
+    return _df
+
+
+def load_trace(path):
+    """Loads the events of a trace file.
+
+    Args:
+        path (String): Binary file written by an `EventTracer`.
+
+    Returns:
+        ndarray: The recorded events, memory-mapped from the file.
+    """
+
+    return np.memmap(path, dtype=EVENT_DTYPE, mode="r")
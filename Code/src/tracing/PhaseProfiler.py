@@ -0,0 +1,105 @@
+from time import perf_counter
+import pandas as pd
+
+
+class PhaseProfiler:
+    """Accumulates the wall time and the number of calls of every phase of a model step.
+
+    A model that is created with `profile=True` owns a profiler and times its phases with `start` and `lap`. Users time
+    their buy decisions with `add`, so the time of the decisions is part of the time of the phase in which the users act.
+    Models without a profiler only check whether their profiler is set, so profiling costs nothing when it is disabled.
+    """
+
+    def __init__(self):
+        """Initializes an empty profile.
+        """
+
+        self.seconds = {}
+        self.calls = {}
+        self._last = perf_counter()
+
+    def start(self):
+        """Starts timing the first phase of a step.
+        """
+
+        self._last = perf_counter()
+
+    def lap(self, phase):
+        """Ends a phase and starts timing the next phase.
+
+        Args:
+            phase (String): Name of the phase that has ended.
+        """
+
+        _now = perf_counter()
+        self.add(phase, _now - self._last)
+        self._last = _now
+
+    def add(self, phase, seconds):
+        """Adds a single call of a phase.
+
+        Args:
+            phase (String): Name of the phase.
+            seconds (float): Wall time of the call.
+        """
+
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def profile(self):
+        """Summarizes the profile, e.g. as a model variable that is reported by the batch runner.
+
+        Returns:
+            dict: The cumulative seconds and the number of calls per phase.
+        """
+
+        return {phase: {"seconds": self.seconds[phase], "calls": self.calls[phase]} for phase in self.seconds}
+
+    def dataframe(self):
+        """Summarizes the profile as a table.
+
+        Returns:
+            DataFrame: The cumulative seconds, calls and microseconds per call of every phase.
+        """
+
+        return profile_dataframe([self.profile()])
+
+
+def profile_dataframe(profiles):
+    """Aggregates the profiles of several runs, e.g. of all iterations of a `batch_run`.
+
+    Args:
+        profiles (Iterable): Profiles as returned by `PhaseProfiler.profile`, e.g. the `profile' column of the results of a
+            single agent per run.
+
+    Returns:
+        DataFrame: The cumulative seconds, calls and microseconds per call of every phase, slowest phase first.
+    """
+
+    _seconds = {}
+    _calls = {}
+    for profile in profiles:
+        for phase, totals in profile.items():
+            _seconds[phase] = _seconds.get(phase, 0.0) + totals["seconds"]
+            _calls[phase] = _calls.get(phase, 0) + totals["calls"]
+
+    _df = pd.DataFrame({"seconds": pd.Series(_seconds, dtype=float), "calls": pd.Series(_calls, dtype="int64")})
+    _df.index.name = "phase"
+    _df["microseconds_per_call"] = 1e6 * _df["seconds"] / _df["calls"]
+    return _df.sort_values("seconds", ascending=False)
+
+
+def aggregate_profiles(results):
+    """Aggregates the profiles in the results of a `batch_run` or `pool_run` with profiling enabled.
+
+    The results contain one row per agent per run, with the same profile in every row of a run.
+
+    Args:
+        results (DataFrame or List): The results of the runs.
+
+    Returns:
+        DataFrame: The aggregated profile, see `profile_dataframe`.
+    """
+
+    _results = pd.DataFrame(results)
+    return profile_dataframe(_results.drop_duplicates("RunId")["profile"])